@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, FarmerProfile, InputSupplierProfile
+from .models import User, FarmerProfile, InputSupplierProfile, Region, District
 
 
 class CustomUserAdmin(UserAdmin):
@@ -59,3 +59,15 @@ class CustomUserAdmin(UserAdmin):
 admin.site.register(User, CustomUserAdmin)
 admin.site.register(FarmerProfile)
 admin.site.register(InputSupplierProfile)
+
+
+@admin.register(Region)
+class RegionAdmin(admin.ModelAdmin):
+    list_display = ['name']
+
+
+@admin.register(District)
+class DistrictAdmin(admin.ModelAdmin):
+    list_display = ['name', 'region']
+    list_filter = ['region']
+    search_fields = ['name']
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
+
+    def ready(self):
+        from django.db.models.signals import post_save, post_delete
+        from .models import District
+        from .services.districts import clear_cache
+        post_save.connect(clear_cache, sender=District, dispatch_uid='district_index')
+        post_delete.connect(clear_cache, sender=District, dispatch_uid='district_index')
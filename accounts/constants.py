@@ -2,8 +2,8 @@
 
 UGANDA_DISTRICT_CHOICES = [
     ('Central Region', (
-        ('Kampala', 'Kampala'), ('Wakiso', 'Wakiso'), ('Mpigi', 'Mpigi'),
-        ('Mukono', 'Mukono'), ('Luwero', 'Luwero'), ('Nakasongola', 'Nakasongola'),
+        ('Kampala', 'Kampala'), ('Entebbe', 'Entebbe'), ('Wakiso', 'Wakiso'), ('Mpigi', 'Mpigi'),
+        ('Mukono', 'Mukono'), ('Luweero', 'Luweero'), ('Nakasongola', 'Nakasongola'),
         ('Masaka', 'Masaka'), ('Rakai', 'Rakai'), ('Kalangala', 'Kalangala'),
         ('Lyantonde', 'Lyantonde'), ('Sembabule', 'Sembabule'), ('Bukomansimbi', 'Bukomansimbi'),
     )),
@@ -28,12 +28,30 @@ UGANDA_DISTRICT_CHOICES = [
         ('Mbarara', 'Mbarara'), ('Isingiro', 'Isingiro'), ('Kiruhura', 'Kiruhura'),
         ('Ntungamo', 'Ntungamo'), ('Kabale', 'Kabale'), ('Kisoro', 'Kisoro'),
         ('Rukungiri', 'Rukungiri'), ('Kanungu', 'Kanungu'), ('Kasese', 'Kasese'),
-        ('Bundibugyo', 'Bundibugyo'), ('Kabarole', 'Kabarole'), ('Kyenjojo', 'Kyenjojo'),
+        ('Bundibugyo', 'Bundibugyo'), ('Kabarole', 'Kabarole'), ('Fort Portal', 'Fort Portal'),
+        ('Kyenjojo', 'Kyenjojo'),
         ('Bushenyi', 'Bushenyi'), ('Sheema', 'Sheema'), ('Mitooma', 'Mitooma'),
         ('Hoima', 'Hoima'), ('Masindi', 'Masindi'), ('Kiryandongo', 'Kiryandongo'),
     )),
 ]
 
+# Region name -> district names, the canonical list seeded into the
+# Region/District reference tables
+REGION_DISTRICTS = {
+    region.replace(' Region', ''): [name for name, _ in districts]
+    for region, districts in UGANDA_DISTRICT_CHOICES
+}
+
+# Alternative spellings and abbreviations seen in free-text locations
+DISTRICT_ALIASES = {
+    'Luwero': 'Luweero',
+    'Kla': 'Kampala',
+    'Fortportal': 'Fort Portal',
+    'Ft Portal': 'Fort Portal',
+    'Mbarara City': 'Mbarara',
+    'Gulu City': 'Gulu',
+}
+
 SPECIALIZATION_CHOICES = [
     (s, s) for s in [
         "Crop Farming", "Livestock Farming", "Poultry Farming",
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def seed_districts(apps, schema_editor):
+    from accounts.constants import REGION_DISTRICTS, DISTRICT_ALIASES
+    from accounts.services.districts import build_index, match
+
+    Region = apps.get_model('accounts', 'Region')
+    District = apps.get_model('accounts', 'District')
+    User = apps.get_model('accounts', 'User')
+
+    for region_name, district_names in REGION_DISTRICTS.items():
+        region, _ = Region.objects.get_or_create(name=region_name)
+        for name in district_names:
+            District.objects.get_or_create(name=name, defaults={'region': region})
+
+    # Old spellings that are no longer valid choices
+    for alias, canonical in DISTRICT_ALIASES.items():
+        User.objects.filter(district=alias).update(district=canonical)
+
+    index = build_index(District.objects.all())
+    for user in User.objects.only('pk', 'district', 'location').iterator():
+        pk = match(user.district, index) or match(user.location, index)
+        if pk:
+            User.objects.filter(pk=user.pk).update(home_district_id=pk)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_alter_farmerprofile_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='District',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Region',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='district',
+            field=models.CharField(blank=True, choices=[('Central Region', [('Kampala', 'Kampala'), ('Entebbe', 'Entebbe'), ('Wakiso', 'Wakiso'), ('Mpigi', 'Mpigi'), ('Mukono', 'Mukono'), ('Luweero', 'Luweero'), ('Nakasongola', 'Nakasongola'), ('Masaka', 'Masaka'), ('Rakai', 'Rakai'), ('Kalangala', 'Kalangala'), ('Lyantonde', 'Lyantonde'), ('Sembabule', 'Sembabule'), ('Bukomansimbi', 'Bukomansimbi')]), ('Eastern Region', [('Jinja', 'Jinja'), ('Iganga', 'Iganga'), ('Mayuge', 'Mayuge'), ('Bugiri', 'Bugiri'), ('Tororo', 'Tororo'), ('Busia', 'Busia'), ('Mbale', 'Mbale'), ('Bududa', 'Bududa'), ('Manafwa', 'Manafwa'), ('Sironko', 'Sironko'), ('Kapchorwa', 'Kapchorwa'), ('Kween', 'Kween'), ('Bukwo', 'Bukwo'), ('Soroti', 'Soroti'), ('Serere', 'Serere'), ('Kumi', 'Kumi'), ('Bukedea', 'Bukedea')]), ('Northern Region', [('Gulu', 'Gulu'), ('Kitgum', 'Kitgum'), ('Pader', 'Pader'), ('Agago', 'Agago'), ('Amuru', 'Amuru'), ('Nwoya', 'Nwoya'), ('Lamwo', 'Lamwo'), ('Lira', 'Lira'), ('Alebtong', 'Alebtong'), ('Apac', 'Apac'), ('Dokolo', 'Dokolo'), ('Oyam', 'Oyam'), ('Kole', 'Kole'), ('Otuke', 'Otuke'), ('Arua', 'Arua'), ('Koboko', 'Koboko'), ('Maracha', 'Maracha'), ('Yumbe', 'Yumbe'), ('Nebbi', 'Nebbi'), ('Zombo', 'Zombo'), ('Moyo', 'Moyo')]), ('Western Region', [('Mbarara', 'Mbarara'), ('Isingiro', 'Isingiro'), ('Kiruhura', 'Kiruhura'), ('Ntungamo', 'Ntungamo'), ('Kabale', 'Kabale'), ('Kisoro', 'Kisoro'), ('Rukungiri', 'Rukungiri'), ('Kanungu', 'Kanungu'), ('Kasese', 'Kasese'), ('Bundibugyo', 'Bundibugyo'), ('Kabarole', 'Kabarole'), ('Fort Portal', 'Fort Portal'), ('Kyenjojo', 'Kyenjojo'), ('Bushenyi', 'Bushenyi'), ('Sheema', 'Sheema'), ('Mitooma', 'Mitooma'), ('Hoima', 'Hoima'), ('Masindi', 'Masindi'), ('Kiryandongo', 'Kiryandongo')])], max_length=100),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='home_district',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='residents', to='accounts.district'),
+        ),
+        migrations.AddField(
+            model_name='district',
+            name='region',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='districts', to='accounts.region'),
+        ),
+        migrations.RunPython(seed_districts, migrations.RunPython.noop),
+    ]
@@ -3,6 +3,39 @@ from django.contrib.auth.models import AbstractUser
 from django.db import models
 from .constants import UGANDA_DISTRICT_CHOICES, SPECIALIZATION_CHOICES
 
+class Region(models.Model):
+    """
+    Administrative region (Central, Eastern, Northern, Western)
+    """
+    name = models.CharField(max_length=50, unique=True)
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        ordering = ['name']
+
+
+class District(models.Model):
+    """
+    Canonical district reference. Free-text locations are resolved to
+    a District (see accounts.services.districts) so filters and region
+    rollups can use indexed joins.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    region = models.ForeignKey(
+        Region,
+        on_delete=models.PROTECT,
+        related_name='districts'
+    )
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        ordering = ['name']
+
+
 class User(AbstractUser):
     USER_TYPES = (
         ('farmer', 'Farmer'),
@@ -26,6 +59,14 @@ class User(AbstractUser):
         choices=UGANDA_DISTRICT_CHOICES, 
         blank=True
     )
+    # Resolved from district/location on save
+    home_district = models.ForeignKey(
+        District,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='residents'
+    )
     specialization = models.CharField(
         max_length=100, 
         choices=SPECIALIZATION_CHOICES, 
@@ -33,6 +74,11 @@ class User(AbstractUser):
     )
     first_login = models.BooleanField(default=True)
 
+    def save(self, *args, **kwargs):
+        from .services.districts import resolve_district
+        self.home_district = resolve_district(self.district) or resolve_district(self.location)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.username} ({self.user_type})"
 
@@ -0,0 +1,94 @@
+"""
+District Resolver
+
+Maps free-text locations ("Gulu town", "luwero", "Kampala, Nakawa") to
+the canonical District reference table. The name index is loaded once
+per process and rebuilt when a District changes.
+"""
+
+import difflib
+import re
+import threading
+from typing import Dict, Optional
+
+from accounts.constants import DISTRICT_ALIASES
+from accounts.models import District
+
+# Minimum similarity for a misspelling to be accepted (difflib ratio)
+FUZZY_CUTOFF = 0.85
+
+# Words that often trail a district name in free text
+_NOISE_WORDS = {'district', 'city', 'town', 'municipality', 'uganda'}
+
+_index: Optional[Dict[str, int]] = None
+_districts: Dict[int, District] = {}
+_lock = threading.Lock()
+
+
+def normalize(text: str) -> str:
+    words = re.sub(r'[^a-z ]+', ' ', (text or '').lower()).split()
+    return ' '.join(word for word in words if word not in _NOISE_WORDS)
+
+
+def _load_index() -> Dict[str, int]:
+    global _index
+    if _index is None:
+        with _lock:
+            if _index is None:
+                districts = list(District.objects.select_related('region'))
+                _districts.clear()
+                _districts.update({d.pk: d for d in districts})
+                _index = build_index(districts)
+    return _index
+
+
+def clear_cache(**kwargs) -> None:
+    global _index
+    _index = None
+
+
+def build_index(districts) -> Dict[str, int]:
+    """
+    Normalized name and alias -> district id
+    """
+    index = {normalize(d.name): d.pk for d in districts}
+    for alias, canonical in DISTRICT_ALIASES.items():
+        pk = index.get(normalize(canonical))
+        if pk:
+            index.setdefault(normalize(alias), pk)
+    return index
+
+
+def match(text: str, index: Dict[str, int]) -> Optional[int]:
+    """
+    Id of the district a free-text location refers to, or None.
+
+    Tries, in order: the whole text, each comma-separated part, each one-
+    and two-word phrase, then a fuzzy match for spelling variants.
+    """
+    if not text or not index:
+        return None
+
+    candidates = [normalize(text)]
+    candidates += [normalize(part) for part in text.split(',')]
+    words = normalize(text).split()
+    candidates += [' '.join(words[i:i + 2]) for i in range(len(words) - 1)]
+    candidates += words
+
+    for candidate in candidates:
+        if candidate in index:
+            return index[candidate]
+
+    for candidate in candidates[:2]:
+        close = difflib.get_close_matches(candidate, index.keys(), n=1, cutoff=FUZZY_CUTOFF)
+        if close:
+            return index[close[0]]
+    return None
+
+
+def resolve_district(text: str) -> Optional[District]:
+    """
+    Resolve a free-text location to a District, or None
+    """
+    pk = match(text, _load_index())
+    return _districts.get(pk) if pk else None
@@ -26,6 +26,7 @@ INSTALLED_APPS = [
     'news',
     'weather',
     'notifications',
+    'inventory',
 ]
 
 MIDDLEWARE = [
@@ -66,6 +67,29 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Take the write lock at BEGIN so concurrent writers (requests and
+            # background workers) queue for up to `timeout` seconds instead of
+            # failing with "database is locked" on lock upgrade
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
+        # File-backed test database so concurrency tests get real
+        # connections per thread (in-memory shared cache has no busy wait)
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
+    }
+}
+
+# Cache
+# Home page fragments are cached here (see marketplace/services/fragment_cache.py).
+# Local memory is per process; point this at Redis/Memcached when running
+# several workers so they share fragments and rebuild locks.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'agrimarket',
     }
 }
 
@@ -91,6 +115,14 @@ STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# In-process worker pool for image variants and other deferred work
+# (see marketplace/services/background.py)
+BACKGROUND_WORKERS = 2
+
+# How long a retried POST replays its first response, in seconds
+# (see marketplace/services/idempotency.py)
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Custom User Model
@@ -1,7 +1,25 @@
 from django.contrib import admin
-from .models import InputCategory, AgriculturalInput, GroupBuyPool, GroupBuyParticipant
+from inventory.services import ledger
+from .models import InputCategory, AgriculturalInput, GroupBuyPool, GroupBuyParticipant, InputDemand, DiscountTier
+
+class DiscountTierInline(admin.TabularInline):
+    model = DiscountTier
+    extra = 1
+
+class AgriculturalInputAdmin(admin.ModelAdmin):
+    inlines = [DiscountTierInline]
+
+    def save_model(self, request, obj, form, change):
+        ledger.save_item(ledger.INPUT, obj, request.user)
 
 admin.site.register(InputCategory)
-admin.site.register(AgriculturalInput)
+admin.site.register(AgriculturalInput, AgriculturalInputAdmin)
 admin.site.register(GroupBuyPool)
-admin.site.register(GroupBuyParticipant)
\ No newline at end of file
+admin.site.register(GroupBuyParticipant)
+
+@admin.register(InputDemand)
+class InputDemandAdmin(admin.ModelAdmin):
+    list_display = ['farmer', 'input_item', 'quantity', 'district', 'needed_by', 'status', 'pool']
+    list_filter = ['status', 'district']
+    search_fields = ['farmer__username', 'input_item__name']
+    raw_id_fields = ['pool']
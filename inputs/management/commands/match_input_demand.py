@@ -0,0 +1,26 @@
+"""
+Django management command to match input demand into group buys
+
+Groups farmers' pending input demand by input, nearby districts and
+date needed, and forms a group buy pool wherever the demand reaches
+the input's minimum group order. Schedule it via cron, e.g. hourly.
+
+Usage:
+    python manage.py match_input_demand
+"""
+
+from django.core.management.base import BaseCommand
+from inputs.services.demand import match
+
+
+class Command(BaseCommand):
+    help = 'Form group buy pools from pending input demand'
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.NOTICE('Matching input demand...'))
+        counts = match()
+        if counts['expired']:
+            self.stdout.write(self.style.WARNING(f"{counts['expired']} requests expired unmatched"))
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Formed {counts['pools']} group buys from {counts['matched']} requests"
+        ))
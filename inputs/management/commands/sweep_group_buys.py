@@ -0,0 +1,27 @@
+"""
+Django management command to sweep expired group buys
+
+Closes (target reached) or cancels every group buy pool still open
+after its deadline, in batches, and notifies the participants.
+Schedule it via cron, e.g. every 15 minutes.
+
+Usage:
+    python manage.py sweep_group_buys
+    python manage.py sweep_group_buys --batch-size 1000
+"""
+
+from django.core.management.base import BaseCommand
+from inputs.services.group_buy import SWEEP_BATCH, sweep_expired
+
+
+class Command(BaseCommand):
+    help = 'Close or cancel group buy pools past their deadline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=SWEEP_BATCH, help='Pools per transaction')
+
+    def handle(self, *args, **options):
+        swept = sweep_expired(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Closed {swept['closed']} and cancelled {swept['cancelled']} expired group buys"
+        ))
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inputs', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='groupbuypool',
+            index=models.Index(condition=models.Q(('status', 'open')), fields=['deadline'], name='inputs_open_pool_deadline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='groupbuypool',
+            index=models.Index(condition=models.Q(('status', 'open')), fields=['input_item', 'deadline'], name='inputs_open_pool_item_idx'),
+        ),
+    ]
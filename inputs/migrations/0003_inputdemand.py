@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inputs', '0002_open_pool_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InputDemand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField()),
+                ('district', models.CharField(blank=True, help_text='Where the input is needed', max_length=100)),
+                ('needed_by', models.DateTimeField(help_text='Latest date the input is useful')),
+                ('status', models.CharField(choices=[('pending', 'Waiting for a Group'), ('pooled', 'Added to Group Buy'), ('expired', 'Expired'), ('cancelled', 'Cancelled')], default='pending', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('farmer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='input_demands', to=settings.AUTH_USER_MODEL)),
+                ('input_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='demands', to='inputs.agriculturalinput')),
+                ('pool', models.ForeignKey(blank=True, help_text='Pool this demand was matched into', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='demands', to='inputs.groupbuypool')),
+            ],
+            options={
+                'verbose_name': 'Input Demand',
+                'verbose_name_plural': 'Input Demands',
+                'ordering': ['needed_by'],
+                'indexes': [models.Index(condition=models.Q(('status', 'pending')), fields=['input_item', 'needed_by'], name='inputs_pending_demand_idx')],
+            },
+        ),
+    ]
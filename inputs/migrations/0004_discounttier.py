@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:41
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inputs', '0003_inputdemand'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DiscountTier',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('min_quantity', models.PositiveIntegerField(help_text='Smallest order quantity for this tier')),
+                ('discount_percentage', models.DecimalField(decimal_places=2, help_text='Discount % off the unit price', max_digits=5, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)])),
+                ('input_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='discount_tiers', to='inputs.agriculturalinput')),
+            ],
+            options={
+                'verbose_name': 'Discount Tier',
+                'verbose_name_plural': 'Discount Tiers',
+                'ordering': ['input_item', 'min_quantity'],
+                'constraints': [models.UniqueConstraint(fields=('input_item', 'min_quantity'), name='unique_discount_tier')],
+            },
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from accounts.models import User
 
@@ -84,6 +85,37 @@ class AgriculturalInput(models.Model):
         ordering = ['-created_at']
 
 
+class DiscountTier(models.Model):
+    """
+    Volume discount for an input: orders of at least min_quantity get
+    discount_percentage off. The input's own min_group_order and
+    group_discount_percentage act as one more tier.
+    """
+    input_item = models.ForeignKey(
+        AgriculturalInput,
+        on_delete=models.CASCADE,
+        related_name='discount_tiers'
+    )
+    min_quantity = models.PositiveIntegerField(help_text="Smallest order quantity for this tier")
+    discount_percentage = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        validators=[MinValueValidator(0), MaxValueValidator(100)],
+        help_text="Discount % off the unit price"
+    )
+    
+    def __str__(self):
+        return f"{self.input_item.name}: {self.discount_percentage}% from {self.min_quantity}"
+    
+    class Meta:
+        verbose_name = "Discount Tier"
+        verbose_name_plural = "Discount Tiers"
+        ordering = ['input_item', 'min_quantity']
+        constraints = [
+            models.UniqueConstraint(fields=['input_item', 'min_quantity'], name='unique_discount_tier'),
+        ]
+
+
 class GroupBuyPool(models.Model):
     """
     Group buying pools for bulk discounts on inputs
@@ -114,6 +146,12 @@ class GroupBuyPool(models.Model):
     class Meta:
         verbose_name = "Group Buy Pool"
         verbose_name_plural = "Group Buy Pools"
+        indexes = [
+            # Only open pools are listed or swept; closed and expired
+            # ones stay out of these indexes
+            models.Index(fields=['deadline'], condition=models.Q(status='open'), name='inputs_open_pool_deadline_idx'),
+            models.Index(fields=['input_item', 'deadline'], condition=models.Q(status='open'), name='inputs_open_pool_item_idx'),
+        ]
 
 
 class GroupBuyParticipant(models.Model):
@@ -131,4 +169,46 @@ class GroupBuyParticipant(models.Model):
     class Meta:
         verbose_name = "Group Buy Participant"
         verbose_name_plural = "Group Buy Participants"
-        unique_together = ['pool', 'farmer']
\ No newline at end of file
+        unique_together = ['pool', 'farmer']
+
+class InputDemand(models.Model):
+    """
+    A farmer's standing request for an input ("I need 20 bags of NPK by
+    March"). Pending demand is matched into group buy pools by
+    services.demand.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Waiting for a Group'),
+        ('pooled', 'Added to Group Buy'),
+        ('expired', 'Expired'),
+        ('cancelled', 'Cancelled'),
+    )
+    
+    farmer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='input_demands')
+    input_item = models.ForeignKey(AgriculturalInput, on_delete=models.CASCADE, related_name='demands')
+    quantity = models.PositiveIntegerField()
+    district = models.CharField(max_length=100, blank=True, help_text="Where the input is needed")
+    needed_by = models.DateTimeField(help_text="Latest date the input is useful")
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    pool = models.ForeignKey(
+        GroupBuyPool,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='demands',
+        help_text="Pool this demand was matched into"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.farmer.username} needs {self.quantity} {self.input_item.unit} of {self.input_item.name}"
+    
+    class Meta:
+        verbose_name = "Input Demand"
+        verbose_name_plural = "Input Demands"
+        ordering = ['needed_by']
+        indexes = [
+            # The matcher reads pending demand input by input
+            models.Index(fields=['input_item', 'needed_by'], condition=models.Q(status='pending'), name='inputs_pending_demand_idx'),
+        ]
@@ -0,0 +1,230 @@
+"""
+Input Demand Matching Service
+
+Farmers post standing demand for inputs (InputDemand). match(), run
+periodically by the match_input_demand command, turns pending demand
+into group buy pools:
+
+1. pending demand is read once, ordered by input and date needed
+2. per input, the districts with demand are clustered around the
+   districts with the most demand: each seed takes every unclaimed
+   district within RADIUS_KM of it (DISTRICT_COORDINATES distances)
+3. per district cluster, demand is split into deadline windows of at
+   most WINDOW between the first and last date needed
+4. a window from at least MIN_FARMERS farmers whose total reaches the
+   input's min_group_order becomes a pool that has reached its target
+
+Clustering works on per-district totals (one entry per district, not
+per demand), so a run costs one pass over the demand plus a few bulk
+writes, whatever the number of entries. Demand that does not form a
+pool stays pending for the next run; demand past its date expires.
+"""
+
+import logging
+from collections import Counter, defaultdict, namedtuple
+from datetime import timedelta
+from itertools import groupby
+from typing import Dict, Iterable, List, Tuple
+
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+
+from inputs.models import GroupBuyParticipant, GroupBuyPool, InputDemand
+from marketplace.services import background, geo
+from notifications.models import Notification
+
+logger = logging.getLogger(__name__)
+
+# Farthest a district may be from its cluster's seed district
+RADIUS_KM = 60
+
+# Longest spread of "needed by" dates within one pool
+WINDOW = timedelta(days=14)
+
+# A pool needs demand from at least this many farmers
+MIN_FARMERS = 2
+
+Demand = namedtuple('Demand', 'pk farmer_id district quantity needed_by')
+Match = namedtuple('Match', 'input_id target demands')
+
+
+class DemandError(Exception):
+    """
+    Raised when a demand cannot be recorded
+    """
+
+
+def submit(farmer, input_item, quantity: int, needed_by) -> InputDemand:
+    """
+    Record a farmer's demand for an input, in their district
+    """
+    if quantity <= 0:
+        raise DemandError("Quantity must be greater than 0")
+    if needed_by <= timezone.now():
+        raise DemandError("The date needed must be in the future")
+    district = farmer.district or (farmer.home_district.name if farmer.home_district_id else '')
+    return InputDemand.objects.create(
+        farmer=farmer, input_item=input_item, quantity=quantity, district=district, needed_by=needed_by
+    )
+
+
+# --- CLUSTERING ---
+
+def cluster_districts(totals: Dict[str, int], distances: Dict[Tuple[str, str], float],
+                      radius: float = RADIUS_KM) -> Dict[str, str]:
+    """
+    Map each district to the seed district of its cluster. Seeds are
+    taken in order of demand, so clusters form around where demand is
+    highest; districts without coordinates only cluster with themselves.
+    """
+    seed_of = {}
+    for seed in sorted(totals, key=lambda district: (-totals[district], district)):
+        if seed in seed_of:
+            continue
+        for district in totals:
+            if district not in seed_of and (
+                district == seed or distances.get((seed, district), radius + 1) <= radius
+            ):
+                seed_of[district] = seed
+    return seed_of
+
+
+def split_windows(demands: List[Demand], window: timedelta = WINDOW) -> Iterable[List[Demand]]:
+    """
+    Consecutive runs of demand (sorted by date needed) whose dates are
+    at most window apart
+    """
+    run = []
+    for demand in demands:
+        if run and demand.needed_by - run[0].needed_by > window:
+            yield run
+            run = []
+        run.append(demand)
+    if run:
+        yield run
+
+
+def plan(input_id: int, target: int, demands: List[Demand],
+         distances: Dict[Tuple[str, str], float]) -> List[Match]:
+    """
+    Pools to form from one input's pending demand (sorted by date needed)
+    """
+    totals = Counter()
+    for demand in demands:
+        totals[demand.district] += demand.quantity
+    seed_of = cluster_districts(totals, distances)
+
+    clusters = defaultdict(list)
+    for demand in demands:
+        clusters[seed_of[demand.district]].append(demand)
+
+    matches = []
+    for members in clusters.values():
+        for run in split_windows(members):
+            if (sum(demand.quantity for demand in run) >= target
+                    and len({demand.farmer_id for demand in run}) >= MIN_FARMERS):
+                matches.append(Match(input_id, target, run))
+    return matches
+
+
+# --- POOLS ---
+
+@transaction.atomic
+def form_pools(matches: List[Match]) -> List[GroupBuyPool]:
+    """
+    Create a pool that has reached its target for each match, with one
+    participant per farmer, and mark the demand pooled
+    """
+    pools = GroupBuyPool.objects.bulk_create([
+        GroupBuyPool(
+            input_item_id=match.input_id,
+            organizer_id=max(match.demands, key=lambda demand: demand.quantity).farmer_id,
+            target_quantity=match.target,
+            current_quantity=sum(demand.quantity for demand in match.demands),
+            deadline=match.demands[0].needed_by,
+            status='closed',
+        )
+        for match in matches
+    ])
+
+    participants = []
+    for pool, match in zip(pools, matches):
+        per_farmer = Counter()
+        for demand in match.demands:
+            per_farmer[demand.farmer_id] += demand.quantity
+        participants.extend(
+            GroupBuyParticipant(pool=pool, farmer_id=farmer_id, quantity=quantity)
+            for farmer_id, quantity in per_farmer.items()
+        )
+        InputDemand.objects.filter(
+            pk__in=[demand.pk for demand in match.demands], status='pending'
+        ).update(status='pooled', pool=pool)
+    GroupBuyParticipant.objects.bulk_create(participants, batch_size=1000)
+
+    background.run_after_commit(notify_pooled, [pool.pk for pool in pools])
+    return pools
+
+
+def match(now=None) -> Dict[str, int]:
+    """
+    Expire stale demand and form pools from the rest.
+
+    Returns:
+        Counts of expired demand, matched demand and pools formed
+    """
+    now = now or timezone.now()
+    expired = InputDemand.objects.filter(status='pending', needed_by__lt=now).update(status='expired')
+
+    rows = (
+        InputDemand.objects
+        .filter(status='pending', input_item__status='available')
+        .order_by('input_item_id', 'needed_by', 'pk')
+        .values_list('input_item_id', 'input_item__min_group_order',
+                     'pk', 'farmer_id', 'district', 'quantity', 'needed_by')
+    )
+    distances = geo.distance_matrix()
+
+    matches = []
+    for (input_id, target), entries in groupby(rows.iterator(chunk_size=5000), key=lambda row: row[:2]):
+        demands = [Demand(*entry[2:]) for entry in entries]
+        matches.extend(plan(input_id, max(target, 1), demands, distances))
+
+    pools = form_pools(matches) if matches else []
+    counts = {
+        'expired': expired,
+        'matched': sum(len(m.demands) for m in matches),
+        'pools': len(pools),
+    }
+    logger.info(f"Matched input demand: {counts}")
+    return counts
+
+
+def notify_pooled(pool_ids: List[int]) -> int:
+    """
+    Tell the farmers in newly formed pools. Runs in the background pool.
+
+    Returns:
+        Number of notifications created
+    """
+    participants = (
+        GroupBuyParticipant.objects
+        .filter(pool_id__in=pool_ids)
+        .select_related('pool__input_item')
+    )
+    notifications = [
+        Notification(
+            user_id=participant.farmer_id,
+            notification_type='group_buy',
+            title=f"Group buy formed: {participant.pool.input_item.name}",
+            message=(
+                f"Your request for {participant.quantity} {participant.pool.input_item.unit} of "
+                f"{participant.pool.input_item.name} was grouped with farmers near you: "
+                f"{participant.pool.current_quantity} {participant.pool.input_item.unit} in total."
+            ),
+            link=reverse('inputs:group_buy_detail', args=[participant.pool_id]),
+        )
+        for participant in participants.iterator(chunk_size=1000)
+    ]
+    Notification.objects.bulk_create(notifications, batch_size=1000)
+    return len(notifications)
@@ -0,0 +1,189 @@
+"""
+Group Buy Service
+
+A pool's running total is only ever changed in the database, with one
+conditional UPDATE per join:
+
+    UPDATE pool SET current_quantity = current_quantity + n
+    WHERE id = ? AND status = 'open' AND deadline >= now
+
+so concurrent joins add up exactly instead of overwriting each other,
+and nobody joins a pool that has closed or expired. The participant row
+is inserted in the same transaction; (pool, farmer) is unique, so a
+second join by the same farmer rolls the UPDATE back.
+
+The join that reaches the target closes the pool with a second
+conditional UPDATE (status 'open' -> 'closed' only while open), so the
+transition happens exactly once.
+
+Pools still open after their deadline are swept by sweep_expired()
+(the sweep_group_buys command, run from cron): batches of expired pools
+are closed (target reached) or cancelled with set-based UPDATEs, and
+their participants are notified from the background pool.
+
+Both paths publish the pool's new progress to anyone watching its page
+live (services.progress).
+"""
+
+import logging
+from collections import Counter, namedtuple
+from typing import Dict, List
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.urls import reverse
+from django.utils import timezone
+
+from inputs.models import GroupBuyParticipant, GroupBuyPool
+from marketplace.services import background
+from notifications.models import Notification
+from . import pricing, progress
+
+logger = logging.getLogger(__name__)
+
+# Expired pools handled per transaction
+SWEEP_BATCH = 500
+
+# Notification text per final status
+MESSAGES = {
+    'closed': "The group buy for {item} reached its target of {target} {unit}.",
+    'cancelled': "The group buy for {item} ended at {current} of {target} {unit} without reaching its target.",
+}
+
+JoinResult = namedtuple('JoinResult', 'participant closed')
+
+
+class GroupBuyError(Exception):
+    """
+    Raised when a farmer cannot join a pool; nothing is changed
+    """
+
+
+@transaction.atomic
+def join(pool_id: int, farmer, quantity: int) -> JoinResult:
+    """
+    Add farmer's quantity to an open pool, closing it if the target is
+    reached.
+
+    Raises:
+        GroupBuyError: invalid quantity, the pool is not open, or the
+            farmer already joined
+    """
+    if quantity <= 0:
+        raise GroupBuyError("Quantity must be greater than 0")
+
+    added = GroupBuyPool.objects.filter(
+        pk=pool_id,
+        status='open',
+        deadline__gte=timezone.now(),
+    ).update(current_quantity=F('current_quantity') + quantity)
+    if not added:
+        raise GroupBuyError("This group buy is no longer open")
+
+    try:
+        with transaction.atomic():
+            participant = GroupBuyParticipant.objects.create(pool_id=pool_id, farmer=farmer, quantity=quantity)
+    except IntegrityError:
+        raise GroupBuyError("You have already joined this group buy")
+
+    closed = GroupBuyPool.objects.filter(
+        pk=pool_id,
+        status='open',
+        current_quantity__gte=F('target_quantity'),
+    ).update(status='closed')
+
+    # queryset.update() sends no signals: the pool's quote changed
+    pricing.invalidate(GroupBuyPool.objects.filter(pk=pool_id).values_list('input_item_id', flat=True))
+    progress.publish([pool_id])
+    return JoinResult(participant, bool(closed))
+
+
+@transaction.atomic
+def create_pool(input_item, organizer, target_quantity: int, quantity: int, deadline) -> GroupBuyPool:
+    """
+    Open a pool with the organizer as its first participant
+    """
+    if target_quantity <= 0:
+        raise GroupBuyError("Target quantity must be greater than 0")
+    pool = GroupBuyPool.objects.create(
+        input_item=input_item,
+        organizer=organizer,
+        target_quantity=target_quantity,
+        deadline=deadline,
+        status='open',
+    )
+    join(pool.pk, organizer, quantity)
+    pool.refresh_from_db(fields=['current_quantity', 'status'])
+    return pool
+
+
+# --- DEADLINES ---
+
+def sweep_expired(now=None, batch_size: int = SWEEP_BATCH) -> Dict[str, int]:
+    """
+    Close or cancel every pool still open after its deadline, a batch
+    per transaction. Pools that reached their target are closed, the
+    rest cancelled; participants are notified once each batch commits.
+
+    Returns:
+        Number of pools closed and cancelled
+    """
+    now = now or timezone.now()
+    swept = Counter()
+    while True:
+        with transaction.atomic():
+            pool_ids = list(
+                GroupBuyPool.objects
+                .filter(status='open', deadline__lt=now)
+                .order_by('deadline')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not pool_ids:
+                break
+            expired = GroupBuyPool.objects.filter(pk__in=pool_ids, status='open')
+            swept['closed'] += expired.filter(current_quantity__gte=F('target_quantity')).update(status='closed')
+            swept['cancelled'] += expired.update(status='cancelled')
+            pricing.invalidate(
+                GroupBuyPool.objects.filter(pk__in=pool_ids).values_list('input_item_id', flat=True).distinct()
+            )
+            progress.publish(pool_ids)
+            background.run_after_commit(notify_expired, pool_ids)
+
+    if swept:
+        logger.info(f"Swept expired group buys: {dict(swept)}")
+    return swept
+
+
+def notify_expired(pool_ids: List[int]) -> int:
+    """
+    Tell every participant of the given pools how they ended. Runs in
+    the background pool.
+
+    Returns:
+        Number of notifications created
+    """
+    participants = (
+        GroupBuyParticipant.objects
+        .filter(pool_id__in=pool_ids, pool__status__in=MESSAGES)
+        .select_related('pool__input_item')
+        .only('farmer_id', 'pool__status', 'pool__current_quantity', 'pool__target_quantity',
+              'pool__input_item__name', 'pool__input_item__unit')
+    )
+    notifications = []
+    for participant in participants.iterator(chunk_size=1000):
+        pool = participant.pool
+        details = {
+            'item': pool.input_item.name,
+            'current': pool.current_quantity,
+            'target': pool.target_quantity,
+            'unit': pool.input_item.unit,
+        }
+        notifications.append(Notification(
+            user_id=participant.farmer_id,
+            notification_type='group_buy',
+            title=f"Group buy {pool.get_status_display().lower()}: {pool.input_item.name}",
+            message=MESSAGES[pool.status].format(**details),
+            link=reverse('inputs:group_buy_detail', args=[pool.pk]),
+        ))
+    Notification.objects.bulk_create(notifications, batch_size=1000)
+    return len(notifications)
@@ -0,0 +1,160 @@
+"""
+Input Pricing Service
+
+Suppliers give an input any number of volume tiers (DiscountTier); the
+input's own min_group_order / group_discount_percentage is one more.
+An order of q units gets the discount of the highest tier with
+min_quantity <= q.
+
+Quotes are computed in batches: for any set of inputs, three queries
+fetch their prices, tiers and open pools, and every quote is a bisect
+into the input's sorted tiers. The result is cached per input in the
+'input_prices' fragment, and invalidated (per input) when its tiers,
+price or pools change, so pages read prices without per-row queries or
+template arithmetic.
+"""
+
+from bisect import bisect_right
+from collections import defaultdict, namedtuple
+from decimal import Decimal
+from typing import Dict, Iterable, List, Tuple
+
+from django.db import transaction
+
+from inputs.models import AgriculturalInput, DiscountTier, GroupBuyPool
+from marketplace.services import fragment_cache
+
+CENT = Decimal('0.01')
+
+# (min quantity, discount %), sorted by min quantity
+Tier = Tuple[int, Decimal]
+
+Quote = namedtuple('Quote', 'quantity unit_price discount_percentage next_quantity next_discount')
+
+
+# --- QUOTING ---
+
+def price_at(base_price: Decimal, tiers: List[Tier], quantity: int) -> Quote:
+    """
+    Unit price for quantity units, and the next tier up if any
+    """
+    mins = [min_quantity for min_quantity, _ in tiers]
+    index = bisect_right(mins, quantity)
+    discount = tiers[index - 1][1] if index else Decimal('0')
+    next_quantity, next_discount = tiers[index] if index < len(tiers) else (None, None)
+    unit_price = (base_price * (100 - discount) / 100).quantize(CENT)
+    return Quote(quantity, unit_price, discount, next_quantity, next_discount)
+
+
+def _merge(tiers: Iterable[Tier]) -> List[Tier]:
+    # One discount per threshold (the larger), and a larger threshold
+    # never gives a smaller discount than a lower one
+    best = {}
+    for min_quantity, discount in tiers:
+        best[min_quantity] = max(discount, best.get(min_quantity, discount))
+    merged = []
+    for min_quantity in sorted(best):
+        if not merged or best[min_quantity] > merged[-1][1]:
+            merged.append((min_quantity, best[min_quantity]))
+    return merged
+
+
+def build(input_ids: List[int]) -> Dict[int, dict]:
+    """
+    Prices of the given inputs: the full tier table, the best price on
+    offer and a quote per open pool at its current and target quantity
+    """
+    tiers = defaultdict(list)
+    prices = {}
+    for pk, price, min_group_order, group_discount in (
+        AgriculturalInput.objects
+        .filter(pk__in=input_ids)
+        .values_list('pk', 'price', 'min_group_order', 'group_discount_percentage')
+    ):
+        prices[pk] = price
+        if group_discount > 0:
+            tiers[pk].append((max(min_group_order, 1), Decimal(group_discount)))
+
+    for input_id, min_quantity, discount in (
+        DiscountTier.objects
+        .filter(input_item_id__in=input_ids)
+        .values_list('input_item_id', 'min_quantity', 'discount_percentage')
+    ):
+        tiers[input_id].append((min_quantity, discount))
+
+    pools = defaultdict(dict)
+    for pool_id, input_id, current, target in (
+        GroupBuyPool.objects
+        .filter(input_item_id__in=input_ids, status='open')
+        .values_list('pk', 'input_item_id', 'current_quantity', 'target_quantity')
+    ):
+        pools[input_id][pool_id] = (current, target)
+
+    result = {}
+    for input_id, base_price in prices.items():
+        table = _merge(tiers[input_id])
+        result[input_id] = {
+            'price': base_price,
+            'tiers': [price_at(base_price, table, min_quantity) for min_quantity, _ in table],
+            'best': price_at(base_price, table, table[-1][0]) if table else None,
+            'pools': {
+                pool_id: {
+                    'current': price_at(base_price, table, current),
+                    'target': price_at(base_price, table, max(current, target)),
+                }
+                for pool_id, (current, target) in pools[input_id].items()
+            },
+        }
+    return result
+
+
+def quotes(input_ids: Iterable[int]) -> Dict[int, dict]:
+    """
+    Cached prices for many inputs; the uncached ones are built in one
+    batch
+    """
+    return fragment_cache.get_fragments('input_prices', input_ids, build)
+
+
+def invalidate(input_ids: Iterable[int]) -> None:
+    """
+    Drop cached prices once the current transaction commits, so a
+    rebuild never caches rows that are about to change
+    """
+    input_ids = set(input_ids)
+    transaction.on_commit(lambda: [fragment_cache.invalidate('input_prices', scope=pk) for pk in input_ids])
+
+
+# --- PAGES ---
+
+def price_inputs(inputs: Iterable[AgriculturalInput]) -> List[AgriculturalInput]:
+    """
+    Attach .pricing to each input, for listing templates
+    """
+    inputs = list(inputs)
+    prices = quotes(item.pk for item in inputs)
+    for item in inputs:
+        item.pricing = prices.get(item.pk)
+    return inputs
+
+
+def price_pools(pools: Iterable[GroupBuyPool]) -> List[GroupBuyPool]:
+    """
+    Attach .quote ({'current': Quote, 'target': Quote}) to each pool,
+    for listing templates. Open pools' quotes come from the cache;
+    others are priced from the input's cached tiers.
+    """
+    pools = list(pools)
+    prices = quotes(pool.input_item_id for pool in pools)
+    for pool in pools:
+        entry = prices.get(pool.input_item_id)
+        pool.quote = None
+        if entry is not None:
+            pool.quote = entry['pools'].get(pool.pk)
+            if pool.quote is None:
+                table = [(quote.quantity, quote.discount_percentage) for quote in entry['tiers']]
+                pool.quote = {
+                    'current': price_at(entry['price'], table, pool.current_quantity),
+                    'target': price_at(entry['price'], table, max(pool.current_quantity, pool.target_quantity)),
+                }
+    return pools
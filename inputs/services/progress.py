@@ -0,0 +1,186 @@
+"""
+Group Buy Progress Service
+
+Live pool progress for the group buy page, pushed as server-sent events.
+
+Every process keeps one channel per watched pool, shared by all of its
+watchers: the latest progress snapshot, a version number and a
+condition the watchers wait on. When a pool changes (join(),
+sweep_expired(), a save in the admin) publish() reads the new progress
+once, after commit, and wakes that pool's watchers; pools nobody is
+watching are skipped without a query. Database load therefore follows
+the number of changes, not the number of viewers.
+
+Channels live in this process only: a watcher served by another worker
+process sees changes made through that process. Each open stream holds
+a request thread, so streams end after STREAM_SECONDS and the browser's
+EventSource reconnects.
+"""
+
+import json
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count
+
+from inputs.models import GroupBuyPool
+
+# How long one stream stays open before the browser reconnects
+STREAM_SECONDS = 60
+
+# Comment line sent while nothing changes, so proxies keep the stream
+HEARTBEAT_SECONDS = 15
+
+# Browser reconnect delay after a stream ends
+RETRY_MS = 3000
+
+STATUS_LABELS = dict(GroupBuyPool._meta.get_field('status').choices)
+
+Progress = namedtuple('Progress', 'pool_id current target status participants')
+
+
+class _Channel:
+    """
+    Latest progress of one pool, shared by all watchers of it
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.snapshot: Optional[Progress] = None
+        self.version = 0
+        self.watchers = 0
+
+    def update(self, snapshot: Progress) -> None:
+        with self.condition:
+            if snapshot != self.snapshot:
+                self.snapshot = snapshot
+                self.version += 1
+                self.condition.notify_all()
+
+    def current(self) -> Tuple[int, Optional[Progress]]:
+        with self.condition:
+            return self.version, self.snapshot
+
+    def wait(self, version: int, timeout: float) -> Tuple[int, Optional[Progress]]:
+        """
+        Block until the snapshot is newer than version, or timeout
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != version, timeout)
+            return self.version, self.snapshot
+
+
+_channels: Dict[int, _Channel] = {}
+_lock = threading.Lock()
+
+
+def _load(pool_ids: Iterable[int]) -> Iterator[Progress]:
+    rows = (
+        GroupBuyPool.objects
+        .filter(pk__in=list(pool_ids))
+        .annotate(participant_count=Count('participants'))
+        .values_list('pk', 'current_quantity', 'target_quantity', 'status', 'participant_count')
+    )
+    return (Progress(*row) for row in rows)
+
+
+# --- PUBLISHING ---
+
+def publish(pool_ids: Iterable[int]) -> None:
+    """
+    Push the progress of the given pools to their watchers once the
+    current transaction commits
+    """
+    pool_ids = set(pool_ids)
+    transaction.on_commit(lambda: refresh(pool_ids))
+
+
+def refresh(pool_ids: Iterable[int]) -> int:
+    """
+    Re-read the watched pools among pool_ids (one query) and wake
+    their watchers.
+
+    Returns:
+        Number of watched pools refreshed
+    """
+    watched = [pk for pk in pool_ids if pk in _channels]
+    if not watched:
+        return 0
+    for snapshot in _load(watched):
+        channel = _channels.get(snapshot.pool_id)
+        if channel is not None:
+            channel.update(snapshot)
+    return len(watched)
+
+
+# --- WATCHING ---
+
+@contextmanager
+def subscribe(pool_id: int) -> Iterator[_Channel]:
+    """
+    Join (or open) the pool's channel for the duration of the block.
+    Only the first watcher reads the pool; the rest share its snapshot.
+    """
+    with _lock:
+        channel = _channels.get(pool_id)
+        if channel is None:
+            channel = _channels[pool_id] = _Channel()
+        channel.watchers += 1
+    try:
+        if channel.current()[1] is None:
+            for snapshot in _load([pool_id]):
+                # A publish() that landed meanwhile is newer; keep it
+                with channel.condition:
+                    if channel.snapshot is None:
+                        channel.snapshot = snapshot
+                        channel.version += 1
+        yield channel
+    finally:
+        with _lock:
+            channel.watchers -= 1
+            if not channel.watchers:
+                del _channels[pool_id]
+
+
+def as_event(version: int, snapshot: Progress) -> str:
+    """
+    One server-sent event carrying a pool's progress
+    """
+    data = {
+        'current': snapshot.current,
+        'target': snapshot.target,
+        'percentage': round(snapshot.current / snapshot.target * 100, 1) if snapshot.target > 0 else 0,
+        'status': snapshot.status,
+        'status_display': STATUS_LABELS.get(snapshot.status, snapshot.status),
+        'participants': snapshot.participants,
+    }
+    return f"id: {version}\nevent: progress\ndata: {json.dumps(data)}\n\n"
+
+
+def stream(pool_id: int, duration: float = STREAM_SECONDS,
+           heartbeat: float = HEARTBEAT_SECONDS) -> Iterator[str]:
+    """
+    Server-sent events for a pool: its progress now, then every change
+    until the pool stops being open or duration runs out
+    """
+    deadline = time.monotonic() + duration
+    with subscribe(pool_id) as channel:
+        yield f"retry: {RETRY_MS}\n\n"
+        version, snapshot = channel.current()
+        while snapshot is not None:
+            yield as_event(version, snapshot)
+            if snapshot.status != 'open':
+                return
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                latest, snapshot = channel.wait(version, min(heartbeat, remaining))
+                if latest != version:
+                    version = latest
+                    break
+                yield ": keepalive\n\n"
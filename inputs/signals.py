@@ -0,0 +1,32 @@
+"""
+Signal handlers that keep cached input prices and live pool progress up
+to date
+"""
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import AgriculturalInput, DiscountTier, GroupBuyPool
+from .services import pricing, progress
+
+
+@receiver(post_save, sender=AgriculturalInput)
+def input_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    pricing.invalidate([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=DiscountTier)
+@receiver([post_save, post_delete], sender=GroupBuyPool)
+def pricing_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    pricing.invalidate([instance.input_item_id])
+
+
+@receiver(post_save, sender=GroupBuyPool)
+def pool_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    progress.publish([instance.pk])
@@ -1,3 +1,98 @@
-from django.test import TestCase
+import threading
+from datetime import timedelta
 
-# Create your tests here.
+from django.db import connection
+from django.test import Client, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from .models import AgriculturalInput, GroupBuyParticipant, GroupBuyPool, InputCategory
+
+
+class ConcurrentGroupBuyJoinTest(TransactionTestCase):
+    """
+    Hundreds of farmers joining one pool at once: no join is lost and
+    the pool closes exactly once
+    """
+    # Keep the district reference rows seeded by migrations between tests
+    serialized_rollback = True
+
+    FARMERS = 200
+
+    def setUp(self):
+        supplier = User.objects.create_user('supplier', password='x', user_type='input_supplier', location='Kampala')
+        category = InputCategory.objects.create(name='Fertilizers', category_type='fertilizers')
+        self.input_item = AgriculturalInput.objects.create(
+            supplier=supplier, category=category, name='NPK 17-17-17', description='Compound fertilizer',
+            price=150000, quantity_available=10_000, unit='bags',
+        )
+        # No password: hashing hundreds of them would dominate the test
+        User.objects.bulk_create([
+            User(username=f'farmer{i}', user_type='farmer', location='Kampala')
+            for i in range(self.FARMERS)
+        ])
+        self.farmers = list(User.objects.filter(user_type='farmer').order_by('pk'))
+
+    def _pool(self, target):
+        return GroupBuyPool.objects.create(
+            input_item=self.input_item, organizer=self.farmers[0], target_quantity=target,
+            deadline=timezone.now() + timedelta(days=1),
+        )
+
+    def _join(self, pool, farmer, quantity, barrier, results):
+        client = Client()
+        client.force_login(farmer)
+        barrier.wait()
+        try:
+            response = client.post(reverse('inputs:join_group_buy', args=[pool.pk]), {'quantity': quantity})
+            results.append(response.status_code)
+        finally:
+            connection.close()
+
+    def _join_all(self, pool, quantity_for):
+        barrier = threading.Barrier(self.FARMERS)
+        results = []
+        threads = [
+            threading.Thread(target=self._join, args=(pool, farmer, quantity_for(i), barrier, results))
+            for i, farmer in enumerate(self.farmers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [302] * self.FARMERS)
+
+    def test_totals_are_exact(self):
+        pool = self._pool(target=1_000_000)
+        self._join_all(pool, lambda i: i % 5 + 1)
+
+        pool.refresh_from_db()
+        expected = sum(i % 5 + 1 for i in range(self.FARMERS))
+        self.assertEqual(GroupBuyParticipant.objects.filter(pool=pool).count(), self.FARMERS)
+        self.assertEqual(pool.current_quantity, expected)
+        self.assertEqual(pool.status, 'open')
+
+    def test_pool_closes_once_at_target(self):
+        pool = self._pool(target=150)
+        self._join_all(pool, lambda i: 1)
+
+        pool.refresh_from_db()
+        joined = list(GroupBuyParticipant.objects.filter(pool=pool).values_list('quantity', flat=True))
+        # The 150th join closes the pool; everyone after it is turned away
+        self.assertEqual(len(joined), 150)
+        self.assertEqual(pool.current_quantity, sum(joined))
+        self.assertEqual(pool.status, 'closed')
+
+    def test_second_join_by_same_farmer_changes_nothing(self):
+        pool = self._pool(target=100)
+        client = Client()
+        client.force_login(self.farmers[1])
+        url = reverse('inputs:join_group_buy', args=[pool.pk])
+
+        client.post(url, {'quantity': 10})
+        client.post(url, {'quantity': 10})
+
+        pool.refresh_from_db()
+        self.assertEqual(pool.current_quantity, 10)
+        self.assertEqual(GroupBuyParticipant.objects.filter(pool=pool).count(), 1)
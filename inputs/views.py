@@ -1,9 +1,13 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q, Sum
+from django.http import StreamingHttpResponse
+from django.db.models import Count, Q
 from django.utils import timezone
-from .models import AgriculturalInput, InputCategory, GroupBuyPool, GroupBuyParticipant
+from django.utils.dateparse import parse_date
+from datetime import datetime, time
+from .models import AgriculturalInput, InputCategory, GroupBuyPool
+from .services import demand, group_buy, pricing, progress
 
 def input_store(request):
     """
@@ -27,14 +31,14 @@ def input_store(request):
     
     categories = InputCategory.objects.all()
     
-    # Active group buy pools
+    # Active group buy pools, ending soonest first (partial index on open pools)
     active_pools = GroupBuyPool.objects.filter(
         status='open',
         deadline__gte=timezone.now()
-    )[:4]
+    ).select_related('input_item').order_by('deadline')[:4]
     
     context = {
-        'inputs': inputs,
+        'inputs': pricing.price_inputs(inputs.select_related('category', 'supplier')),
         'categories': categories,
         'active_pools': active_pools,
         'selected_category': category_id,
@@ -61,17 +65,64 @@ def input_detail(request, pk):
         input_item=input_item,
         status='open',
         deadline__gte=timezone.now()
-    )
+    ).order_by('deadline')
+    
+    # The farmer's requests still waiting for a group
+    pending_demand = []
+    if request.user.is_authenticated:
+        pending_demand = input_item.demands.filter(farmer=request.user, status='pending')
+    
+    pricing.price_inputs([input_item])
     
     context = {
         'input_item': input_item,
         'related_inputs': related_inputs,
-        'active_pools': active_pools,
+        'active_pools': pricing.price_pools(active_pools),
+        'pending_demand': pending_demand,
     }
     
     return render(request, 'inputs/input_detail.html', context)
 
 
+@login_required
+def request_input(request, pk):
+    """
+    Record how much of an input the farmer needs and by when (POST);
+    matching demand from nearby farmers is formed into group buys
+    """
+    input_item = get_object_or_404(AgriculturalInput, pk=pk)
+    if request.method != 'POST':
+        return redirect('inputs:input_detail', pk=pk)
+    
+    if request.user.user_type != 'farmer':
+        messages.error(request, 'Only farmers can request inputs for group buys!')
+        return redirect('inputs:input_detail', pk=pk)
+    
+    try:
+        # None when malformed; ValueError for impossible dates like 2026-02-30
+        needed_by = parse_date(request.POST.get('needed_by', ''))
+    except ValueError:
+        needed_by = None
+    try:
+        quantity = int(request.POST.get('quantity', 0))
+    except ValueError:
+        quantity = 0
+    if needed_by is None:
+        messages.error(request, 'Please choose the date you need it by.')
+        return redirect('inputs:input_detail', pk=pk)
+    
+    # End of the chosen day
+    deadline = timezone.make_aware(datetime.combine(needed_by, time.max))
+    try:
+        demand.submit(request.user, input_item, quantity, deadline)
+    except demand.DemandError as e:
+        messages.error(request, str(e))
+        return redirect('inputs:input_detail', pk=pk)
+    
+    messages.success(request, "Request saved! We'll group it with farmers near you who need the same input.")
+    return redirect('inputs:input_detail', pk=pk)
+
+
 @login_required
 def create_group_buy(request, input_id):
     """
@@ -84,25 +135,15 @@ def create_group_buy(request, input_id):
         my_quantity = int(request.POST.get('my_quantity'))
         deadline = request.POST.get('deadline')
         
-        # Create pool
-        pool = GroupBuyPool.objects.create(
-            input_item=input_item,
-            organizer=request.user,
-            target_quantity=target_quantity,
-            current_quantity=my_quantity,
-            deadline=deadline,
-            status='open'
-        )
-        
-        # Add organizer as first participant
-        GroupBuyParticipant.objects.create(
-            pool=pool,
-            farmer=request.user,
-            quantity=my_quantity
-        )
+        # Create pool with the organizer as first participant
+        try:
+            pool = group_buy.create_pool(input_item, request.user, target_quantity, my_quantity, deadline)
+        except group_buy.GroupBuyError as e:
+            messages.error(request, str(e))
+            return redirect('inputs:input_detail', pk=input_item.pk)
         
         messages.success(request, 'Group buy pool created! Share with other farmers to reach the target.')
-        return redirect('group_buy_detail', pool_id=pool.id)
+        return redirect('inputs:group_buy_detail', pool_id=pool.id)
     
     context = {
         'input_item': input_item
@@ -115,15 +156,19 @@ def group_buy_detail(request, pool_id):
     """
     Group buy pool detail and join page
     """
-    pool = get_object_or_404(GroupBuyPool, pk=pool_id)
-    participants = pool.participants.all()
+    pool = get_object_or_404(
+        GroupBuyPool.objects.select_related('input_item__supplier', 'organizer'), pk=pool_id
+    )
+    participants = list(pool.participants.select_related('farmer'))
     
     # Check if user already joined
-    user_participation = participants.filter(farmer=request.user).first()
+    user_participation = next((p for p in participants if p.farmer_id == request.user.pk), None)
     
-    # Calculate progress
+    # Calculate progress; later changes arrive via group_buy_progress
     progress_percentage = (pool.current_quantity / pool.target_quantity * 100) if pool.target_quantity > 0 else 0
     
+    pricing.price_pools([pool])
+    
     context = {
         'pool': pool,
         'participants': participants,
@@ -134,44 +179,44 @@ def group_buy_detail(request, pool_id):
     return render(request, 'inputs/group_buy_detail.html', context)
 
 
+@login_required
+def group_buy_progress(request, pool_id):
+    """
+    Live pool progress as server-sent events
+    """
+    pool = get_object_or_404(GroupBuyPool.objects.only('pk'), pk=pool_id)
+    response = StreamingHttpResponse(progress.stream(pool.pk), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 @login_required
 def join_group_buy(request, pool_id):
     """
-    Join an existing group buy pool
+    Join an existing group buy pool (POST)
     """
     pool = get_object_or_404(GroupBuyPool, pk=pool_id)
     
-    # Check if already joined
-    if pool.participants.filter(farmer=request.user).exists():
-        messages.error(request, 'You have already joined this group buy!')
-        return redirect('group_buy_detail', pool_id=pool.id)
-    
-    if request.method == 'POST':
-        quantity = int(request.POST.get('quantity'))
-        
-        # Add participant
-        GroupBuyParticipant.objects.create(
-            pool=pool,
-            farmer=request.user,
-            quantity=quantity
-        )
-        
-        # Update pool quantity
-        pool.current_quantity += quantity
-        
-        # Check if target reached
-        if pool.current_quantity >= pool.target_quantity:
-            pool.status = 'closed'
-        
-        pool.save()
-        
-        messages.success(request, f'Successfully joined group buy! {quantity} units added.')
-        return redirect('group_buy_detail', pool_id=pool.id)
-    
-    context = {
-        'pool': pool
-    }
-    return render(request, 'inputs/join_group_buy.html', context)
+    if request.method != 'POST':
+        return redirect('inputs:group_buy_detail', pool_id=pool.id)
+    
+    try:
+        quantity = int(request.POST.get('quantity', 0))
+    except ValueError:
+        quantity = 0
+    
+    # One atomic UPDATE on the pool's total, see services.group_buy
+    try:
+        result = group_buy.join(pool.pk, request.user, quantity)
+    except group_buy.GroupBuyError as e:
+        messages.error(request, str(e))
+        return redirect('inputs:group_buy_detail', pool_id=pool.id)
+    
+    messages.success(request, f'Successfully joined group buy! {quantity} units added.')
+    if result.closed:
+        messages.success(request, 'The target has been reached - this group buy is now closed.')
+    return redirect('inputs:group_buy_detail', pool_id=pool.id)
 
 
 def group_buy_list(request):
@@ -181,10 +226,12 @@ def group_buy_list(request):
     active_pools = GroupBuyPool.objects.filter(
         status='open',
         deadline__gte=timezone.now()
-    ).select_related('input_item', 'organizer')
+    ).select_related('input_item', 'organizer').annotate(
+        participant_count=Count('participants')
+    ).order_by('deadline')
     
     context = {
-        'pools': active_pools
+        'pools': pricing.price_pools(active_pools)
     }
     
     return render(request, 'inputs/group_buy_list.html', context)
\ No newline at end of file
@@ -0,0 +1,26 @@
+from django.contrib import admin
+from .models import StockMovement, StockSnapshot
+
+# The ledger is append-only, so both are read-only in admin
+@admin.register(StockMovement)
+class StockMovementAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kind', 'item_id', 'delta', 'reason', 'reference', 'actor', 'created_at']
+    list_filter = ['kind', 'reason']
+    search_fields = ['=item_id', 'reference', 'actor__username']
+    readonly_fields = ['kind', 'item_id', 'delta', 'reason', 'reference', 'actor', 'created_at']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+@admin.register(StockSnapshot)
+class StockSnapshotAdmin(admin.ModelAdmin):
+    list_display = ['kind', 'item_id', 'quantity', 'last_movement_id', 'taken_at']
+    list_filter = ['kind']
+    search_fields = ['=item_id']
+    readonly_fields = ['kind', 'item_id', 'quantity', 'last_movement_id', 'taken_at']
+
+    def has_add_permission(self, request):
+        return False
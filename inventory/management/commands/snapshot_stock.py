@@ -0,0 +1,51 @@
+"""
+Django management command to snapshot the stock ledger
+
+Stores the balance of every product and input that moved since the
+last run, so ledger balances only ever sum a short tail of movements.
+Schedule it nightly via cron. With --verify it also compares the ledger
+with the stock columns and lists items changed outside the ledger;
+--correct appends correction movements for them.
+
+Usage:
+    python manage.py snapshot_stock
+    python manage.py snapshot_stock --verify
+    python manage.py snapshot_stock --verify --correct
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from inventory.services import ledger
+
+
+class Command(BaseCommand):
+    help = 'Snapshot stock balances and optionally audit them against stock columns'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify', action='store_true', help='Compare the ledger with the stock columns')
+        parser.add_argument('--correct', action='store_true', help='Record corrections for drifted items (implies --verify)')
+
+    def handle(self, *args, **options):
+        if options['verify'] or options['correct']:
+            self.verify(options['correct'])
+
+        taken = ledger.take_snapshots()
+        self.stdout.write(self.style.SUCCESS(f'✓ Took {taken} stock snapshots'))
+
+    def verify(self, correct):
+        self.stdout.write(self.style.NOTICE('Verifying stock ledger...'))
+        with transaction.atomic():
+            drifts = [drift for kind in ledger.ITEMS for drift in ledger.verify(kind)]
+            for drift in drifts:
+                self.stdout.write(
+                    f'  {drift.kind} #{drift.item_id}: ledger {drift.ledger}, actual {drift.actual}'
+                )
+            if drifts and correct:
+                ledger.correct(drifts)
+
+        if not drifts:
+            self.stdout.write(self.style.SUCCESS('✓ Ledger matches stock'))
+        elif correct:
+            self.stdout.write(self.style.WARNING(f'Corrected {len(drifts)} items'))
+        else:
+            self.stdout.write(self.style.WARNING(f'{len(drifts)} items differ; use --correct to record corrections'))
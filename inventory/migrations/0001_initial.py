@@ -0,0 +1,73 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def open_ledger(apps, schema_editor):
+    """
+    Start the ledger from the stock on hand
+    """
+    StockMovement = apps.get_model('inventory', 'StockMovement')
+    Product = apps.get_model('marketplace', 'Product')
+    AgriculturalInput = apps.get_model('inputs', 'AgriculturalInput')
+
+    for kind, model, column in (('product', Product, 'quantity'), ('input', AgriculturalInput, 'quantity_available')):
+        StockMovement.objects.bulk_create(
+            [
+                StockMovement(kind=kind, item_id=pk, delta=quantity, reason='opening')
+                for pk, quantity in model.objects.exclude(**{column: 0}).values_list('pk', column).iterator()
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('inputs', '0001_initial'),
+        ('marketplace', '0010_product_district'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('product', 'Product'), ('input', 'Agricultural Input')], max_length=10)),
+                ('item_id', models.BigIntegerField()),
+                ('quantity', models.IntegerField()),
+                ('last_movement_id', models.BigIntegerField(help_text='Last ledger row included in quantity')),
+                ('taken_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Stock Snapshot',
+                'verbose_name_plural': 'Stock Snapshots',
+                'constraints': [models.UniqueConstraint(fields=('kind', 'item_id', 'last_movement_id'), name='unique_stock_snapshot')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('product', 'Product'), ('input', 'Agricultural Input')], max_length=10)),
+                ('item_id', models.BigIntegerField()),
+                ('delta', models.IntegerField(help_text='Units added (positive) or removed (negative)')),
+                ('reason', models.CharField(choices=[('opening', 'Opening Balance'), ('sale', 'Sale'), ('cancellation', 'Order Cancelled'), ('adjustment', 'Manual Adjustment'), ('correction', 'Ledger Correction')], max_length=20)),
+                ('reference', models.CharField(blank=True, help_text='Order number or other document behind the change', max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('actor', models.ForeignKey(blank=True, help_text='User who made the change', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stock_movements', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Stock Movement',
+                'verbose_name_plural': 'Stock Movements',
+                'ordering': ['-id'],
+                'indexes': [models.Index(fields=['kind', 'item_id', 'id'], name='inventory_movement_item_idx')],
+            },
+        ),
+        migrations.RunPython(open_ledger, migrations.RunPython.noop),
+    ]
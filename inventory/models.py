@@ -0,0 +1,85 @@
+from django.db import models
+from accounts.models import User
+
+# Stocked item types; item_id refers to the model's primary key
+ITEM_KINDS = (
+    ('product', 'Product'),
+    ('input', 'Agricultural Input'),
+)
+
+
+class StockMovement(models.Model):
+    """
+    Append-only ledger of stock changes for products and inputs. Written
+    by services.ledger; rows are never updated or deleted.
+
+    Items are referenced by kind and id rather than a foreign key, so
+    the history of a deleted product stays in the ledger.
+    """
+    REASONS = (
+        ('opening', 'Opening Balance'),
+        ('sale', 'Sale'),
+        ('cancellation', 'Order Cancelled'),
+        ('adjustment', 'Manual Adjustment'),
+        ('correction', 'Ledger Correction'),
+    )
+    
+    kind = models.CharField(max_length=10, choices=ITEM_KINDS)
+    item_id = models.BigIntegerField()
+    delta = models.IntegerField(help_text="Units added (positive) or removed (negative)")
+    reason = models.CharField(max_length=20, choices=REASONS)
+    reference = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text="Order number or other document behind the change"
+    )
+    actor = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='stock_movements',
+        help_text="User who made the change"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.kind} #{self.item_id}: {self.delta:+d} ({self.reason})"
+    
+    def save(self, *args, **kwargs):
+        if self.pk:
+            raise ValueError("Stock movements are append-only")
+        super().save(*args, **kwargs)
+    
+    class Meta:
+        verbose_name = "Stock Movement"
+        verbose_name_plural = "Stock Movements"
+        ordering = ['-id']
+        indexes = [
+            # One item's history and the tail after its snapshot
+            models.Index(fields=['kind', 'item_id', 'id'], name='inventory_movement_item_idx'),
+        ]
+
+
+class StockSnapshot(models.Model):
+    """
+    An item's balance after every movement up to last_movement_id.
+    Current stock is the latest snapshot plus the item's movements after
+    it, so balances never sum the whole ledger.
+    """
+    kind = models.CharField(max_length=10, choices=ITEM_KINDS)
+    item_id = models.BigIntegerField()
+    quantity = models.IntegerField()
+    last_movement_id = models.BigIntegerField(help_text="Last ledger row included in quantity")
+    taken_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.kind} #{self.item_id}: {self.quantity} at movement {self.last_movement_id}"
+    
+    class Meta:
+        verbose_name = "Stock Snapshot"
+        verbose_name_plural = "Stock Snapshots"
+        constraints = [
+            # Also the index that finds an item's latest snapshot
+            models.UniqueConstraint(fields=['kind', 'item_id', 'last_movement_id'], name='unique_stock_snapshot'),
+        ]
@@ -0,0 +1,237 @@
+"""
+Stock Ledger Service
+
+Every change to Product.quantity or AgriculturalInput.quantity_available
+is also appended to the StockMovement ledger, with its reason, the
+order number or other reference behind it, and the user who made it.
+The quantity columns stay the fast path for reads and for the
+conditional stock UPDATEs; the ledger explains how they got there.
+
+take_snapshots() (run periodically by the snapshot_stock command)
+stores each changed item's balance as a StockSnapshot. An item's
+balance is its latest snapshot plus the short tail of movements after
+it, read through the (kind, item_id, id) index:
+
+    balance = snapshot.quantity + SUM(delta WHERE id > snapshot.last_movement_id)
+
+verify() compares these balances with the quantity columns and
+reports (or corrects) items that were changed outside the ledger,
+e.g. from a script or the shell.
+"""
+
+from collections import namedtuple
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Max, OuterRef, Subquery, Sum
+
+from inputs.models import AgriculturalInput
+from inventory.models import StockMovement, StockSnapshot
+from marketplace.models import Product
+from orders.models import OrderItem
+
+PRODUCT = 'product'
+INPUT = 'input'
+
+# kind -> (model, stock column)
+ITEMS = {
+    PRODUCT: (Product, 'quantity'),
+    INPUT: (AgriculturalInput, 'quantity_available'),
+}
+
+# (item id, delta, reference)
+Change = Tuple[int, int, str]
+Drift = namedtuple('Drift', 'kind item_id ledger actual')
+
+
+# --- RECORDING ---
+
+def record(kind: str, changes: Iterable[Change], reason: str, actor=None) -> List[StockMovement]:
+    """
+    Append one movement per change; zero changes are skipped
+    """
+    return StockMovement.objects.bulk_create([
+        StockMovement(kind=kind, item_id=item_id, delta=delta, reason=reason,
+                      reference=reference[:100], actor=actor)
+        for item_id, delta, reference in changes if delta
+    ])
+
+
+def record_orders(order_ids: Iterable[int], reason: str, actor=None) -> List[StockMovement]:
+    """
+    Log the stock taken by newly placed orders (reason 'sale') or
+    returned by cancelled ones ('cancellation'), one movement per order
+    line, referencing the order number
+    """
+    sign = 1 if reason == 'cancellation' else -1
+    items = (
+        OrderItem.objects
+        .filter(order_id__in=list(order_ids))
+        .values_list('product_id', 'quantity', 'order__order_number')
+        .order_by('order_id', 'pk')
+    )
+    return record(
+        PRODUCT,
+        ((product_id, sign * quantity, number) for product_id, quantity, number in items),
+        reason,
+        actor,
+    )
+
+
+def record_adjustment(kind: str, item_id: int, old: int, new: int, actor=None, reference: str = '') -> None:
+    """
+    Log a quantity set by hand (listing edits, the admin)
+    """
+    record(kind, [(item_id, int(new) - int(old), reference)], 'adjustment', actor)
+
+
+@transaction.atomic
+def save_item(kind: str, obj, actor=None) -> None:
+    """
+    Save a product or input whose stock was set by hand, logging the
+    difference from the stock it overwrites (which may have moved since
+    the form was loaded) or, for a new item, its opening stock
+    """
+    model, column = ITEMS[kind]
+    current = None
+    if obj.pk:
+        current = model.objects.select_for_update().filter(pk=obj.pk).values_list(column, flat=True).first()
+    obj.save()
+    quantity = int(getattr(obj, column))
+    if current is None:
+        record(kind, [(obj.pk, quantity, '')], 'opening', actor)
+    else:
+        record_adjustment(kind, obj.pk, current, quantity, actor)
+
+
+# --- BALANCES ---
+
+def _latest_snapshot(kind: str):
+    return StockSnapshot.objects.filter(kind=kind, item_id=OuterRef('item_id')).order_by('-last_movement_id')
+
+
+def balance(kind: str, item_id: int) -> int:
+    """
+    An item's stock according to the ledger
+    """
+    snapshot = (
+        StockSnapshot.objects
+        .filter(kind=kind, item_id=item_id)
+        .order_by('-last_movement_id')
+        .values_list('quantity', 'last_movement_id')
+        .first()
+    )
+    quantity, after = snapshot or (0, 0)
+    tail = (
+        StockMovement.objects
+        .filter(kind=kind, item_id=item_id, pk__gt=after)
+        .aggregate(total=Sum('delta'))['total']
+    )
+    return quantity + (tail or 0)
+
+
+def balances(kind: str, item_ids: Optional[Iterable[int]] = None) -> Dict[int, int]:
+    """
+    Ledger stock of many items (default: every item in the ledger) with
+    two set-based queries
+    """
+    snapshots = StockSnapshot.objects.filter(kind=kind)
+    movements = StockMovement.objects.filter(kind=kind)
+    if item_ids is not None:
+        item_ids = list(item_ids)
+        snapshots = snapshots.filter(item_id__in=item_ids)
+        movements = movements.filter(item_id__in=item_ids)
+
+    latest = dict(
+        snapshots
+        .filter(last_movement_id=Subquery(_latest_snapshot(kind).values('last_movement_id')[:1]))
+        .values_list('item_id', 'quantity')
+    )
+    # Snapshots are taken for every changed item at once, so no item has
+    # unsnapshotted movements before the newest snapshot's watermark
+    watermark = snapshots.aggregate(last=Max('last_movement_id'))['last'] or 0
+    tails = dict(
+        movements
+        .filter(pk__gt=watermark)
+        .values('item_id')
+        .annotate(total=Sum('delta'))
+        .values_list('item_id', 'total')
+    )
+    return {
+        item_id: latest.get(item_id, 0) + tails.get(item_id, 0)
+        for item_id in latest.keys() | tails.keys()
+    }
+
+
+def history(kind: str, item_id: int, before: Optional[int] = None, limit: int = 50) -> List[StockMovement]:
+    """
+    An item's movements, newest first; pass the last id seen as before
+    to page back
+    """
+    movements = StockMovement.objects.filter(kind=kind, item_id=item_id).select_related('actor')
+    if before:
+        movements = movements.filter(pk__lt=before)
+    return list(movements.order_by('-pk')[:limit])
+
+
+# --- SNAPSHOTS ---
+
+@transaction.atomic
+def take_snapshots() -> int:
+    """
+    Snapshot every item with movements since the last run, from its
+    previous snapshot and its tail (one GROUP BY over the tail only).
+
+    Returns:
+        Number of snapshots taken
+    """
+    watermark = StockSnapshot.objects.aggregate(last=Max('last_movement_id'))['last'] or 0
+    latest = StockMovement.objects.aggregate(last=Max('pk'))['last']
+    if not latest or latest <= watermark:
+        return 0
+
+    snapshots = []
+    for kind in ITEMS:
+        tails = (
+            StockMovement.objects
+            .filter(kind=kind, pk__gt=watermark, pk__lte=latest)
+            .values('item_id')
+            .annotate(
+                total=Sum('delta'),
+                previous=Subquery(_latest_snapshot(kind).values('quantity')[:1]),
+            )
+            .values_list('item_id', 'total', 'previous')
+        )
+        snapshots.extend(
+            StockSnapshot(kind=kind, item_id=item_id, quantity=(previous or 0) + total, last_movement_id=latest)
+            for item_id, total, previous in tails
+        )
+    StockSnapshot.objects.bulk_create(snapshots, batch_size=1000)
+    return len(snapshots)
+
+
+# --- AUDIT ---
+
+def verify(kind: str) -> List[Drift]:
+    """
+    Items whose stock column disagrees with the ledger
+    """
+    model, column = ITEMS[kind]
+    ledger = balances(kind)
+    actual = dict(model.objects.values_list('pk', column))
+    return [
+        Drift(kind, item_id, ledger.get(item_id, 0), actual.get(item_id, 0))
+        for item_id in sorted(ledger.keys() | actual.keys())
+        if ledger.get(item_id, 0) != actual.get(item_id, 0)
+    ]
+
+
+def correct(drifts: Iterable[Drift]) -> int:
+    """
+    Append movements that bring the ledger in line with the stock
+    columns; the columns are taken as the truth
+    """
+    by_kind = {}
+    for drift in drifts:
+        by_kind.setdefault(drift.kind, []).append((drift.item_id, drift.actual - drift.ledger, ''))
+    return sum(len(record(kind, changes, 'correction')) for kind, changes in by_kind.items())
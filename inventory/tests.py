@@ -0,0 +1,64 @@
+from django.test import TestCase
+
+from accounts.models import User
+from marketplace.models import Product
+from .models import StockSnapshot
+from .services import ledger
+
+
+class LedgerBalanceTest(TestCase):
+    """
+    Balance is the latest snapshot plus the movements after it, and
+    verify() finds stock changed outside the ledger
+    """
+
+    def setUp(self):
+        self.farmer = User.objects.create_user('farmer', password='x', user_type='farmer')
+        self.product = Product.objects.create(
+            farmer=self.farmer, name='Maize', description='Dry maize',
+            price=900, quantity=10, unit='kg',
+        )
+        ledger.record(ledger.PRODUCT, [(self.product.pk, 10, '')], 'opening', self.farmer)
+
+    def _move(self, delta, reason):
+        ledger.record(ledger.PRODUCT, [(self.product.pk, delta, 'ORD-1')], reason)
+
+    def test_balance_without_snapshot_sums_movements(self):
+        self._move(-3, 'sale')
+
+        self.assertEqual(ledger.balance(ledger.PRODUCT, self.product.pk), 7)
+        self.assertEqual(ledger.balances(ledger.PRODUCT), {self.product.pk: 7})
+
+    def test_balance_is_snapshot_plus_tail(self):
+        self._move(-3, 'sale')
+        self.assertEqual(ledger.take_snapshots(), 1)
+        snapshot = StockSnapshot.objects.get()
+        self.assertEqual(snapshot.quantity, 7)
+
+        self._move(-2, 'sale')
+        self._move(1, 'cancellation')
+
+        self.assertEqual(ledger.balance(ledger.PRODUCT, self.product.pk), 6)
+        self.assertEqual(ledger.balances(ledger.PRODUCT, [self.product.pk]), {self.product.pk: 6})
+
+    def test_second_snapshot_builds_on_the_first(self):
+        ledger.take_snapshots()
+        self._move(-4, 'sale')
+        self.assertEqual(ledger.take_snapshots(), 1)
+        self.assertEqual(ledger.take_snapshots(), 0)
+
+        latest = StockSnapshot.objects.order_by('-last_movement_id').first()
+        self.assertEqual(latest.quantity, 6)
+        self.assertEqual(ledger.balance(ledger.PRODUCT, self.product.pk), 6)
+
+    def test_verify_and_correct(self):
+        self.assertEqual(ledger.verify(ledger.PRODUCT), [])
+
+        # Changed outside the ledger, e.g. from the shell
+        Product.objects.filter(pk=self.product.pk).update(quantity=15)
+        drifts = ledger.verify(ledger.PRODUCT)
+        self.assertEqual(drifts, [ledger.Drift(ledger.PRODUCT, self.product.pk, 10, 15)])
+
+        self.assertEqual(ledger.correct(drifts), 1)
+        self.assertEqual(ledger.verify(ledger.PRODUCT), [])
+        self.assertEqual(ledger.balance(ledger.PRODUCT, self.product.pk), 15)
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Category, Product, MarketPrice, ExternalMarketPrice, CrowdsourcedPrice, Review, ReviewResponse
+from inventory.services import ledger
+from .models import Category, Product, ProductListing, ListingFingerprint, PlatformCounter, ProductRecommendation, MarketPrice, ExternalMarketPrice, CrowdsourcedPrice, Review, ReviewResponse
 
 # Customize Category admin
 class CategoryAdmin(admin.ModelAdmin):
@@ -13,6 +14,42 @@ class ProductAdmin(admin.ModelAdmin):
     search_fields = ['name', 'description', 'farmer__username']
     list_editable = ['status', 'is_urgent']  # Added is_urgent for quick editing
 
+    def save_model(self, request, obj, form, change):
+        ledger.save_item(ledger.PRODUCT, obj, request.user)
+
+# Read model - maintained by signals, so read-only in admin
+@admin.register(ProductListing)
+class ProductListingAdmin(admin.ModelAdmin):
+    list_display = ['name', 'farmer_username', 'category_name', 'farmer_district', 'price', 'quantity', 'refreshed_at']
+    list_filter = ['farmer_region', 'is_urgent']
+    search_fields = ['name', 'farmer_username']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(ListingFingerprint)
+class ListingFingerprintAdmin(admin.ModelAdmin):
+    list_display = ['product', 'duplicate_of', 'similarity', 'image_hash', 'updated_at']
+    list_filter = [('duplicate_of', admin.EmptyFieldListFilter)]
+    search_fields = ['product__name']
+    raw_id_fields = ['product', 'duplicate_of']
+    readonly_fields = ['minhash', 'image_name', 'image_hash', 'similarity']
+
+@admin.register(ProductRecommendation)
+class ProductRecommendationAdmin(admin.ModelAdmin):
+    list_display = ['product', 'rank', 'neighbour', 'score', 'co_buyers', 'computed_at']
+    search_fields = ['product__name', 'neighbour__name']
+    raw_id_fields = ['product', 'neighbour']
+
+@admin.register(PlatformCounter)
+class PlatformCounterAdmin(admin.ModelAdmin):
+    list_display = ['name', 'scope', 'scope_key', 'value', 'updated_at']
+    list_filter = ['name', 'scope']
+    search_fields = ['scope_key']
+
 # Customize Market Price admin
 class MarketPriceAdmin(admin.ModelAdmin):
     list_display = ['product_name', 'market_location', 'average_price', 'unit', 'date_recorded']
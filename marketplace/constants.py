@@ -4,7 +4,7 @@ Constants for Uganda Districts, Regions, and Coordinates.
 
 UGANDA_REGIONS = {
     'Central': [
-        'Kampala', 'Entebbe', 'Wakiso', 'Mukono', 'Masaka', 'Jinja', 'Luweero', 
+        'Kampala', 'Entebbe', 'Wakiso', 'Mukono', 'Masaka', 'Luweero', 
         'Mpigi', 'Nakasongola', 'Rakai', 'Kalangala', 'Lyantonde', 'Sembabule', 'Bukomansimbi'
     ],
     'Western': [
@@ -55,3 +55,9 @@ ALL_DISTRICTS = sorted(list(set(
 
 # Tuple choices for Django models
 DISTRICT_CHOICES = [(d, d) for d in ALL_DISTRICTS]
+
+# Reverse lookup district -> region (first region wins, as in farmer_list)
+DISTRICT_REGIONS = {}
+for _region, _districts in UGANDA_REGIONS.items():
+    for _district in _districts:
+        DISTRICT_REGIONS.setdefault(_district, _region)
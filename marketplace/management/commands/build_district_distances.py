@@ -0,0 +1,19 @@
+"""
+Django management command to rebuild the district-to-district distance table
+
+Run after adding or correcting entries in DISTRICT_COORDINATES.
+
+Usage:
+    python manage.py build_district_distances
+"""
+
+from django.core.management.base import BaseCommand
+from marketplace.services.geo import rebuild_distance_table
+
+
+class Command(BaseCommand):
+    help = 'Rebuild DistrictDistance from DISTRICT_COORDINATES'
+
+    def handle(self, *args, **options):
+        rows = rebuild_distance_table()
+        self.stdout.write(self.style.SUCCESS(f'✓ Stored {rows} district distances'))
@@ -0,0 +1,27 @@
+"""
+Django management command to rebuild item-item recommendations from order history
+
+Usage:
+    python manage.py build_recommendations
+    python manage.py build_recommendations --top-k 20
+"""
+
+from django.core.management.base import BaseCommand
+from marketplace.services.recommendations import rebuild_recommendations, TOP_K
+
+
+class Command(BaseCommand):
+    help = 'Rebuild "buyers also bought" recommendations from OrderItem history'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top-k',
+            type=int,
+            default=TOP_K,
+            help=f'Neighbours to keep per product (default {TOP_K})',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.NOTICE('Building product recommendations...'))
+        rows = rebuild_recommendations(top_k=options['top_k'])
+        self.stdout.write(self.style.SUCCESS(f'✓ Stored {rows} recommendations'))
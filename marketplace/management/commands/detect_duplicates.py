@@ -0,0 +1,38 @@
+"""
+Django management command to fingerprint products and flag near-duplicates
+
+Usage:
+    python manage.py detect_duplicates
+    python manage.py detect_duplicates --rebuild
+"""
+
+from django.core.management.base import BaseCommand
+from marketplace.models import Product, ListingFingerprint, LSHBucket
+from marketplace.services.near_duplicates import check_product
+
+
+class Command(BaseCommand):
+    help = 'Build the LSH index for existing products and flag near-duplicate listings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Drop all fingerprints and rebuild the index from scratch',
+        )
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            LSHBucket.objects.all().delete()
+            ListingFingerprint.objects.all().delete()
+
+        # Oldest first, so each product is compared against everything before it
+        product_ids = Product.objects.order_by('pk').values_list('pk', flat=True)
+        self.stdout.write(self.style.NOTICE(f'Checking {len(product_ids)} products...'))
+
+        flagged = 0
+        for product_id in product_ids:
+            if check_product(product_id):
+                flagged += 1
+
+        self.stdout.write(self.style.SUCCESS(f'✓ {flagged} near-duplicate listings flagged'))
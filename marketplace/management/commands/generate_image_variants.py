@@ -0,0 +1,48 @@
+"""
+Django management command to backfill responsive image variants
+
+Usage:
+    python manage.py generate_image_variants
+    python manage.py generate_image_variants --force --workers 4
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from marketplace.services.image_variants import IMAGE_FIELDS, generate_variants
+
+
+class Command(BaseCommand):
+    help = 'Generate thumbnail/card/detail WebP and JPEG variants for existing uploads'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate variants that already exist'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Number of parallel workers (default: 4)'
+        )
+
+    def handle(self, *args, **options):
+        names = set()
+        for label, fields in IMAGE_FIELDS.items():
+            model = apps.get_model(label)
+            for field in fields:
+                names.update(
+                    model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+                    .values_list(field, flat=True)
+                )
+
+        self.stdout.write(self.style.NOTICE(f'Processing {len(names)} images...'))
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            results = pool.map(lambda name: generate_variants(name, force=options['force']), sorted(names))
+            written = sum(len(r) for r in results)
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Wrote {written} variant files'))
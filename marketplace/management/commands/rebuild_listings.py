@@ -0,0 +1,18 @@
+"""
+Django management command to rebuild the product listing read model
+
+Usage:
+    python manage.py rebuild_listings
+"""
+
+from django.core.management.base import BaseCommand
+from marketplace.services.listings import rebuild_listings
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the denormalized ProductListing table from Product'
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.NOTICE('Rebuilding product listings...'))
+        created = rebuild_listings()
+        self.stdout.write(self.style.SUCCESS(f'✓ Rebuilt {created} product listings'))
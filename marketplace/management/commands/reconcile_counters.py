@@ -0,0 +1,25 @@
+"""
+Django management command to reconcile platform counters
+
+Recomputes product, farmer and order totals from the source tables and
+repairs any counter that drifted. Schedule it periodically (e.g. nightly
+via cron) alongside fetch_market_prices.
+
+Usage:
+    python manage.py reconcile_counters
+"""
+
+from django.core.management.base import BaseCommand
+from marketplace.services.counters import reconcile
+
+
+class Command(BaseCommand):
+    help = 'Recompute platform counters from products and orders'
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.NOTICE('Reconciling platform counters...'))
+        drifted = reconcile()
+        if drifted:
+            self.stdout.write(self.style.WARNING(f'Repaired {drifted} drifted counters'))
+        else:
+            self.stdout.write(self.style.SUCCESS('✓ All counters are accurate'))
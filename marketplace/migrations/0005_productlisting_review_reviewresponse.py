@@ -0,0 +1,142 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:36
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_listings(apps, schema_editor):
+    """
+    Build listing rows for the products already available, from the
+    schema as of this migration (services.listings needs later columns)
+    """
+    from marketplace.constants import DISTRICT_REGIONS
+
+    Product = apps.get_model('marketplace', 'Product')
+    ProductListing = apps.get_model('marketplace', 'ProductListing')
+    FarmerProfile = apps.get_model('accounts', 'FarmerProfile')
+
+    profiles = {profile.user_id: profile for profile in FarmerProfile.objects.all()}
+    listings = []
+    products = Product.objects.filter(status='available').select_related('category', 'farmer__home_district__region').order_by('pk')
+    for product in products.iterator():
+        farmer, category = product.farmer, product.category
+        profile = profiles.get(farmer.pk)
+        district = farmer.district or ''
+        listings.append(ProductListing(
+            product_id=product.pk,
+            name=product.name,
+            description=product.description or '',
+            price=product.price,
+            quantity=product.quantity,
+            unit=product.unit,
+            location=product.location or '',
+            image=product.image.name if product.image else '',
+            is_urgent=product.is_urgent,
+            urgent_discount=product.urgent_discount or 0,
+            created_at=product.created_at,
+            category_id=category.pk if category else None,
+            category_name=category.name if category else '',
+            farmer_id=farmer.pk,
+            farmer_username=farmer.username,
+            farmer_whatsapp=farmer.whatsapp_number or '',
+            farmer_is_verified=farmer.is_verified,
+            farmer_picture=farmer.profile_picture.name if farmer.profile_picture else '',
+            farmer_specialization=farmer.specialization or '',
+            farmer_district=district,
+            farmer_region=(
+                farmer.home_district.region.name if farmer.home_district else DISTRICT_REGIONS.get(district, '')
+            ),
+            farm_name=profile.farm_name if profile else '',
+            farm_size=profile.farm_size if profile else None,
+            farmer_rating=profile.rating_average if profile else 0,
+            farmer_total_sales=profile.total_sales if profile else 0,
+        ))
+    ProductListing.objects.bulk_create(listings, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_district_reference'),
+        ('marketplace', '0004_externalmarketprice'),
+        ('orders', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductListing',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='listing', serialize=False, to='marketplace.product')),
+                ('name', models.CharField(max_length=200)),
+                ('description', models.TextField(blank=True)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('quantity', models.IntegerField()),
+                ('unit', models.CharField(max_length=20)),
+                ('location', models.CharField(blank=True, max_length=100)),
+                ('image', models.ImageField(blank=True, upload_to='products/')),
+                ('is_urgent', models.BooleanField(default=False)),
+                ('urgent_discount', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(help_text='Copied from Product.created_at')),
+                ('category_id', models.BigIntegerField(blank=True, null=True)),
+                ('category_name', models.CharField(blank=True, max_length=100)),
+                ('farmer_id', models.BigIntegerField()),
+                ('farmer_username', models.CharField(max_length=150)),
+                ('farmer_whatsapp', models.CharField(blank=True, max_length=15)),
+                ('farmer_is_verified', models.BooleanField(default=False)),
+                ('farmer_picture', models.ImageField(blank=True, upload_to='profiles/')),
+                ('farmer_specialization', models.CharField(blank=True, max_length=100)),
+                ('farmer_district', models.CharField(blank=True, max_length=100)),
+                ('farmer_region', models.CharField(blank=True, max_length=50)),
+                ('farm_name', models.CharField(blank=True, max_length=200)),
+                ('farm_size', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('farmer_rating', models.DecimalField(decimal_places=2, default=0.0, max_digits=3)),
+                ('farmer_total_sales', models.IntegerField(default=0)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Product Listing',
+                'verbose_name_plural': 'Product Listings',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['-created_at'], name='marketplace_created_cdb643_idx'), models.Index(fields=['category_id', '-created_at'], name='marketplace_categor_ecbe77_idx'), models.Index(fields=['farmer_district', '-created_at'], name='marketplace_farmer__b9a049_idx'), models.Index(fields=['is_urgent', '-created_at'], name='marketplace_is_urge_2479ed_idx'), models.Index(fields=['farmer_id'], name='marketplace_farmer__cb69e6_idx'), models.Index(fields=['farmer_region', 'farmer_username'], name='marketplace_farmer__36d92e_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Review',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating', models.IntegerField(help_text='Rating from 1 to 5 stars', validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)])),
+                ('comment', models.TextField(help_text='Review comment')),
+                ('product_quality', models.IntegerField(help_text='Quality of products (1-5)', validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)])),
+                ('communication', models.IntegerField(help_text='Communication quality (1-5)', validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)])),
+                ('delivery_speed', models.IntegerField(help_text='Delivery speed (1-5)', validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)])),
+                ('would_recommend', models.BooleanField(default=True, help_text='Would you recommend this farmer?')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('farmer', models.ForeignKey(help_text='Farmer being reviewed', limit_choices_to={'user_type': 'farmer'}, on_delete=django.db.models.deletion.CASCADE, related_name='reviews_received', to=settings.AUTH_USER_MODEL)),
+                ('order', models.OneToOneField(help_text='Order this review is for', on_delete=django.db.models.deletion.CASCADE, related_name='marketplace_review', to='orders.order')),
+                ('reviewer', models.ForeignKey(help_text='User who wrote the review', on_delete=django.db.models.deletion.CASCADE, related_name='reviews_given', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Review',
+                'verbose_name_plural': 'Reviews',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReviewResponse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('response_text', models.TextField(help_text="Farmer's response to the review")),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('review', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='response', to='marketplace.review')),
+            ],
+            options={
+                'verbose_name': 'Review Response',
+                'verbose_name_plural': 'Review Responses',
+            },
+        ),
+        migrations.RunPython(fill_listings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:39
+
+from django.db import migrations, models
+
+
+def seed_counters(apps, schema_editor):
+    from marketplace.services.counters import compute_counters
+
+    PlatformCounter = apps.get_model('marketplace', 'PlatformCounter')
+    expected = compute_counters(
+        apps.get_model('marketplace', 'Product'),
+        apps.get_model('orders', 'Order'),
+    )
+    PlatformCounter.objects.bulk_create([
+        PlatformCounter(name=name, scope=scope, scope_key=key, value=value)
+        for (name, scope, key), value in expected.items()
+        if value
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0005_productlisting_review_reviewresponse'),
+        ('orders', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlatformCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Counter name (e.g., available_products)', max_length=50)),
+                ('scope', models.CharField(choices=[('global', 'Global'), ('farmer', 'Farmer'), ('district', 'District'), ('category', 'Category')], default='global', max_length=20)),
+                ('scope_key', models.CharField(blank=True, default='', help_text='Farmer id, district name or category id; blank for global', max_length=100)),
+                ('value', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Platform Counter',
+                'verbose_name_plural': 'Platform Counters',
+                'constraints': [models.UniqueConstraint(fields=('name', 'scope', 'scope_key'), name='unique_platform_counter')],
+            },
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
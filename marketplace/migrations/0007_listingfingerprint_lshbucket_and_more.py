@@ -0,0 +1,80 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:42
+
+import django.db.models.deletion
+import marketplace.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0006_platformcounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ListingFingerprint',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='fingerprint', serialize=False, to='marketplace.product')),
+                ('minhash', models.JSONField(default=list, help_text='MinHash signature of name + description')),
+                ('image_name', models.CharField(blank=True, help_text='Image the perceptual hash was computed from', max_length=255)),
+                ('image_hash', models.CharField(blank=True, help_text='64-bit difference hash of the main image (hex)', max_length=16)),
+                ('similarity', models.FloatField(default=0, help_text='Estimated text similarity to duplicate_of')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Listing Fingerprint',
+                'verbose_name_plural': 'Listing Fingerprints',
+            },
+        ),
+        migrations.CreateModel(
+            name='LSHBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('bucket', models.CharField(max_length=16)),
+            ],
+            options={
+                'verbose_name': 'LSH Bucket',
+                'verbose_name_plural': 'LSH Buckets',
+            },
+        ),
+        migrations.AddField(
+            model_name='productlisting',
+            name='duplicate_of_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='image',
+            field=models.ImageField(help_text='Main product image', storage=marketplace.storage.ContentHashStorage(), upload_to='products/'),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='image2',
+            field=models.ImageField(blank=True, help_text='Additional image', null=True, storage=marketplace.storage.ContentHashStorage(), upload_to='products/'),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='image3',
+            field=models.ImageField(blank=True, help_text='Additional image', null=True, storage=marketplace.storage.ContentHashStorage(), upload_to='products/'),
+        ),
+        migrations.AddIndex(
+            model_name='productlisting',
+            index=models.Index(fields=['duplicate_of_id'], name='marketplace_duplica_c2a07f_idx'),
+        ),
+        migrations.AddField(
+            model_name='listingfingerprint',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, help_text='Earlier listing this one duplicates', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='near_duplicates', to='marketplace.product'),
+        ),
+        migrations.AddField(
+            model_name='lshbucket',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='marketplace.product'),
+        ),
+        migrations.AddIndex(
+            model_name='lshbucket',
+            index=models.Index(fields=['band', 'bucket'], name='marketplace_band_99136c_idx'),
+        ),
+    ]
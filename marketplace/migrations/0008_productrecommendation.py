@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0007_listingfingerprint_lshbucket_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(help_text="Cosine similarity of the two products' buyer sets")),
+                ('co_buyers', models.PositiveIntegerField(default=0, help_text='Buyers who bought both products')),
+                ('rank', models.PositiveSmallIntegerField(help_text='1 = most similar')),
+                ('computed_at', models.DateTimeField(auto_now_add=True)),
+                ('neighbour', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='marketplace.product')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to='marketplace.product')),
+            ],
+            options={
+                'verbose_name': 'Product Recommendation',
+                'verbose_name_plural': 'Product Recommendations',
+                'ordering': ['product', 'rank'],
+                'indexes': [models.Index(fields=['product', 'rank'], name='marketplace_product_b6469a_idx')],
+                'constraints': [models.UniqueConstraint(fields=('product', 'neighbour'), name='unique_product_recommendation')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:47
+
+from django.db import migrations, models
+
+
+def build_distances(apps, schema_editor):
+    from marketplace.services.geo import distance_matrix
+    DistrictDistance = apps.get_model('marketplace', 'DistrictDistance')
+    DistrictDistance.objects.bulk_create([
+        DistrictDistance(from_district=a, to_district=b, distance_km=round(km, 2))
+        for (a, b), km in distance_matrix().items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0008_productrecommendation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DistrictDistance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_district', models.CharField(max_length=100)),
+                ('to_district', models.CharField(max_length=100)),
+                ('distance_km', models.FloatField()),
+            ],
+            options={
+                'verbose_name': 'District Distance',
+                'verbose_name_plural': 'District Distances',
+                'indexes': [models.Index(fields=['from_district', 'distance_km'], name='marketplace_from_di_25b26b_idx')],
+                'constraints': [models.UniqueConstraint(fields=('from_district', 'to_district'), name='unique_district_distance')],
+            },
+        ),
+        migrations.RunPython(build_distances, migrations.RunPython.noop),
+    ]
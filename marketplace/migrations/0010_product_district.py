@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def resolve_product_districts(apps, schema_editor):
+    from accounts.services.districts import build_index, match
+
+    District = apps.get_model('accounts', 'District')
+    Product = apps.get_model('marketplace', 'Product')
+    ProductListing = apps.get_model('marketplace', 'ProductListing')
+
+    index = build_index(District.objects.all())
+    products = Product.objects.select_related('farmer').only('pk', 'location', 'farmer__home_district_id')
+    for product in products.iterator():
+        district_id = match(product.location, index) or product.farmer.home_district_id
+        if district_id:
+            Product.objects.filter(pk=product.pk).update(district_id=district_id)
+            ProductListing.objects.filter(pk=product.pk).update(district_id=district_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_district_reference'),
+        ('marketplace', '0009_districtdistance'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='district',
+            field=models.ForeignKey(blank=True, help_text="District resolved from location (falls back to the farmer's district)", null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='products', to='accounts.district'),
+        ),
+        migrations.AddField(
+            model_name='productlisting',
+            name='district_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='productlisting',
+            index=models.Index(fields=['district_id', '-created_at'], name='marketplace_distric_614f4a_idx'),
+        ),
+        migrations.RunPython(resolve_product_districts, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
-from accounts.models import User
+from accounts.models import User, District
+from .storage import content_hash_storage
 
 # Product Category
 class Category(models.Model):
@@ -97,20 +98,31 @@ class Product(models.Model):
         max_length=100,
         help_text="Where product is located (district/city)"
     )
+    district = models.ForeignKey(
+        District,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='products',
+        help_text="District resolved from location (falls back to the farmer's district)"
+    )
     
     # Images
     image = models.ImageField(
         upload_to='products/',
+        storage=content_hash_storage,
         help_text="Main product image"
     )
     image2 = models.ImageField(
         upload_to='products/',
+        storage=content_hash_storage,
         blank=True,
         null=True,
         help_text="Additional image"
     )
     image3 = models.ImageField(
         upload_to='products/',
+        storage=content_hash_storage,
         blank=True,
         null=True,
         help_text="Additional image"
@@ -151,6 +163,268 @@ class Product(models.Model):
         ordering = ['-created_at']
 
 
+class ProductListing(models.Model):
+    """
+    Flat read model with one row per available product.
+    Copies the category, farmer and profile columns that product cards
+    need so list pages read a single table instead of joining.
+    Maintained by marketplace.signals / services.listings.
+    """
+    product = models.OneToOneField(
+        Product,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='listing'
+    )
+
+    # Product columns
+    name = models.CharField(max_length=200)
+    description = models.TextField(blank=True)
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    quantity = models.IntegerField()
+    unit = models.CharField(max_length=20)
+    location = models.CharField(max_length=100, blank=True)
+    district_id = models.BigIntegerField(null=True, blank=True)
+    image = models.ImageField(upload_to='products/', blank=True)
+    is_urgent = models.BooleanField(default=False)
+    urgent_discount = models.IntegerField(default=0)
+    created_at = models.DateTimeField(help_text="Copied from Product.created_at")
+
+    # Category columns (no FK join needed to render the badge)
+    category_id = models.BigIntegerField(null=True, blank=True)
+    category_name = models.CharField(max_length=100, blank=True)
+
+    # Farmer columns
+    farmer_id = models.BigIntegerField()
+    farmer_username = models.CharField(max_length=150)
+    farmer_whatsapp = models.CharField(max_length=15, blank=True)
+    farmer_is_verified = models.BooleanField(default=False)
+    farmer_picture = models.ImageField(upload_to='profiles/', blank=True)
+    farmer_specialization = models.CharField(max_length=100, blank=True)
+    farmer_district = models.CharField(max_length=100, blank=True)
+    farmer_region = models.CharField(max_length=50, blank=True)
+
+    # Farmer profile columns
+    farm_name = models.CharField(max_length=200, blank=True)
+    farm_size = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    farmer_rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.00)
+    farmer_total_sales = models.IntegerField(default=0)
+
+    # Set when this product is a near-duplicate of an earlier listing,
+    # so catalogue pages can collapse it
+    duplicate_of_id = models.BigIntegerField(null=True, blank=True)
+
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} - {self.farmer_username}"
+
+    class Meta:
+        verbose_name = "Product Listing"
+        verbose_name_plural = "Product Listings"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at']),
+            models.Index(fields=['category_id', '-created_at']),
+            models.Index(fields=['farmer_district', '-created_at']),
+            models.Index(fields=['district_id', '-created_at']),
+            models.Index(fields=['is_urgent', '-created_at']),
+            models.Index(fields=['farmer_id']),
+            models.Index(fields=['farmer_region', 'farmer_username']),
+            models.Index(fields=['duplicate_of_id']),
+        ]
+
+
+class ListingFingerprint(models.Model):
+    """
+    Text and image fingerprints of a product used for near-duplicate
+    detection (see services.near_duplicates)
+    """
+    product = models.OneToOneField(
+        Product,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='fingerprint'
+    )
+    minhash = models.JSONField(
+        default=list,
+        help_text="MinHash signature of name + description"
+    )
+    image_name = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text="Image the perceptual hash was computed from"
+    )
+    image_hash = models.CharField(
+        max_length=16,
+        blank=True,
+        help_text="64-bit difference hash of the main image (hex)"
+    )
+    duplicate_of = models.ForeignKey(
+        Product,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='near_duplicates',
+        help_text="Earlier listing this one duplicates"
+    )
+    similarity = models.FloatField(
+        default=0,
+        help_text="Estimated text similarity to duplicate_of"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Fingerprint #{self.product_id}"
+
+    class Meta:
+        verbose_name = "Listing Fingerprint"
+        verbose_name_plural = "Listing Fingerprints"
+
+
+class LSHBucket(models.Model):
+    """
+    Locality-sensitive hashing index: one row per (band, bucket) a
+    product hashes into. Products sharing a bucket are candidates.
+    """
+    band = models.PositiveSmallIntegerField()
+    bucket = models.CharField(max_length=16)
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='lsh_buckets'
+    )
+
+    def __str__(self):
+        return f"band {self.band}:{self.bucket} -> #{self.product_id}"
+
+    class Meta:
+        verbose_name = "LSH Bucket"
+        verbose_name_plural = "LSH Buckets"
+        indexes = [
+            models.Index(fields=['band', 'bucket']),
+        ]
+
+
+class PlatformCounter(models.Model):
+    """
+    Incrementally maintained totals (products, farmers, orders)
+    Kept globally and per farmer, district or category so dashboards
+    read a single row instead of running COUNT/DISTINCT scans.
+    Updated by services.counters and repaired by reconcile_counters.
+    """
+    SCOPE_CHOICES = (
+        ('global', 'Global'),
+        ('farmer', 'Farmer'),
+        ('district', 'District'),
+        ('category', 'Category'),
+    )
+
+    name = models.CharField(
+        max_length=50,
+        help_text="Counter name (e.g., available_products)"
+    )
+    scope = models.CharField(
+        max_length=20,
+        choices=SCOPE_CHOICES,
+        default='global'
+    )
+    scope_key = models.CharField(
+        max_length=100,
+        blank=True,
+        default='',
+        help_text="Farmer id, district name or category id; blank for global"
+    )
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        scope = f"{self.scope}:{self.scope_key}" if self.scope_key else self.scope
+        return f"{self.name} [{scope}] = {self.value}"
+
+    class Meta:
+        verbose_name = "Platform Counter"
+        verbose_name_plural = "Platform Counters"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['name', 'scope', 'scope_key'],
+                name='unique_platform_counter'
+            ),
+        ]
+
+
+class DistrictDistance(models.Model):
+    """
+    Precomputed great-circle distance between district centroids,
+    used to sort listings by distance from the buyer.
+    Rebuilt by the build_district_distances command.
+    """
+    from_district = models.CharField(max_length=100)
+    to_district = models.CharField(max_length=100)
+    distance_km = models.FloatField()
+
+    def __str__(self):
+        return f"{self.from_district} -> {self.to_district}: {self.distance_km} km"
+
+    class Meta:
+        verbose_name = "District Distance"
+        verbose_name_plural = "District Distances"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['from_district', 'to_district'],
+                name='unique_district_distance'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['from_district', 'distance_km']),
+        ]
+
+
+class ProductRecommendation(models.Model):
+    """
+    Top-K "buyers also bought" neighbours of a product, computed in batch
+    from order history by services.recommendations
+    """
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='recommendations'
+    )
+    neighbour = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    score = models.FloatField(
+        help_text="Cosine similarity of the two products' buyer sets"
+    )
+    co_buyers = models.PositiveIntegerField(
+        default=0,
+        help_text="Buyers who bought both products"
+    )
+    rank = models.PositiveSmallIntegerField(
+        help_text="1 = most similar"
+    )
+    computed_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"#{self.product_id} -> #{self.neighbour_id} ({self.score:.2f})"
+
+    class Meta:
+        verbose_name = "Product Recommendation"
+        verbose_name_plural = "Product Recommendations"
+        ordering = ['product', 'rank']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['product', 'neighbour'],
+                name='unique_product_recommendation'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['product', 'rank']),
+        ]
+
+
 class MarketPrice(models.Model):
     """
     Daily market prices for different products
@@ -0,0 +1,60 @@
+"""
+Background Task Runner
+
+A small in-process worker pool for work that should not hold up the
+request thread (image processing, duplicate detection, notifications).
+Tasks are submitted after the surrounding transaction commits so workers
+never see rows that might still be rolled back.
+"""
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'BACKGROUND_WORKERS', 2),
+                    thread_name_prefix='agrimarket-bg'
+                )
+    return _executor
+
+
+def _run(fn: Callable, args, kwargs):
+    close_old_connections()
+    try:
+        return fn(*args, **kwargs)
+    except Exception:
+        logger.exception(f"Background task {fn.__name__} failed")
+        raise
+    finally:
+        # Worker threads keep their own DB connections; don't leak them
+        connections.close_all()
+
+
+def submit(fn: Callable, *args, **kwargs) -> Future:
+    """
+    Run fn in the worker pool immediately
+    """
+    return get_executor().submit(_run, fn, args, kwargs)
+
+
+def run_after_commit(fn: Callable, *args, **kwargs) -> None:
+    """
+    Run fn in the worker pool once the current transaction commits
+    (immediately when not inside a transaction)
+    """
+    transaction.on_commit(lambda: submit(fn, *args, **kwargs))
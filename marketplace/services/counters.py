@@ -0,0 +1,294 @@
+"""
+Platform Counters Service
+
+Keeps product, farmer and order totals in PlatformCounter rows,
+globally and per farmer, district and category. Every change is
+applied as an atomic F-expression increment, so readers get O(1)
+lookups instead of COUNT/DISTINCT scans.
+
+Counters are maintained from model signals (marketplace/signals.py).
+Code that changes products or orders with queryset.update() must call
+record_product_change / record_order_change itself. The
+reconcile_counters command recomputes everything from source tables.
+"""
+
+import logging
+from collections import Counter, namedtuple
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from accounts.models import User
+from marketplace.models import PlatformCounter, Product
+
+logger = logging.getLogger(__name__)
+
+
+# Snapshot of the fields a product or order contributes to counters
+ProductState = namedtuple('ProductState', 'status farmer_id category_id district')
+OrderState = namedtuple('OrderState', 'status farmer_id')
+
+CounterKey = Tuple[str, str, str]
+
+
+# --- READS ---
+
+def get(name: str, scope: str = 'global', key='') -> int:
+    """
+    Read a single counter; missing counters are zero
+    """
+    value = (
+        PlatformCounter.objects
+        .filter(name=name, scope=scope, scope_key=str(key))
+        .values_list('value', flat=True)
+        .first()
+    )
+    return value or 0
+
+
+def get_many(names: Iterable[str], scope: str = 'global', key='') -> Dict[str, int]:
+    """
+    Read several counters for the same scope in one query
+    """
+    names = list(names)
+    values = dict(
+        PlatformCounter.objects
+        .filter(name__in=names, scope=scope, scope_key=str(key))
+        .values_list('name', 'value')
+    )
+    return {name: values.get(name, 0) for name in names}
+
+
+# --- WRITES ---
+
+def increment(name: str, delta: int = 1, scope: str = 'global', key='') -> None:
+    """
+    Atomically add delta to a counter, creating it on first use
+    """
+    if not delta:
+        return
+    lookup = {'name': name, 'scope': scope, 'scope_key': str(key)}
+    updated = PlatformCounter.objects.filter(**lookup).update(
+        value=F('value') + delta,
+        updated_at=timezone.now()
+    )
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            PlatformCounter.objects.create(value=delta, **lookup)
+    except IntegrityError:
+        # Another writer created it first
+        PlatformCounter.objects.filter(**lookup).update(
+            value=F('value') + delta,
+            updated_at=timezone.now()
+        )
+
+
+def apply_deltas(deltas: Dict[CounterKey, int]) -> None:
+    for (name, scope, key), delta in deltas.items():
+        increment(name, delta, scope, key)
+
+
+# --- PRODUCTS ---
+
+def product_state(product) -> ProductState:
+    district = (
+        User.objects.filter(pk=product.farmer_id)
+        .values_list('district', flat=True)
+        .first()
+    )
+    return ProductState(product.status, product.farmer_id, product.category_id, district or '')
+
+
+def product_state_from_db(pk) -> Optional[ProductState]:
+    row = (
+        Product.objects.filter(pk=pk)
+        .values_list('status', 'farmer_id', 'category_id', 'farmer__district')
+        .first()
+    )
+    if row is None:
+        return None
+    status, farmer_id, category_id, district = row
+    return ProductState(status, farmer_id, category_id, district or '')
+
+
+def product_contributions(state: Optional[ProductState]) -> List[CounterKey]:
+    if state is None:
+        return []
+    keys = [('products', 'farmer', str(state.farmer_id))]
+    if state.status == 'available':
+        keys.append(('available_products', 'global', ''))
+        keys.append(('available_products', 'farmer', str(state.farmer_id)))
+        if state.district:
+            keys.append(('available_products', 'district', state.district))
+        if state.category_id:
+            keys.append(('available_products', 'category', str(state.category_id)))
+    return keys
+
+
+@transaction.atomic
+def record_product_change(old: Optional[ProductState], new: Optional[ProductState]) -> None:
+    """
+    Apply the counter difference between two product states.
+    Pass old=None for a new product and new=None for a deleted one.
+    """
+    deltas = Counter()
+    for key in product_contributions(old):
+        deltas[key] -= 1
+    for key in product_contributions(new):
+        deltas[key] += 1
+
+    for (name, scope, key), delta in deltas.items():
+        if not delta:
+            continue
+        increment(name, delta, scope, key)
+        if name == 'products':
+            _track_active_farmer(key, delta)
+
+
+def _track_active_farmer(farmer_key: str, delta: int) -> None:
+    # A farmer becomes active with their first product and inactive
+    # when their last one is removed
+    value = get('products', 'farmer', farmer_key)
+    if delta > 0 and value == delta:
+        increment('active_farmers', 1)
+    elif delta < 0 and value == 0:
+        increment('active_farmers', -1)
+
+
+def move_farmer_district(farmer_id, old_district: str, new_district: str) -> None:
+    """
+    Move a farmer's available products between district counters
+    """
+    available = get('available_products', 'farmer', farmer_id)
+    if not available or old_district == new_district:
+        return
+    with transaction.atomic():
+        if old_district:
+            increment('available_products', -available, 'district', old_district)
+        if new_district:
+            increment('available_products', available, 'district', new_district)
+
+
+# --- ORDERS ---
+
+def order_contributions(state: Optional[OrderState]) -> List[CounterKey]:
+    if state is None:
+        return []
+    farmer_key = str(state.farmer_id)
+    return [
+        ('orders', 'global', ''),
+        ('orders', 'farmer', farmer_key),
+        (f'orders_{state.status}', 'global', ''),
+        (f'orders_{state.status}', 'farmer', farmer_key),
+    ]
+
+
+def record_order_change(old: Optional[OrderState], new: Optional[OrderState]) -> None:
+    """
+    Apply the counter difference between two order states
+    """
+    record_order_changes([(old, new)])
+
+
+@transaction.atomic
+def record_order_changes(changes: Iterable[Tuple[Optional[OrderState], Optional[OrderState]]]) -> None:
+    """
+    Apply the counter differences of a batch of (old, new) order states
+    with one increment per distinct counter
+    """
+    deltas = Counter()
+    for old, new in changes:
+        for key in order_contributions(old):
+            deltas[key] -= 1
+        for key in order_contributions(new):
+            deltas[key] += 1
+    apply_deltas({key: delta for key, delta in deltas.items() if delta})
+
+
+def record_new_orders(states: Iterable[OrderState]) -> None:
+    """
+    Count a batch of new orders (e.g. from bulk_create) with one
+    increment per distinct counter
+    """
+    deltas = Counter()
+    for state in states:
+        for key in order_contributions(state):
+            deltas[key] += 1
+    apply_deltas(deltas)
+
+
+# --- RECONCILIATION ---
+
+def compute_counters(product_model=Product, order_model=None) -> Dict[CounterKey, int]:
+    """
+    Recompute every counter from the source tables. Migrations pass
+    their historical models, so the initial seed uses these same queries.
+    """
+    if order_model is None:
+        from orders.models import Order as order_model
+
+    Product, Order = product_model, order_model
+    expected = Counter()
+
+    for row in Product.objects.values('farmer_id').annotate(n=Count('id')):
+        expected[('products', 'farmer', str(row['farmer_id']))] = row['n']
+    expected[('active_farmers', 'global', '')] = Product.objects.values('farmer').distinct().count()
+
+    available = Product.objects.filter(status='available')
+    expected[('available_products', 'global', '')] = available.count()
+    for row in available.values('farmer_id').annotate(n=Count('id')):
+        expected[('available_products', 'farmer', str(row['farmer_id']))] = row['n']
+    for row in available.exclude(farmer__district='').values('farmer__district').annotate(n=Count('id')):
+        expected[('available_products', 'district', row['farmer__district'])] = row['n']
+    for row in available.exclude(category__isnull=True).values('category_id').annotate(n=Count('id')):
+        expected[('available_products', 'category', str(row['category_id']))] = row['n']
+
+    for row in Order.objects.values('farmer_id', 'status').annotate(n=Count('id')):
+        farmer_key = str(row['farmer_id'])
+        expected[('orders', 'global', '')] += row['n']
+        expected[('orders', 'farmer', farmer_key)] += row['n']
+        expected[(f"orders_{row['status']}", 'global', '')] += row['n']
+        expected[(f"orders_{row['status']}", 'farmer', farmer_key)] += row['n']
+
+    return dict(expected)
+
+
+@transaction.atomic
+def reconcile() -> int:
+    """
+    Overwrite counters with freshly computed values.
+
+    Returns:
+        Number of counters that had drifted
+    """
+    expected = compute_counters()
+    now = timezone.now()
+
+    existing = {}
+    for counter in PlatformCounter.objects.select_for_update():
+        existing[(counter.name, counter.scope, counter.scope_key)] = counter
+
+    to_update = []
+    for key, counter in existing.items():
+        value = expected.get(key, 0)
+        if counter.value != value:
+            logger.warning(f"Counter {key} drifted: {counter.value} -> {value}")
+            counter.value = value
+            counter.updated_at = now
+            to_update.append(counter)
+    PlatformCounter.objects.bulk_update(to_update, ['value', 'updated_at'], batch_size=500)
+    drifted = len(to_update)
+
+    to_create = [
+        PlatformCounter(name=name, scope=scope, scope_key=key, value=value)
+        for (name, scope, key), value in expected.items()
+        if (name, scope, key) not in existing and value
+    ]
+    PlatformCounter.objects.bulk_create(to_create, batch_size=500)
+    drifted += len(to_create)
+
+    return drifted
@@ -0,0 +1,161 @@
+"""
+Fragment Cache Service
+
+Caches the building blocks of a page (querysets already evaluated to
+lists) under versioned keys. Model signals bump a fragment's version to
+invalidate it, and a short lock makes sure only one worker rebuilds a
+fragment once it expires while the others keep serving the stale copy.
+"""
+
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+# Seconds a fragment is considered fresh
+FRAGMENT_TTLS = {
+    'featured_products': 300,
+    'categories': 3600,
+    'platform_stats': 300,
+    'top_farmers': 900,
+    'latest_news': 600,
+    'hybrid_prices': 900,
+    'recommended_products': 300,   # varies by district and viewer
+    'recent_orders': 120,          # per user
+    'personal_picks': 600,         # per user
+    'input_prices': 900,           # per input
+}
+DEFAULT_TTL = 300
+
+# Stale copies are kept this much longer so they can be served while
+# a single worker rebuilds the fragment
+STALE_GRACE = 120
+
+# Rebuild lock lifetime; guards against a crashed builder holding it forever
+LOCK_TIMEOUT = 30
+
+# How long a worker waits for another worker's rebuild on a cold miss
+WAIT_INTERVAL = 0.05
+WAIT_ATTEMPTS = 20
+
+
+def _version_key(name: str, scope: Any) -> str:
+    return f"frag:{name}:{scope}:version" if scope is not None else f"frag:{name}:version"
+
+
+def get_version(name: str, scope: Any = None) -> int:
+    """
+    Current version of a fragment. Versions start from the clock so an
+    evicted version key never points back at old cached content.
+    """
+    key = _version_key(name, scope)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key) or 0
+    return version
+
+
+def invalidate(name: str, scope: Any = None) -> None:
+    """
+    Bump a fragment's version so the next read rebuilds it
+    """
+    key = _version_key(name, scope)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def invalidate_many(*names: str) -> None:
+    for name in names:
+        invalidate(name)
+
+
+def get_fragment(name: str, builder: Callable[[], Any], scope: Any = None,
+                 vary: Optional[str] = None, ttl: Optional[int] = None) -> Any:
+    """
+    Return a cached fragment, rebuilding it with builder() when needed.
+
+    Args:
+        name: Fragment name (key into FRAGMENT_TTLS)
+        builder: Callable returning the fragment value; must be picklable
+        scope: Invalidation scope, e.g. a user id for per-user fragments
+        vary: Extra key component that shares the scope's version,
+              e.g. a district for district-level recommendations
+        ttl: Override the configured freshness in seconds
+    """
+    ttl = ttl or FRAGMENT_TTLS.get(name, DEFAULT_TTL)
+    key = f"frag:{name}:{scope}:{vary}:v{get_version(name, scope)}"
+
+    entry = cache.get(key)
+    if entry is not None and entry[0] > time.time():
+        return entry[1]
+
+    lock_key = f"{key}:lock"
+    if cache.add(lock_key, 1, LOCK_TIMEOUT):
+        try:
+            value = builder()
+            cache.set(key, (time.time() + ttl, value), ttl + STALE_GRACE)
+            return value
+        finally:
+            cache.delete(lock_key)
+
+    # Another worker is rebuilding: serve the stale copy if we have one
+    if entry is not None:
+        return entry[1]
+
+    # Cold miss: wait briefly for the other worker instead of piling on
+    for _ in range(WAIT_ATTEMPTS):
+        time.sleep(WAIT_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[1]
+
+    logger.warning(f"Timed out waiting for fragment {name}; building inline")
+    return builder()
+
+
+def get_fragments(name: str, scopes: Iterable[Any],
+                  builder: Callable[[List[Any]], Dict[Any, Any]], ttl: Optional[int] = None) -> Dict[Any, Any]:
+    """
+    Return one fragment per scope, e.g. per input, with two cache round
+    trips; every scope that is missing or stale is rebuilt together by a
+    single builder(scopes) call, which returns {scope: value}.
+
+    There is no rebuild lock: a batch is cheaper to rebuild twice than
+    to wait for.
+    """
+    ttl = ttl or FRAGMENT_TTLS.get(name, DEFAULT_TTL)
+    scopes = list(dict.fromkeys(scopes))
+    if not scopes:
+        return {}
+
+    versions = cache.get_many([_version_key(name, scope) for scope in scopes])
+    keys = {
+        scope: f"frag:{name}:{scope}:None:v{versions.get(_version_key(name, scope)) or get_version(name, scope)}"
+        for scope in scopes
+    }
+    entries = cache.get_many(list(keys.values()))
+
+    now = time.time()
+    values, missing = {}, []
+    for scope, key in keys.items():
+        entry = entries.get(key)
+        if entry is not None and entry[0] > now:
+            values[scope] = entry[1]
+        else:
+            missing.append(scope)
+
+    if missing:
+        built = builder(missing)
+        cache.set_many(
+            {keys[scope]: (now + ttl, value) for scope, value in built.items() if scope in keys},
+            ttl + STALE_GRACE,
+        )
+        values.update(built)
+    return values
@@ -0,0 +1,129 @@
+"""
+Geo Service
+
+Distance helpers over the district centroids in DISTRICT_COORDINATES:
+
+- haversine distances and a full district-to-district distance matrix
+- reverse lookup from a GPS point to the nearest district
+- the DistrictDistance table, so listings can be sorted by distance
+  from the buyer with a single indexed join instead of per-row math
+
+Centroids are held as unit vectors on the sphere. The great-circle
+distance between two points only depends on the dot product of their
+vectors, so the nearest centroid is the one with the largest dot product.
+"""
+
+import math
+from typing import Dict, List, Optional, Tuple
+
+from django.db import transaction
+
+from marketplace.constants import DISTRICT_COORDINATES
+from marketplace.models import DistrictDistance
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Radius used for "near you" recommendations
+NEARBY_KM = 100
+
+Vector = Tuple[float, float, float]
+
+
+def to_vector(lat: float, lng: float) -> Vector:
+    """
+    Unit vector of a latitude/longitude in degrees
+    """
+    phi, lam = math.radians(lat), math.radians(lng)
+    return (math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi))
+
+
+def _angle(a: Vector, b: Vector) -> float:
+    # atan2 of |a x b| and a . b is accurate for both tiny and large angles
+    cross = (
+        a[1] * b[2] - a[2] * b[1],
+        a[2] * b[0] - a[0] * b[2],
+        a[0] * b[1] - a[1] * b[0],
+    )
+    dot = a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+    return math.atan2(math.sqrt(sum(c * c for c in cross)), dot)
+
+
+def haversine(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """
+    Great-circle distance between two points in kilometres
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lam = math.radians(lng2 - lng1)
+    h = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lam / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h)))
+
+
+# Centroid vectors, computed once at import
+CENTROIDS: Dict[str, Vector] = {
+    name: to_vector(point['lat'], point['lng'])
+    for name, point in DISTRICT_COORDINATES.items()
+}
+
+
+def distance_matrix() -> Dict[Tuple[str, str], float]:
+    """
+    Distance in km between every ordered pair of districts (including
+    each district with itself)
+    """
+    names = sorted(CENTROIDS)
+    matrix = {}
+    for i, a in enumerate(names):
+        matrix[(a, a)] = 0.0
+        for b in names[i + 1:]:
+            km = EARTH_RADIUS_KM * _angle(CENTROIDS[a], CENTROIDS[b])
+            matrix[(a, b)] = matrix[(b, a)] = km
+    return matrix
+
+
+def nearest_district(lat: float, lng: float) -> Optional[Tuple[str, float]]:
+    """
+    Nearest district centroid to a GPS point.
+
+    Returns:
+        (district, distance in km), or None when no centroids are known
+    """
+    if not CENTROIDS:
+        return None
+    point = to_vector(lat, lng)
+    name = max(
+        CENTROIDS,
+        key=lambda n: sum(p * c for p, c in zip(point, CENTROIDS[n]))
+    )
+    return name, EARTH_RADIUS_KM * _angle(point, CENTROIDS[name])
+
+
+def districts_within(district: str, km: float = NEARBY_KM) -> List[str]:
+    """
+    Districts within km of a district, nearest first (the district itself
+    included). Districts without coordinates only match themselves.
+    """
+    nearby = list(
+        DistrictDistance.objects
+        .filter(from_district=district, distance_km__lte=km)
+        .order_by('distance_km')
+        .values_list('to_district', flat=True)
+    )
+    return nearby or [district]
+
+
+@transaction.atomic
+def rebuild_distance_table() -> int:
+    """
+    Replace DistrictDistance with the current distance matrix.
+
+    Returns:
+        Number of rows written
+    """
+    rows = [
+        DistrictDistance(from_district=a, to_district=b, distance_km=round(km, 2))
+        for (a, b), km in distance_matrix().items()
+    ]
+    DistrictDistance.objects.all().delete()
+    DistrictDistance.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
@@ -0,0 +1,180 @@
+"""
+Idempotent POSTs
+
+On flaky mobile connections a form POST often reaches the server but
+the response never makes it back, and the user (or the browser) submits
+again. Forms carry a one-time key; the first POST with a key claims it,
+runs the view and stores the response. A retry with the same key gets
+the stored response replayed instead of placing a second order.
+
+Only what a replay needs is stored: the status and Location of a
+redirect, or the body of a JSON, plain text or error response. A
+successful HTML page is not stored; its retry is redirected to a GET
+of the same page, which renders it afresh.
+
+Keys are looked up through the unique (user, key) index and expire
+after IDEMPOTENCY_KEY_TTL seconds; purge_idempotency_keys deletes
+expired rows so the table stays small.
+
+Usage:
+    @login_required
+    @idempotent
+    def place_order(request, product_id): ...
+
+    <input type="hidden" name="idempotency_key" value="{{ request.idempotency_key }}">
+"""
+
+import logging
+import uuid
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.contrib import messages
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, HttpResponseRedirect
+from django.utils import timezone
+
+from orders.models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+FIELD = 'idempotency_key'
+HEADER = 'HTTP_IDEMPOTENCY_KEY'
+
+TTL = timedelta(seconds=getattr(settings, 'IDEMPOTENCY_KEY_TTL', 24 * 60 * 60))
+
+MAX_KEY_LENGTH = 64
+
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+
+# Bodies worth replaying; successful HTML pages are re-rendered instead
+STORED_CONTENT_TYPES = ('application/json', 'text/plain')
+
+
+def new_key() -> str:
+    return uuid.uuid4().hex
+
+
+def request_key(request) -> str:
+    key = request.POST.get(FIELD) or request.META.get(HEADER) or ''
+    return key.strip()[:MAX_KEY_LENGTH]
+
+
+# --- STORE ---
+
+def claim(user, key: str, path: str):
+    """
+    Claim a key for a request about to run.
+
+    Returns:
+        None if the key is new (the caller runs the view), otherwise the
+        existing IdempotencyKey row
+    """
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            IdempotencyKey.objects.create(user=user, key=key, path=path, expires_at=now + TTL)
+        return None
+    except IntegrityError:
+        pass
+
+    existing = IdempotencyKey.objects.filter(user=user, key=key).first()
+    if existing is None or existing.expires_at <= now:
+        # Purged meanwhile, or expired but not purged yet: treat as new
+        if existing is not None:
+            existing.delete()
+        return claim(user, key, path)
+    return existing
+
+
+def store(user, key: str, path: str, response) -> None:
+    """
+    Record what a replay of a claimed key's response needs
+    """
+    status_code, location, content = response.status_code, '', ''
+    content_type = response.get('Content-Type', '')
+    if status_code in REDIRECT_CODES:
+        location = response.get('Location', '')
+    elif status_code < 300 and content_type.startswith('text/html'):
+        # Re-render the page with a GET rather than keep its HTML
+        status_code, location = 303, path
+    elif not response.streaming and (status_code >= 400 or content_type.startswith(STORED_CONTENT_TYPES)):
+        content = response.content.decode(response.charset or 'utf-8', errors='replace')
+
+    IdempotencyKey.objects.filter(user=user, key=key).update(
+        status_code=status_code,
+        location=location[:255],
+        content=content,
+    )
+
+
+def release(user, key: str) -> None:
+    """
+    Forget a claimed key whose request failed, so a retry runs again
+    """
+    IdempotencyKey.objects.filter(user=user, key=key, status_code__isnull=True).delete()
+
+
+def replay(record: IdempotencyKey):
+    if record.location:
+        response = HttpResponseRedirect(record.location)
+        response.status_code = record.status_code
+        return response
+    return HttpResponse(record.content, status=record.status_code)
+
+
+def purge(now=None) -> int:
+    """
+    Delete expired keys.
+
+    Returns:
+        Number of keys deleted
+    """
+    deleted, _ = IdempotencyKey.objects.filter(expires_at__lte=now or timezone.now()).delete()
+    return deleted
+
+
+# --- DECORATOR ---
+
+def idempotent(view):
+    """
+    Make a POST view safe to retry.
+
+    Every request gets a fresh request.idempotency_key for the form it
+    renders. A POST without a key runs as before.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        # Key for any form the view renders, including a re-rendered one
+        request.idempotency_key = new_key()
+        if request.method != 'POST':
+            return view(request, *args, **kwargs)
+
+        key = request_key(request)
+        if not key or not request.user.is_authenticated:
+            return view(request, *args, **kwargs)
+
+        record = claim(request.user, key, request.path)
+        if record is not None:
+            if record.path != request.path:
+                return HttpResponse("Idempotency key already used for another request", status=422)
+            if record.status_code is None:
+                return HttpResponse("This request is still being processed", status=409)
+            logger.info(f"Replaying {request.path} for {request.user.username} (key {key})")
+            messages.info(request, 'This request was already processed.')
+            return replay(record)
+
+        try:
+            response = view(request, *args, **kwargs)
+        except Exception:
+            release(request.user, key)
+            raise
+
+        if response.status_code >= 500:
+            release(request.user, key)
+        else:
+            store(request.user, key, request.path, response)
+        return response
+
+    return wrapper
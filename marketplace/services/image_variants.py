@@ -0,0 +1,168 @@
+"""
+Responsive Image Variant Pipeline
+
+Generates thumbnail, card and detail sized copies of uploaded images in
+WebP and JPEG and stores them next to the original, e.g.
+
+    products/tomato.jpg -> products/tomato__card.webp
+                           products/tomato__card.jpg
+
+Variants are generated in the background worker pool after upload, and
+the generate_image_variants command backfills existing media.
+"""
+
+import logging
+import os
+from io import BytesIO
+from typing import Dict, List, Optional
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models.signals import post_save
+from PIL import Image, ImageOps
+
+from . import background
+
+logger = logging.getLogger(__name__)
+
+
+# Variant name -> maximum width in pixels (images are never upscaled)
+VARIANTS = {
+    'thumb': 160,
+    'card': 480,
+    'detail': 1024,
+}
+
+# File extension -> Pillow format and save options
+FORMATS = {
+    'webp': ('WEBP', {'quality': 75, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 80, 'optimize': True, 'progressive': True}),
+}
+
+# Image fields that get variants, by model label
+IMAGE_FIELDS = {
+    'marketplace.Product': ['image', 'image2', 'image3'],
+    'inputs.AgriculturalInput': ['image'],
+    'news.AgriNews': ['image'],
+    'weather.PestAlert': ['image'],
+}
+
+
+def variant_name(name: str, variant: str, ext: str) -> str:
+    """
+    Storage name of a variant, e.g. products/tomato__card.webp
+    """
+    root, _ = os.path.splitext(name)
+    return f"{root}__{variant}.{ext}"
+
+
+def has_variants(name: str) -> bool:
+    """
+    Variants are written largest-first and jpg last, so the smallest
+    jpg existing means the whole set is there
+    """
+    return bool(name) and default_storage.exists(variant_name(name, 'thumb', 'jpg'))
+
+
+def _render(image: Image.Image, width: int, fmt: str, options: Dict) -> bytes:
+    resized = image.copy()
+    if resized.width > width:
+        height = round(resized.height * width / resized.width)
+        resized = resized.resize((width, height), Image.LANCZOS)
+    buffer = BytesIO()
+    resized.save(buffer, fmt, **options)
+    return buffer.getvalue()
+
+
+def generate_variants(name: str, force: bool = False) -> List[str]:
+    """
+    Generate all missing variants for one stored image.
+
+    Returns:
+        Storage names of the variants written
+    """
+    if not name or (not force and has_variants(name)):
+        return []
+
+    try:
+        with default_storage.open(name, 'rb') as fh:
+            image = Image.open(fh)
+            image = ImageOps.exif_transpose(image)
+            image = image.convert('RGB')
+    except (OSError, ValueError) as e:
+        logger.warning(f"Cannot read image {name}: {e}")
+        return []
+
+    written = []
+    for variant, width in sorted(VARIANTS.items(), key=lambda item: -item[1]):
+        for ext, (fmt, options) in FORMATS.items():
+            target = variant_name(name, variant, ext)
+            if default_storage.exists(target):
+                if not force:
+                    continue
+                default_storage.delete(target)
+            default_storage.save(target, ContentFile(_render(image, width, fmt, options)))
+            written.append(target)
+
+    logger.info(f"Generated {len(written)} variants for {name}")
+    return written
+
+
+def generate_for_names(names: List[str]) -> None:
+    for name in names:
+        generate_variants(name)
+
+
+def image_names(instance) -> List[str]:
+    """
+    Stored image names on a model instance that should have variants
+    """
+    fields = IMAGE_FIELDS.get(instance._meta.label, [])
+    return [getattr(instance, field).name for field in fields if getattr(instance, field)]
+
+
+def schedule_variants(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    post_save handler: queue variant generation off the request thread
+    """
+    if raw:
+        return
+    fields = IMAGE_FIELDS.get(sender._meta.label, [])
+    if update_fields is not None and not set(update_fields) & set(fields):
+        return
+    names = image_names(instance)
+    if names:
+        background.run_after_commit(generate_for_names, names)
+
+
+def connect_signals() -> None:
+    for label in IMAGE_FIELDS:
+        post_save.connect(
+            schedule_variants,
+            sender=apps.get_model(label),
+            dispatch_uid=f"image_variants:{label}"
+        )
+
+
+def variant_url(fieldfile, variant: str, ext: str = 'jpg') -> Optional[str]:
+    """
+    URL of a variant, or None when variants have not been generated yet
+    """
+    name = getattr(fieldfile, 'name', '')
+    if not has_variants(name):
+        return None
+    return default_storage.url(variant_name(name, variant, ext))
+
+
+def srcset(fieldfile, ext: str = 'jpg') -> str:
+    """
+    srcset attribute value covering every variant width
+    """
+    name = getattr(fieldfile, 'name', '')
+    if not has_variants(name):
+        return ''
+    return ', '.join(
+        f"{default_storage.url(variant_name(name, variant, ext))} {width}w"
+        for variant, width in sorted(VARIANTS.items(), key=lambda item: item[1])
+    )
@@ -0,0 +1,200 @@
+"""
+Product Listing Read Model Service
+
+Keeps the flat ProductListing table in step with Product, Category,
+User and FarmerProfile so catalogue pages can render product cards
+from a single table scan.
+"""
+
+import logging
+from typing import Dict, Iterable, Optional
+
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from accounts.models import FarmerProfile
+from marketplace.constants import DISTRICT_REGIONS
+from marketplace.models import Product, ProductListing, ListingFingerprint
+
+logger = logging.getLogger(__name__)
+
+
+def farmer_columns(farmer) -> Dict:
+    """
+    Denormalized farmer and farmer profile columns for a listing row
+    """
+    try:
+        profile = farmer.farmer_profile
+    except FarmerProfile.DoesNotExist:
+        profile = None
+
+    district = farmer.district or ''
+    return {
+        'farmer_id': farmer.pk,
+        'farmer_username': farmer.username,
+        'farmer_whatsapp': farmer.whatsapp_number or '',
+        'farmer_is_verified': farmer.is_verified,
+        'farmer_picture': farmer.profile_picture.name if farmer.profile_picture else '',
+        'farmer_specialization': farmer.specialization or '',
+        'farmer_district': district,
+        'farmer_region': farmer.home_district.region.name if farmer.home_district else DISTRICT_REGIONS.get(district, ''),
+        'farm_name': profile.farm_name if profile else '',
+        'farm_size': profile.farm_size if profile else None,
+        'farmer_rating': profile.rating_average if profile else 0,
+        'farmer_total_sales': profile.total_sales if profile else 0,
+    }
+
+
+def product_columns(product) -> Dict:
+    """
+    Denormalized product and category columns for a listing row
+    """
+    category = product.category
+    try:
+        duplicate_of_id = product.fingerprint.duplicate_of_id
+    except ListingFingerprint.DoesNotExist:
+        duplicate_of_id = None
+    return {
+        'name': product.name,
+        'description': product.description or '',
+        'price': product.price,
+        'quantity': product.quantity,
+        'unit': product.unit,
+        'location': product.location or '',
+        'district_id': product.district_id,
+        'image': product.image.name if product.image else '',
+        'is_urgent': product.is_urgent,
+        'urgent_discount': product.urgent_discount or 0,
+        'created_at': product.created_at,
+        'category_id': category.pk if category else None,
+        'category_name': category.name if category else '',
+        'duplicate_of_id': duplicate_of_id,
+    }
+
+
+def build_listing(product) -> ProductListing:
+    """
+    Build an unsaved listing row for a product
+    """
+    return ProductListing(
+        product_id=product.pk,
+        **product_columns(product),
+        **farmer_columns(product.farmer)
+    )
+
+
+def sync_product_listing(product) -> Optional[ProductListing]:
+    """
+    Upsert the listing row for an available product, or drop it when the
+    product is no longer available.
+    """
+    if product.status != 'available':
+        ProductListing.objects.filter(pk=product.pk).delete()
+        return None
+
+    listing, _ = ProductListing.objects.update_or_create(
+        product_id=product.pk,
+        defaults={**product_columns(product), **farmer_columns(product.farmer)}
+    )
+    return listing
+
+
+def sync_product_listings(product_ids: Iterable[int]) -> None:
+    """
+    Re-sync listing rows for products changed through queryset.update(),
+    which does not fire model signals.
+    """
+    product_ids = set(product_ids)
+    if not product_ids:
+        return
+
+    products = (
+        Product.objects
+        .filter(pk__in=product_ids)
+        .select_related('category', 'farmer__farmer_profile', 'farmer__home_district__region', 'fingerprint')
+    )
+    seen = set()
+    for product in products:
+        sync_product_listing(product)
+        seen.add(product.pk)
+
+    # Products deleted in the meantime
+    ProductListing.objects.filter(pk__in=product_ids - seen).delete()
+
+
+def sync_stock(product_ids: Iterable[int]) -> None:
+    """
+    Set-based refresh after stock-only changes (orders, restocks): copy
+    quantity from Product in one UPDATE and drop rows of products that
+    are no longer available. Products that became available again need
+    a full row, so they go through sync_product_listings.
+    """
+    product_ids = set(product_ids)
+    if not product_ids:
+        return
+
+    ProductListing.objects.filter(pk__in=product_ids).update(
+        quantity=Subquery(Product.objects.filter(pk=OuterRef('pk')).values('quantity')[:1]),
+        refreshed_at=timezone.now(),
+    )
+    ProductListing.objects.filter(pk__in=product_ids).exclude(product__status='available').delete()
+
+    missing = (
+        Product.objects
+        .filter(pk__in=product_ids, status='available', listing__isnull=True)
+        .values_list('pk', flat=True)
+    )
+    sync_product_listings(missing)
+
+
+def refresh_farmer_listings(farmer) -> int:
+    """
+    Rewrite the farmer columns on every listing owned by this farmer
+    """
+    return ProductListing.objects.filter(farmer_id=farmer.pk).update(
+        refreshed_at=timezone.now(),
+        **farmer_columns(farmer)
+    )
+
+
+def refresh_category_listings(category_id: int, category_name: str = '') -> int:
+    """
+    Rewrite the category columns after a category is renamed or removed
+    """
+    return ProductListing.objects.filter(category_id=category_id).update(
+        category_id=category_id if category_name else None,
+        category_name=category_name,
+        refreshed_at=timezone.now(),
+    )
+
+
+@transaction.atomic
+def rebuild_listings(batch_size: int = 500) -> int:
+    """
+    Rebuild the whole read model from Product. Used for the initial
+    backfill and to repair drift.
+    """
+    ProductListing.objects.all().delete()
+
+    products = (
+        Product.objects
+        .filter(status='available')
+        .select_related('category', 'farmer__farmer_profile', 'farmer__home_district__region', 'fingerprint')
+        .order_by('pk')
+    )
+
+    created = 0
+    batch = []
+    for product in products.iterator(chunk_size=batch_size):
+        batch.append(build_listing(product))
+        if len(batch) >= batch_size:
+            ProductListing.objects.bulk_create(batch)
+            created += len(batch)
+            batch = []
+    if batch:
+        ProductListing.objects.bulk_create(batch)
+        created += len(batch)
+
+    logger.info(f"Rebuilt {created} product listings")
+    return created
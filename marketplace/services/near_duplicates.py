@@ -0,0 +1,237 @@
+"""
+Near-Duplicate Listing Detector
+
+Flags products that re-post an earlier listing of the same farmer with
+the same photo and a copy-pasted description. Two signals are combined:
+
+- MinHash over character shingles of name + description, estimating
+  the Jaccard similarity of the texts
+- A 64-bit difference hash (dHash) of the main image, compared by
+  Hamming distance
+
+Candidates are found through an incremental LSH index (LSHBucket):
+each product writes one row per band, and checking a new listing only
+looks at products sharing a bucket, so the cost is sub-linear in the
+size of the catalogue.
+"""
+
+import hashlib
+import logging
+import random
+import re
+from typing import List, Optional, Set
+
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+from PIL import Image, ImageOps
+
+from marketplace.models import Product, ProductListing, ListingFingerprint, LSHBucket
+from . import background
+
+logger = logging.getLogger(__name__)
+
+
+# MinHash / LSH parameters: 16 bands of 4 rows put the candidate
+# threshold around Jaccard 0.5, well below TEXT_THRESHOLD
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 4
+
+# Image hash bands live after the text bands. Four 16-bit bands mean any
+# two hashes within 3 bits of each other share at least one bucket.
+IMAGE_BAND_OFFSET = 100
+IMAGE_BANDS = 4
+
+# Decision thresholds
+TEXT_THRESHOLD = 0.8     # estimated Jaccard similarity
+IMAGE_THRESHOLD = 10     # max differing bits out of 64
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_rng = random.Random(20240601)  # fixed seed: signatures are persisted
+_PERMUTATIONS = [
+    (_rng.randint(1, _MERSENNE_PRIME - 1), _rng.randint(0, _MERSENNE_PRIME - 1))
+    for _ in range(NUM_PERM)
+]
+
+
+# --- TEXT ---
+
+def normalize_text(text: str) -> str:
+    return re.sub(r'[^a-z0-9]+', ' ', (text or '').lower()).strip()
+
+
+def shingles(text: str) -> Set[str]:
+    text = normalize_text(text)
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def _stable_hash(value: str) -> int:
+    # Python's hash() is salted per process, so use a real digest
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=4).digest(), 'big')
+
+
+def minhash(text: str) -> List[int]:
+    """
+    MinHash signature of a text, NUM_PERM integers long
+    """
+    hashes = [_stable_hash(s) for s in shingles(text)]
+    if not hashes:
+        return []
+    return [
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def estimate_similarity(sig_a: List[int], sig_b: List[int]) -> float:
+    if not sig_a or not sig_b:
+        return 0.0
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+def text_buckets(signature: List[int]) -> List[tuple]:
+    if not signature:
+        return []
+    return [
+        (band, hashlib.blake2b(
+            ','.join(map(str, signature[band * ROWS:(band + 1) * ROWS])).encode(),
+            digest_size=8
+        ).hexdigest())
+        for band in range(BANDS)
+    ]
+
+
+# --- IMAGE ---
+
+def difference_hash(name: str) -> str:
+    """
+    64-bit dHash of a stored image as 16 hex characters ('' if unreadable)
+    """
+    try:
+        with default_storage.open(name, 'rb') as fh:
+            image = ImageOps.exif_transpose(Image.open(fh))
+            pixels = list(image.convert('L').resize((9, 8), Image.LANCZOS).getdata())
+    except (OSError, ValueError) as e:
+        logger.warning(f"Cannot hash image {name}: {e}")
+        return ''
+
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            bits = (bits << 1) | (left > right)
+    return f"{bits:016x}"
+
+
+def hamming(hash_a: str, hash_b: str) -> Optional[int]:
+    if not hash_a or not hash_b:
+        return None
+    return bin(int(hash_a, 16) ^ int(hash_b, 16)).count('1')
+
+
+def image_buckets(image_hash: str) -> List[tuple]:
+    if not image_hash:
+        return []
+    return [
+        (IMAGE_BAND_OFFSET + band, image_hash[band * 4:(band + 1) * 4])
+        for band in range(IMAGE_BANDS)
+    ]
+
+
+# --- DETECTION ---
+
+def is_duplicate(text_similarity: float, image_hash: str, other_hash: str) -> bool:
+    if text_similarity < TEXT_THRESHOLD:
+        return False
+    if not image_hash and not other_hash:
+        # Neither listing has a photo: near-identical text alone decides
+        return True
+    # One photo, or two that differ, means a different listing
+    distance = hamming(image_hash, other_hash)
+    return distance is not None and distance <= IMAGE_THRESHOLD
+
+
+def check_product(product_id: int) -> Optional[int]:
+    """
+    Fingerprint a product, update the LSH index and flag it if it
+    duplicates an earlier listing.
+
+    Returns:
+        Id of the product it duplicates, or None
+    """
+    product = Product.objects.filter(pk=product_id).first()
+    if product is None:
+        return None
+
+    fingerprint = ListingFingerprint.objects.filter(pk=product_id).first()
+    signature = minhash(f"{product.name} {product.description}")
+
+    # The perceptual hash needs the file, so reuse it while the image is unchanged
+    image_name = product.image.name if product.image else ''
+    if fingerprint and fingerprint.image_name == image_name:
+        image_hash = fingerprint.image_hash
+    else:
+        image_hash = difference_hash(image_name) if image_name else ''
+
+    buckets = text_buckets(signature) + image_buckets(image_hash)
+
+    # Candidates: the farmer's earlier products sharing at least one bucket
+    duplicate_of, best_similarity = None, 0.0
+    if buckets:
+        bucket_filter = Q()
+        for band, bucket in buckets:
+            bucket_filter |= Q(band=band, bucket=bucket)
+        candidate_ids = (
+            LSHBucket.objects
+            .filter(bucket_filter, product_id__lt=product_id, product__farmer_id=product.farmer_id)
+            .values_list('product_id', flat=True)
+            .distinct()
+        )
+        candidates = ListingFingerprint.objects.filter(pk__in=list(candidate_ids))
+
+        for candidate in candidates.order_by('pk'):
+            similarity = estimate_similarity(signature, candidate.minhash)
+            if is_duplicate(similarity, image_hash, candidate.image_hash) and similarity > best_similarity:
+                # Point at the original, not at another duplicate
+                duplicate_of = candidate.duplicate_of_id or candidate.pk
+                best_similarity = similarity
+
+    with transaction.atomic():
+        ListingFingerprint.objects.update_or_create(
+            product_id=product_id,
+            defaults={
+                'minhash': signature,
+                'image_name': image_name,
+                'image_hash': image_hash,
+                'duplicate_of_id': duplicate_of,
+                'similarity': best_similarity,
+            }
+        )
+        LSHBucket.objects.filter(product_id=product_id).delete()
+        LSHBucket.objects.bulk_create([
+            LSHBucket(band=band, bucket=bucket, product_id=product_id)
+            for band, bucket in buckets
+        ])
+        ProductListing.objects.filter(pk=product_id).update(duplicate_of_id=duplicate_of)
+
+    if duplicate_of:
+        logger.info(f"Product #{product_id} flagged as near-duplicate of #{duplicate_of}")
+    return duplicate_of
+
+
+def schedule_check(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    post_save handler: fingerprint the product in the background when
+    its text or main image may have changed
+    """
+    if raw:
+        return
+    if update_fields is not None and not set(update_fields) & {'name', 'description', 'image'}:
+        return
+    background.run_after_commit(check_product, instance.pk)
@@ -0,0 +1,182 @@
+"""
+Item-Item Recommendation Service
+
+Builds a sparse product co-occurrence matrix from order history: two
+products co-occur when the same buyer has ordered both. Similarity is
+the cosine of the products' buyer sets,
+
+    sim(i, j) = co_buyers(i, j) / sqrt(buyers(i) * buyers(j))
+
+and only the top-K neighbours per product are stored in
+ProductRecommendation. Request-time lookups read at most K rows per
+product instead of touching OrderItem.
+
+The matrix is rebuilt by the build_recommendations command.
+"""
+
+import heapq
+import logging
+import math
+from collections import defaultdict
+from itertools import combinations
+from typing import Dict, Iterable, List, Set
+
+from django.db import transaction
+
+from marketplace.models import ProductListing, ProductRecommendation
+
+logger = logging.getLogger(__name__)
+
+
+# Neighbours kept per product
+TOP_K = 10
+
+# Minimum number of shared buyers before a pair is trusted
+MIN_CO_BUYERS = 1
+
+# Baskets larger than this (wholesale buyers) are trimmed to their most
+# recent products so one buyer cannot dominate the quadratic pair count
+MAX_BASKET = 50
+
+# Purchases per buyer used to seed personalized picks
+SEED_PRODUCTS = 10
+
+
+# --- BATCH BUILD ---
+
+def buyer_baskets() -> Dict[int, List[int]]:
+    """
+    Distinct products ordered per buyer, most recent first; cancelled
+    orders are ignored
+    """
+    from orders.models import OrderItem
+
+    rows = (
+        OrderItem.objects
+        .exclude(order__status='cancelled')
+        .order_by('order__buyer_id', '-created_at')
+        .values_list('order__buyer_id', 'product_id')
+    )
+    baskets = defaultdict(list)
+    seen = defaultdict(set)
+    for buyer_id, product_id in rows.iterator(chunk_size=2000):
+        if product_id not in seen[buyer_id]:
+            seen[buyer_id].add(product_id)
+            baskets[buyer_id].append(product_id)
+    return baskets
+
+
+def compute_neighbours(baskets: Iterable[List[int]], top_k: int = TOP_K) -> Dict[int, List[tuple]]:
+    """
+    Top-K (score, co_buyers, neighbour_id) per product from buyer baskets
+    """
+    buyers = defaultdict(int)
+    co_occurrence = defaultdict(int)
+
+    for basket in baskets:
+        basket = sorted(basket[:MAX_BASKET])
+        for product_id in basket:
+            buyers[product_id] += 1
+        for a, b in combinations(basket, 2):
+            co_occurrence[(a, b)] += 1
+
+    neighbours = defaultdict(list)
+    for (a, b), count in co_occurrence.items():
+        if count < MIN_CO_BUYERS:
+            continue
+        score = count / math.sqrt(buyers[a] * buyers[b])
+        neighbours[a].append((score, count, b))
+        neighbours[b].append((score, count, a))
+
+    return {
+        product_id: heapq.nlargest(top_k, candidates)
+        for product_id, candidates in neighbours.items()
+    }
+
+
+@transaction.atomic
+def rebuild_recommendations(top_k: int = TOP_K) -> int:
+    """
+    Recompute and replace the whole recommendation table.
+
+    Returns:
+        Number of recommendation rows written
+    """
+    neighbours = compute_neighbours(buyer_baskets().values(), top_k)
+
+    rows = [
+        ProductRecommendation(
+            product_id=product_id,
+            neighbour_id=neighbour_id,
+            score=score,
+            co_buyers=count,
+            rank=rank,
+        )
+        for product_id, ranked in neighbours.items()
+        for rank, (score, count, neighbour_id) in enumerate(ranked, start=1)
+    ]
+
+    ProductRecommendation.objects.all().delete()
+    ProductRecommendation.objects.bulk_create(rows, batch_size=1000)
+
+    logger.info(f"Stored {len(rows)} recommendations for {len(neighbours)} products")
+    return len(rows)
+
+
+# --- REQUEST-TIME LOOKUPS ---
+
+def _listings_in_order(product_ids: List[int], exclude_farmer=None) -> List[ProductListing]:
+    # Neighbours that are no longer listed simply drop out
+    listings = ProductListing.objects.in_bulk(product_ids)
+    return [
+        listings[pk] for pk in product_ids
+        if pk in listings and listings[pk].farmer_id != exclude_farmer
+    ]
+
+
+def also_bought(product_id: int, limit: int = 4) -> List[ProductListing]:
+    """
+    "Buyers also bought" listings for a product detail page
+    """
+    neighbour_ids = list(
+        ProductRecommendation.objects
+        .filter(product_id=product_id)
+        .order_by('rank')
+        .values_list('neighbour_id', flat=True)[:TOP_K]
+    )
+    return _listings_in_order(neighbour_ids)[:limit]
+
+
+def personalized(user, limit: int = 4) -> List[ProductListing]:
+    """
+    Picks for a buyer: neighbours of the products they ordered recently,
+    scored by summed similarity, excluding what they already bought and
+    their own products
+    """
+    from orders.models import OrderItem
+
+    seeds: Set[int] = set()
+    for product_id in (
+        OrderItem.objects
+        .filter(order__buyer=user)
+        .exclude(order__status='cancelled')
+        .order_by('-created_at')
+        .values_list('product_id', flat=True)[:SEED_PRODUCTS * 3]
+    ):
+        seeds.add(product_id)
+        if len(seeds) >= SEED_PRODUCTS:
+            break
+    if not seeds:
+        return []
+
+    scores = defaultdict(float)
+    for neighbour_id, score in (
+        ProductRecommendation.objects
+        .filter(product_id__in=seeds)
+        .values_list('neighbour_id', 'score')
+    ):
+        if neighbour_id not in seeds:
+            scores[neighbour_id] += score
+
+    ranked = sorted(scores, key=scores.get, reverse=True)[:limit * 3]
+    return _listings_in_order(ranked, exclude_farmer=user.pk)[:limit]
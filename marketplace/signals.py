@@ -0,0 +1,201 @@
+"""
+Signal handlers that keep marketplace read models and cached fragments up to date
+"""
+
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from accounts.models import User, FarmerProfile
+from accounts.services.districts import resolve_district
+from orders.models import Order
+from .models import (
+    Product, ProductListing, Category, Review,
+    ExternalMarketPrice, CrowdsourcedPrice,
+)
+from .services import listings, fragment_cache, counters, near_duplicates
+
+
+# --- DISTRICT RESOLUTION ---
+
+@receiver(pre_save, sender=Product)
+def resolve_product_district(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    district = resolve_district(instance.location)
+    instance.district_id = district.pk if district else instance.farmer.home_district_id
+
+
+# --- PRODUCT LISTING READ MODEL ---
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    listings.sync_product_listing(instance)
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    listings.refresh_category_listings(instance.pk, instance.name)
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender, instance, **kwargs):
+    # Product.category is SET_NULL, which is applied without signals
+    listings.refresh_category_listings(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or instance.user_type != 'farmer':
+        return
+    # Logins only touch last_login, which the listing does not carry
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    listings.refresh_farmer_listings(instance)
+
+
+@receiver(post_save, sender=FarmerProfile)
+def farmer_profile_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    listings.refresh_farmer_listings(instance.user)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def review_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    listings.refresh_farmer_listings(instance.farmer)
+
+
+# --- NEAR-DUPLICATE DETECTION ---
+
+post_save.connect(near_duplicates.schedule_check, sender=Product, dispatch_uid='near_duplicates')
+
+
+# --- HOME PAGE FRAGMENT INVALIDATION ---
+
+@receiver(post_save, sender=ProductListing)
+@receiver(post_delete, sender=ProductListing)
+def listing_changed(sender, instance, **kwargs):
+    fragment_cache.invalidate_many('featured_products', 'recommended_products')
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def product_changed(sender, instance, **kwargs):
+    fragment_cache.invalidate('platform_stats')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    fragment_cache.invalidate_many('categories', 'featured_products', 'recommended_products')
+
+
+@receiver(post_save, sender=FarmerProfile)
+@receiver(post_delete, sender=FarmerProfile)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def farmer_reputation_changed(sender, instance, **kwargs):
+    # Listing rows are rewritten with queryset.update(), which sends no
+    # ProductListing signals, so product fragments are bumped here too
+    fragment_cache.invalidate_many('top_farmers', 'featured_products', 'recommended_products')
+
+
+@receiver(post_save, sender=User)
+def farmer_details_changed(sender, instance, update_fields=None, **kwargs):
+    if instance.user_type != 'farmer':
+        return
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    fragment_cache.invalidate_many('top_farmers', 'featured_products', 'recommended_products')
+
+
+@receiver(post_save, sender=ExternalMarketPrice)
+@receiver(post_delete, sender=ExternalMarketPrice)
+@receiver(post_save, sender=CrowdsourcedPrice)
+@receiver(post_delete, sender=CrowdsourcedPrice)
+def prices_changed(sender, instance, **kwargs):
+    fragment_cache.invalidate('hybrid_prices')
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def order_changed(sender, instance, **kwargs):
+    fragment_cache.invalidate('recent_orders', scope=instance.buyer_id)
+    fragment_cache.invalidate('personal_picks', scope=instance.buyer_id)
+
+
+# --- PLATFORM COUNTERS ---
+# pre_save snapshots the stored state so post_save can apply the difference
+
+@receiver(pre_save, sender=Product)
+def snapshot_product(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    instance._counter_state = counters.product_state_from_db(instance.pk) if instance.pk else None
+
+
+@receiver(post_save, sender=Product)
+def count_product(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    counters.record_product_change(
+        getattr(instance, '_counter_state', None),
+        counters.product_state(instance)
+    )
+
+
+@receiver(post_delete, sender=Product)
+def uncount_product(sender, instance, **kwargs):
+    counters.record_product_change(counters.product_state(instance), None)
+
+
+@receiver(pre_save, sender=Order)
+def snapshot_order(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    old_status = None
+    if instance.pk:
+        old_status = Order.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+    instance._counter_state = counters.OrderState(old_status, instance.farmer_id) if old_status else None
+
+
+@receiver(post_save, sender=Order)
+def count_order(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    counters.record_order_change(
+        getattr(instance, '_counter_state', None),
+        counters.OrderState(instance.status, instance.farmer_id)
+    )
+
+
+@receiver(post_delete, sender=Order)
+def uncount_order(sender, instance, **kwargs):
+    counters.record_order_change(counters.OrderState(instance.status, instance.farmer_id), None)
+
+
+@receiver(pre_save, sender=User)
+def snapshot_user_district(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Only farmers' district changes move counters; skip the read for
+    # everything else, e.g. the last_login update on every sign-in
+    instance._old_district = None
+    if raw or not instance.pk or instance.user_type != 'farmer':
+        return
+    if update_fields is not None and 'district' not in update_fields:
+        return
+    instance._old_district = User.objects.filter(pk=instance.pk).values_list('district', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def move_district_counters(sender, instance, raw=False, **kwargs):
+    old_district = getattr(instance, '_old_district', None)
+    if raw or old_district is None or instance.user_type != 'farmer':
+        return
+    counters.move_farmer_district(instance.pk, old_district, instance.district)
@@ -0,0 +1,47 @@
+"""
+Content-addressed file storage for marketplace uploads
+"""
+
+import hashlib
+import os
+import posixpath
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ContentHashStorage(FileSystemStorage):
+    """
+    Stores uploads under the SHA-256 of their content, so a photo that
+    is uploaded again is kept once and shared by every listing using it.
+
+    products/tomato.jpg -> products/3f/3fa2...e1.jpg
+    """
+    CHUNK_SIZE = 64 * 1024
+
+    def content_hash(self, content) -> str:
+        digest = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks(self.CHUNK_SIZE):
+            digest.update(chunk)
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        return digest.hexdigest()
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        digest = self.content_hash(content)
+        directory = posixpath.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        hashed_name = posixpath.join(directory, digest[:2], f"{digest}{extension}")
+
+        # Identical content already stored: reuse it instead of writing a copy
+        if self.exists(hashed_name):
+            return hashed_name
+        return super().save(hashed_name, content, max_length=max_length)
+
+
+content_hash_storage = ContentHashStorage()
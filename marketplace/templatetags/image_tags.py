@@ -0,0 +1,53 @@
+from django import template
+from django.utils.html import format_html
+
+from marketplace.services.image_variants import srcset, variant_url
+
+register = template.Library()
+
+# Default `sizes` hint per variant
+SIZES = {
+    'thumb': '160px',
+    'card': '(max-width: 576px) 100vw, 480px',
+    'detail': '(max-width: 768px) 100vw, 1024px',
+}
+
+
+@register.simple_tag
+def responsive_image(fieldfile, variant='card', alt='', css_class='', style='', sizes=None):
+    """
+    Render a <picture> with WebP and JPEG srcsets for an image field,
+    falling back to the original upload until variants exist.
+    Usage: {% responsive_image product.image 'card' alt=product.name css_class="card-img-top" %}
+    """
+    if not fieldfile:
+        return ''
+
+    webp = srcset(fieldfile, 'webp')
+    if not webp:
+        return format_html(
+            '<img src="{}" class="{}" alt="{}" style="{}" loading="lazy">',
+            fieldfile.url, css_class, alt, style
+        )
+
+    sizes = sizes or SIZES.get(variant, SIZES['card'])
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" class="{}" alt="{}" style="{}" loading="lazy">'
+        '</picture>',
+        webp, sizes,
+        variant_url(fieldfile, variant), srcset(fieldfile, 'jpg'), sizes,
+        css_class, alt, style
+    )
+
+
+@register.filter
+def variant(fieldfile, name):
+    """
+    URL of a JPEG variant, or the original while variants are pending
+    Usage: {{ product.image|variant:'thumb' }}
+    """
+    if not fieldfile:
+        return ''
+    return variant_url(fieldfile, name) or fieldfile.url
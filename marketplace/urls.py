@@ -9,9 +9,17 @@ urlpatterns = [
     path('market-prices/', views.market_prices, name='market_prices'),
     path('price-tracker/', views.price_tracker, name='price_tracker'),
     path('districts/', views.district_list, name='district_list'),
+    path('districts/nearest/', views.nearest_district, name='nearest_district'),
     path('farmers/', views.farmer_list, name='farmer_list'),
     path('report-price/', views.report_price, name='report_price'),
     
+    # Farmer management
+    path('dashboard/', views.farmer_dashboard, name='farmer_dashboard'),
+    path('dashboard/sales/', views.farmer_sales_api, name='farmer_sales_api'),
+    path('products/add/', views.add_product, name='add_product'),
+    path('products/<int:pk>/edit/', views.edit_product, name='edit_product'),
+    path('products/<int:pk>/delete/', views.delete_product, name='delete_product'),
+    
     # Reviews
     path('reviews/create/<int:order_id>/', views.create_review, name='create_review'),
     path('reviews/farmer/<int:farmer_id>/', views.farmer_reviews, name='farmer_reviews'),
@@ -1,79 +1,99 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q, Avg, Max, Min, Count
+from django.db import transaction
+from django.db.models import Q, F, Avg, Max, Min, Count, OuterRef, Subquery, Exists, Case, When, Value
+from django.db.models.functions import Coalesce
 from datetime import date, timedelta
 from django.db.models import Count
 
-from .models import Product, Category, MarketPrice, CrowdsourcedPrice, ExternalMarketPrice
+from .models import Product, ProductListing, Category, MarketPrice, CrowdsourcedPrice, ExternalMarketPrice, DistrictDistance
 from orders.models import Order
-from accounts.models import FarmerProfile
+from orders.services import analytics
+from .services.idempotency import idempotent
+from inventory.services import ledger
+from accounts.models import FarmerProfile, District
+from accounts.services.districts import resolve_district
 from .services.price_fetcher import combine_price_sources
+from .services.fragment_cache import get_fragment
+from .services import counters, recommendations, geo
 
 # --- MARKETPLACE VIEWS ---
 
-def home(request):
-    """
-    Homepage view - displays featured products, categories, news, weather, and user data
-    """
-    # Products & stats — uses your actual 'status' field
-    featured_products = (
-        Product.objects
-        .filter(status='available')
-        .select_related('category', 'farmer')
-        .order_by('-created_at')[:4]
+# --- HOME PAGE FRAGMENTS ---
+# Each builder returns plain lists/dicts so the result can be cached.
+# Invalidation is driven by model signals in marketplace/signals.py.
+
+def _featured_products():
+    return list(ProductListing.objects.order_by('-created_at')[:4])
+
+
+def _categories():
+    return list(Category.objects.all()[:12])
+
+
+def _platform_stats():
+    totals = counters.get_many(['available_products', 'active_farmers'])
+    return {
+        'total_products': totals['available_products'],
+        'total_farmers': totals['active_farmers'],
+    }
+
+
+def _top_farmers():
+    return list(
+        FarmerProfile.objects
+        .filter(rating_average__gt=0)
+        .select_related('user')
+        .order_by('-rating_average')[:3]
     )
-    categories = Category.objects.all()[:12]
-    total_products = Product.objects.filter(status='available').count()
-    total_farmers = Product.objects.values('farmer').distinct().count()
 
-    # Top rated farmers (keep existing logic)
-    top_farmers = FarmerProfile.objects.filter(rating_average__gt=0).order_by('-rating_average')[:3]
 
-    # Latest 3 approved news articles
+def _latest_news():
     try:
         from news.models import News
-        latest_news = (
+        return list(
             News.objects
             .filter(status='approved')
             .select_related('author')
             .order_by('-created_at')[:3]
         )
     except Exception:
-        latest_news = []
+        return []
 
-    # Recommended products from same district as logged-in user
-    recommended_products = []
-    if request.user.is_authenticated and hasattr(request.user, 'district') and request.user.district:
-        recommended_products = (
-            Product.objects
-            .filter(status='available', farmer__district=request.user.district)
-            .exclude(farmer=request.user)
-            .select_related('category', 'farmer')
-            .order_by('-created_at')[:4]
-        )
 
-    # Recent orders for logged-in user
-    recent_orders = []
-    if request.user.is_authenticated:
-        try:
-            # Try buyer field first (orders placed by this user as a customer)
-            recent_orders = (
-                Order.objects
-                .filter(buyer=request.user)
-                .order_by('-created_at')[:3]
-            )
-        except Exception:
-            try:
-                # Fallback: orders received by this user as a farmer
-                recent_orders = (
-                    Order.objects
-                    .filter(farmer=request.user)
-                    .order_by('-created_at')[:3]
-                )
-            except Exception:
-                recent_orders = []
+def _with_distance(listings, district):
+    """
+    Annotate listings with distance_km from a district via the
+    precomputed DistrictDistance table
+    """
+    distance = DistrictDistance.objects.filter(
+        from_district=district,
+        to_district=OuterRef('farmer_district')
+    ).values('distance_km')[:1]
+    return listings.annotate(distance_km=Subquery(distance))
+
+
+def _district_products(district, user):
+    # Products from the district and its neighbours, nearest first,
+    # other than the viewer's own
+    listings = (
+        ProductListing.objects
+        .filter(farmer_district__in=geo.districts_within(district))
+        .exclude(farmer_id=user.pk)
+    )
+    return list(
+        _with_distance(listings, district)
+        .order_by(F('distance_km').asc(nulls_first=True), '-created_at')[:4]
+    )
 
+
+def _recent_orders(user):
+    return list(Order.objects.filter(buyer=user).order_by('-created_at')[:3])
+
+
+def _hybrid_prices():
     # HYBRID MARKET PRICES - Combine WFP API + Crowdsourced
     # Get recent external prices (last 7 days)
     week_ago = date.today() - timedelta(days=7)
@@ -98,18 +118,48 @@ def home(request):
     } for p in external_prices]
     
     # Combine both sources
-    hybrid_prices = combine_price_sources(external_price_dicts, crowdsourced_recent)
+    return combine_price_sources(external_price_dicts, crowdsourced_recent)
+
+
+def home(request):
+    """
+    Homepage view - displays featured products, categories, news, weather, and user data.
+    Shared fragments are cached for all visitors; per-user fragments are keyed by user.
+    """
+    stats = get_fragment('platform_stats', _platform_stats)
+
+    # Personalized picks from the buyer's order history, falling back
+    # to products from the user's district
+    recommended_products = []
+    if request.user.is_authenticated:
+        recommended_products = get_fragment(
+            'personal_picks', lambda: recommendations.personalized(request.user), scope=request.user.pk
+        )
+    if not recommended_products and request.user.is_authenticated and getattr(request.user, 'district', ''):
+        district = request.user.district
+        # Varied (not scoped) by viewer, so listing changes still invalidate it
+        recommended_products = get_fragment(
+            'recommended_products', lambda: _district_products(district, request.user),
+            vary=f"{district}:{request.user.pk}"
+        )
+
+    # Recent orders for logged-in user
+    recent_orders = []
+    if request.user.is_authenticated:
+        recent_orders = get_fragment(
+            'recent_orders', lambda: _recent_orders(request.user), scope=request.user.pk
+        )
 
     context = {
-        'featured_products':    featured_products,
-        'categories':           categories,
-        'total_products':       total_products,
-        'total_farmers':        total_farmers,
-        'top_farmers':          top_farmers,
-        'latest_news':          latest_news,
+        'featured_products':    get_fragment('featured_products', _featured_products),
+        'categories':           get_fragment('categories', _categories),
+        'total_products':       stats['total_products'],
+        'total_farmers':        stats['total_farmers'],
+        'top_farmers':          get_fragment('top_farmers', _top_farmers),
+        'latest_news':          get_fragment('latest_news', _latest_news),
         'recommended_products': recommended_products,
         'recent_orders':        recent_orders,
-        'hybrid_prices':        hybrid_prices,  # NEW: Hybrid price data
+        'hybrid_prices':        get_fragment('hybrid_prices', _hybrid_prices),  # NEW: Hybrid price data
         'all_districts':        UGANDA_REGIONS, # Pass the regions dict or flat list
     }
     return render(request, 'marketplace/home.html', context)
@@ -119,26 +169,56 @@ def product_list(request):
     """
     Display all products with search and filter functionality
     """
-    products = Product.objects.filter(status='available')
+    products = ProductListing.objects.all()
     category_id = request.GET.get('category')
     search_query = request.GET.get('search')
     location = request.GET.get('location')
     urgent_only = request.GET.get('urgent')
+    sort = request.GET.get('sort')
+
+    # Buyer's district for distance sorting: explicit ?near=, else profile
+    near = request.GET.get('near')
+    if not near and request.user.is_authenticated:
+        near = getattr(request.user, 'district', '')
     
     if category_id:
         products = products.filter(category_id=category_id)
     if search_query:
         products = products.filter(
-            Q(name__icontains=search_query) | Q(description__icontains=search_query)
+            Q(name__icontains=search_query) |
+            Q(description__icontains=search_query)
         )
     if location:
-        products = products.filter(location__icontains=location)
+        # Indexed district filter; unresolvable text falls back to a substring match
+        district = resolve_district(location)
+        if district:
+            products = products.filter(district_id=district.pk)
+        else:
+            products = products.filter(location__icontains=location)
     if urgent_only:
         products = products.filter(is_urgent=True)
+
+    # Collapse near-duplicates whose original is in these same results
+    products = products.exclude(Exists(
+        products.filter(pk=OuterRef('duplicate_of_id'), farmer_id=OuterRef('farmer_id'))
+    ))
+
+    if sort == 'distance' and near:
+        products = _with_distance(products, near).order_by(
+            F('distance_km').asc(nulls_last=True), '-created_at'
+        )
+    elif sort == 'price_asc':
+        products = products.order_by('price')
+    elif sort == 'price_desc':
+        products = products.order_by('-price')
     
-    urgent_products = Product.objects.filter(status='available', is_urgent=True)[:4]
+    urgent_products = ProductListing.objects.filter(is_urgent=True)[:4]
     categories = Category.objects.all()
-    locations = Product.objects.values_list('location', flat=True).distinct()
+    locations = (
+        District.objects
+        .filter(pk__in=ProductListing.objects.values('district_id'))
+        .values_list('name', flat=True)
+    )
     
     context = {
         'products': products,
@@ -149,14 +229,22 @@ def product_list(request):
         'selected_location': location,
         'urgent_products': urgent_products,
         'urgent_only': urgent_only,
+        'sort': sort,
+        'near': near,
     }
     return render(request, 'marketplace/product_list.html', context)
 
 
 def product_detail(request, pk):
     product = get_object_or_404(Product, pk=pk, status='available')
-    related_products = Product.objects.filter(category=product.category, status='available').exclude(pk=pk)[:4]
-    return render(request, 'marketplace/product_detail.html', {'product': product, 'related_products': related_products})
+    # Co-purchase neighbours first; same-category products when there is no order history yet
+    also_bought = recommendations.also_bought(pk)
+    related_products = also_bought or ProductListing.objects.filter(category_id=product.category_id).exclude(pk=pk)[:4]
+    return render(request, 'marketplace/product_detail.html', {
+        'product': product,
+        'related_products': related_products,
+        'also_bought': bool(also_bought),
+    })
 
 
 # --- PRICE INTELLIGENCE VIEWS ---
@@ -189,6 +277,7 @@ def market_prices(request):
 
 
 @login_required
+@idempotent
 def report_price(request):
     """
     Farmers report prices they're actually getting in the field
@@ -205,7 +294,7 @@ def report_price(request):
             notes=request.POST.get('notes')
         )
         messages.success(request, 'Thank you! Your price report helps other farmers.')
-        return redirect('price_tracker')
+        return redirect('marketplace:price_tracker')
     
     return render(request, 'marketplace/report_price.html')
 
@@ -254,19 +343,81 @@ def farmer_dashboard(request):
         messages.error(request, 'Only farmers can access this page!')
         return redirect('home')
     
-    products = Product.objects.filter(farmer=request.user)
-    orders_received = Order.objects.filter(farmer=request.user).order_by('-created_at')[:5]
+    products = Product.objects.filter(farmer=request.user).select_related('category')
+    orders_received = Order.objects.filter(farmer=request.user).select_related('buyer').order_by('-created_at')[:5]
+    totals = counters.get_many(
+        ['products', 'available_products', 'orders_pending'],
+        scope='farmer', key=request.user.pk
+    )
+    
+    # Sales analytics read from the DailySales aggregates
+    days = _sales_period(request)
+    start, end = analytics.date_range(days)
+    series = analytics.daily(request.user, start, end)
+    best_day = max((entry['revenue'] for entry in series), default=0)
+    for entry in series:
+        entry['share'] = int(entry['revenue'] * 100 / best_day) if best_day else 0
     
     context = {
         'products': products,
         'orders_received': orders_received,
-        'total_products': products.count(),
-        'available_products': products.filter(status='available').count(),
-        'pending_orders': Order.objects.filter(farmer=request.user, status='pending').count(),
+        'total_products': totals['products'],
+        'available_products': totals['available_products'],
+        'pending_orders': totals['orders_pending'],
+        'sales_days': days,
+        'sales_periods': SALES_PERIODS,
+        'sales_series': series,
+        'sales_summary': analytics.summary(series),
+        'sales_by_product': analytics.breakdown(request.user, 'product', start, end)[:10],
+        'sales_by_buyer_type': analytics.breakdown(request.user, 'buyer_type', start, end),
     }
     return render(request, 'marketplace/farmer_dashboard.html', context)
 
 
+SALES_PERIODS = (7, 30, 90, 365)
+
+
+def _sales_period(request) -> int:
+    try:
+        days = int(request.GET.get('days', 30))
+    except ValueError:
+        days = 30
+    return days if days in SALES_PERIODS else 30
+
+
+@login_required
+def farmer_sales_api(request):
+    """
+    API endpoint: the farmer's sales per day, product and buyer type
+    Usage: /dashboard/sales/?days=365
+    """
+    if request.user.user_type != 'farmer':
+        return JsonResponse({'error': 'Only farmers have sales analytics'}, status=403)
+    
+    days = _sales_period(request)
+    start, end = analytics.date_range(days)
+    series = analytics.daily(request.user, start, end)
+    summary = analytics.summary(series)
+    
+    def totals(row):
+        return {'orders': row['orders'], 'units': row['units'], 'revenue': float(row['revenue'])}
+    
+    return JsonResponse({
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'summary': {'orders': summary.orders, 'units': summary.units, 'revenue': float(summary.revenue)},
+        'daily': [{'day': entry['day'].isoformat(), **totals(entry)} for entry in series],
+        'by_product': [
+            {'product_id': int(row['key']), 'name': row['label'], **totals(row)}
+            for row in analytics.breakdown(request.user, 'product', start, end)
+        ],
+        'by_buyer_type': [
+            {'buyer_type': row['key'], 'label': row['label'], **totals(row)}
+            for row in analytics.breakdown(request.user, 'buyer_type', start, end)
+        ],
+    })
+
+
 @login_required
 def add_product(request):
     if request.user.user_type != 'farmer':
@@ -278,25 +429,28 @@ def add_product(request):
         is_urgent = request.POST.get('is_urgent') == 'on'
         harvest_date = request.POST.get('harvest_date')
         
-        Product.objects.create(
-            farmer=request.user,
-            category_id=request.POST.get('category'),
-            name=name,
-            description=request.POST.get('description'),
-            price=request.POST.get('price'),
-            quantity=request.POST.get('quantity'),
-            unit=request.POST.get('unit'),
-            location=request.POST.get('location'),
-            image=request.FILES.get('image'),
-            image2=request.FILES.get('image2'),
-            image3=request.FILES.get('image3'),
-            is_urgent=is_urgent,
-            urgent_discount=request.POST.get('urgent_discount') or 0,
-            harvest_date=harvest_date if harvest_date else None,
-            status='available'
-        )
+        # The product and its opening stock movement land together or not at all
+        with transaction.atomic():
+            product = Product.objects.create(
+                farmer=request.user,
+                category_id=request.POST.get('category'),
+                name=name,
+                description=request.POST.get('description'),
+                price=request.POST.get('price'),
+                quantity=request.POST.get('quantity'),
+                unit=request.POST.get('unit'),
+                location=request.POST.get('location'),
+                image=request.FILES.get('image'),
+                image2=request.FILES.get('image2'),
+                image3=request.FILES.get('image3'),
+                is_urgent=is_urgent,
+                urgent_discount=request.POST.get('urgent_discount') or 0,
+                harvest_date=harvest_date if harvest_date else None,
+                status='available'
+            )
+            ledger.record(ledger.PRODUCT, [(product.pk, int(product.quantity), '')], 'opening', request.user)
         messages.success(request, f'Product "{name}" added successfully!')
-        return redirect('farmer_dashboard')
+        return redirect('marketplace:farmer_dashboard')
     
     return render(request, 'marketplace/add_product.html', {'categories': Category.objects.all()})
 
@@ -325,9 +479,9 @@ def edit_product(request, pk):
         if request.FILES.get('image2'): product.image2 = request.FILES.get('image2')
         if request.FILES.get('image3'): product.image3 = request.FILES.get('image3')
         
-        product.save()
+        ledger.save_item(ledger.PRODUCT, product, request.user)
         messages.success(request, f'Product "{product.name}" updated!')
-        return redirect('farmer_dashboard')
+        return redirect('marketplace:farmer_dashboard')
     
     return render(request, 'marketplace/edit_product.html', {'product': product, 'categories': Category.objects.all()})
 
@@ -337,72 +491,89 @@ def delete_product(request, pk):
     product = get_object_or_404(Product, pk=pk, farmer=request.user)
     if request.method == 'POST':
         name = product.name
-        product.delete()
+        with transaction.atomic():
+            current = Product.objects.select_for_update().values_list('quantity', flat=True).get(pk=product.pk)
+            ledger.record_adjustment(ledger.PRODUCT, product.pk, current, 0, request.user, 'deleted')
+            product.delete()
         messages.success(request, f'Product "{name}" deleted!')
-        return redirect('farmer_dashboard')
+        return redirect('marketplace:farmer_dashboard')
     return render(request, 'marketplace/delete_product.html', {'product': product})
 
 
-from .constants import UGANDA_REGIONS, DISTRICT_COORDINATES
+from .constants import UGANDA_REGIONS, DISTRICT_COORDINATES, DISTRICT_REGIONS
 
 def district_list(request):
     """
     Display interactive map and list of districts with stats.
+    Farmer counts come from one join of the district reference table.
     """
-    from accounts.models import User
-    from django.db.models import Count
-
-    # Get farmer counts
-    farmer_counts = User.objects.filter(user_type='farmer').values('district').annotate(count=Count('id'))
-    stats = {item['district']: item['count'] for item in farmer_counts if item['district']}
-
-    # Prepare structured data for template
-    region_data = {}
-    for region, districts in UGANDA_REGIONS.items():
-        region_data[region] = []
-        for district in districts:
-            count = stats.get(district, 0)
-            region_data[region].append({'name': district, 'count': count})
+    districts = (
+        District.objects
+        .select_related('region')
+        .annotate(count=Count('residents', filter=Q(residents__user_type='farmer')))
+        .order_by('region__name', 'name')
+    )
 
     context = {
-        'region_data': region_data, # Use this structured data
+        'districts': districts,
         'coordinates': DISTRICT_COORDINATES,
         'mapbox_token': 'pk.eyJ1IjoibWF0cml4IiwiYSI6ImNs...placeholder...if_needed' 
     }
     return render(request, 'marketplace/district_list.html', context)
 
+def nearest_district(request):
+    """
+    API endpoint: nearest district to a GPS point
+    Usage: /districts/nearest/?lat=0.31&lng=32.58
+    """
+    try:
+        lat = float(request.GET['lat'])
+        lng = float(request.GET['lng'])
+    except (KeyError, ValueError):
+        return JsonResponse({'error': 'lat and lng are required'}, status=400)
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return JsonResponse({'error': 'Coordinates out of range'}, status=400)
+
+    result = geo.nearest_district(lat, lng)
+    if result is None:
+        return JsonResponse({'error': 'No district coordinates available'}, status=404)
+    district, km = result
+    return JsonResponse({
+        'district': district,
+        'region': DISTRICT_REGIONS.get(district, ''),
+        'distance_km': round(km, 1),
+    })
+
 def farmer_list(request):
     """
-    Display a list of all registered farmers grouped by region
+    Display all registered farmers grouped by region, with how many
+    products each has on sale. One query: profile and region are joined,
+    the product count is a filtered COUNT.
     """
     from accounts.models import User
-    
-    # Use imported regions
-    REGIONS = UGANDA_REGIONS
-    
-    farmers = User.objects.filter(user_type='farmer').select_related('farmer_profile')
-    
-    farmers_by_region = {region: [] for region in REGIONS.keys()}
-    farmers_by_region['Other'] = []
-    
-    for farmer in farmers:
-        district = farmer.district
-        placed = False
-        if district:
-            for region, districts in REGIONS.items():
-                if district in districts:
-                    farmers_by_region[region].append(farmer)
-                    placed = True
-                    break
-        
-        if not placed:
-            farmers_by_region['Other'].append(farmer)
-            
-    # Remove empty regions
-    farmers_by_region = {k: v for k, v in farmers_by_region.items() if v}
-    
+
+    farmers = (
+        User.objects
+        .filter(user_type='farmer')
+        .values(
+            'id', 'username', 'is_verified', 'profile_picture', 'district', 'specialization',
+            farmer_region=Coalesce('home_district__region__name', Value('')),
+            farm_name=F('farmer_profile__farm_name'),
+            farm_size=F('farmer_profile__farm_size'),
+            rating=F('farmer_profile__rating_average'),
+            total_sales=F('farmer_profile__total_sales'),
+        )
+        .annotate(product_count=Count('products', filter=Q(products__status='available')))
+        # Farmers without a resolved region ("Other") go last; the
+        # template regroups the ordered rows by region
+        .order_by(
+            Case(When(farmer_region='', then=Value(1)), default=Value(0)),
+            'farmer_region', 'username'
+        )
+    )
+
     context = {
-        'farmers_by_region': farmers_by_region,
+        'farmers': farmers,
     }
     return render(request, 'marketplace/farmer_list.html', context)
 
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='notification_type',
+            field=models.CharField(choices=[('news', 'News'), ('product', 'Product'), ('order', 'Order'), ('weather', 'Weather'), ('system', 'System'), ('admin', 'Admin')], max_length=20),
+        ),
+    ]
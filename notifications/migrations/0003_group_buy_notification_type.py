@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_order_notification_type'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='notification_type',
+            field=models.CharField(choices=[('news', 'News'), ('product', 'Product'), ('order', 'Order'), ('group_buy', 'Group Buy'), ('weather', 'Weather'), ('system', 'System'), ('admin', 'Admin')], max_length=20),
+        ),
+    ]
@@ -8,6 +8,8 @@ class Notification(models.Model):
     NOTIFICATION_TYPES = [
         ('news', 'News'),
         ('product', 'Product'),
+        ('order', 'Order'),
+        ('group_buy', 'Group Buy'),
         ('weather', 'Weather'),
         ('system', 'System'),
         ('admin', 'Admin'),
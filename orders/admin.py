@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Order, OrderItem
+from .models import Order, OrderItem, OrderEvent, Cart, CartItem, OrderSequence, IdempotencyKey, MobileMoneyPayment
 
 class OrderItemInline(admin.TabularInline):
     """
@@ -10,6 +10,19 @@ class OrderItemInline(admin.TabularInline):
     readonly_fields = ['subtotal']
     fields = ['product', 'quantity', 'unit_price', 'subtotal']
 
+class OrderEventInline(admin.TabularInline):
+    """
+    Status history; events are append-only
+    """
+    model = OrderEvent
+    extra = 0
+    fields = ['created_at', 'from_status', 'to_status', 'actor', 'note']
+    readonly_fields = fields
+    can_delete = False
+    
+    def has_add_permission(self, request, obj=None):
+        return False
+
 class OrderAdmin(admin.ModelAdmin):
     """
     Customize order admin
@@ -19,7 +32,7 @@ class OrderAdmin(admin.ModelAdmin):
     search_fields = ['order_number', 'buyer__username', 'farmer__username']
     readonly_fields = ['order_number', 'created_at', 'updated_at']
     
-    inlines = [OrderItemInline]
+    inlines = [OrderItemInline, OrderEventInline]
     
     fieldsets = (
         ('Order Information', {
@@ -37,4 +50,37 @@ class OrderAdmin(admin.ModelAdmin):
     )
 
 admin.site.register(Order, OrderAdmin)
-admin.site.register(OrderItem)
\ No newline at end of file
+admin.site.register(OrderItem)
+
+class CartItemInline(admin.TabularInline):
+    model = CartItem
+    extra = 0
+    fields = ['product', 'quantity', 'added_at']
+    readonly_fields = ['added_at']
+
+@admin.register(Cart)
+class CartAdmin(admin.ModelAdmin):
+    list_display = ['user', 'updated_at']
+    search_fields = ['user__username']
+    inlines = [CartItemInline]
+
+@admin.register(OrderSequence)
+class OrderSequenceAdmin(admin.ModelAdmin):
+    list_display = ['day', 'next_value']
+    ordering = ['-day']
+    readonly_fields = ['day', 'next_value']
+
+@admin.register(IdempotencyKey)
+class IdempotencyKeyAdmin(admin.ModelAdmin):
+    list_display = ['key', 'user', 'path', 'status_code', 'created_at', 'expires_at']
+    list_filter = ['status_code']
+    search_fields = ['key', 'user__username', 'path']
+    readonly_fields = ['created_at']
+
+@admin.register(MobileMoneyPayment)
+class MobileMoneyPaymentAdmin(admin.ModelAdmin):
+    list_display = ['transaction_id', 'order', 'phone', 'amount', 'matched_by', 'paid_at']
+    list_filter = ['matched_by']
+    search_fields = ['transaction_id', 'order__order_number', 'phone', 'reference']
+    raw_id_fields = ['order']
+    readonly_fields = ['created_at']
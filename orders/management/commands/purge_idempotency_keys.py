@@ -0,0 +1,21 @@
+"""
+Django management command to purge expired idempotency keys
+
+Keys only need to outlive a client's retries (IDEMPOTENCY_KEY_TTL,
+1 day by default). Schedule this periodically (e.g. hourly via cron)
+so the table stays small.
+
+Usage:
+    python manage.py purge_idempotency_keys
+"""
+
+from django.core.management.base import BaseCommand
+from marketplace.services.idempotency import purge
+
+
+class Command(BaseCommand):
+    help = 'Delete expired idempotency keys'
+
+    def handle(self, *args, **options):
+        deleted = purge()
+        self.stdout.write(self.style.SUCCESS(f'✓ Purged {deleted} expired idempotency keys'))
@@ -0,0 +1,119 @@
+"""
+Django management command to reconcile a mobile-money statement
+
+Streams a provider statement (CSV) once, matches its lines to open
+orders by order number, or by payer phone and amount within a time
+window, and reports matched, ambiguous and unmatched lines. With
+--apply, matched lines are recorded as MobileMoneyPayment rows so the
+orders are no longer open and the lines are skipped on the next run.
+
+Usage:
+    python manage.py reconcile_payments statement.csv
+    python manage.py reconcile_payments statement.csv --apply --report unmatched.csv
+    python manage.py reconcile_payments statement.csv --column date=Transaction Date --column phone=MSISDN
+"""
+
+import csv
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from orders.services import reconciliation
+
+
+class Command(BaseCommand):
+    help = 'Match a mobile-money statement (CSV) against open orders'
+
+    def add_arguments(self, parser):
+        parser.add_argument('statement', help='Path to the statement CSV')
+        parser.add_argument('--apply', action='store_true', help='Record matched payments')
+        parser.add_argument('--report', help='Write ambiguous, unmatched and invalid lines to this CSV')
+        parser.add_argument('--window-days', type=float, default=reconciliation.WINDOW.days,
+                            help='How long after an order a phone/amount payment may arrive')
+        parser.add_argument('--lookback-days', type=int, default=reconciliation.LOOKBACK.days,
+                            help='Only consider orders placed within this many days')
+        parser.add_argument('--column', action='append', default=[], metavar='FIELD=HEADER',
+                            help='Statement header for a field (transaction_id, date, phone, amount, reference)')
+
+    def handle(self, *args, **options):
+        columns = {}
+        for spec in options['column']:
+            field, _, header = spec.partition('=')
+            if field not in reconciliation.DEFAULT_COLUMNS or not header:
+                raise CommandError(f'Invalid --column {spec!r}')
+            columns[field] = header
+
+        started = time.monotonic()
+        index = reconciliation.build_index(
+            since=timezone.now() - timedelta(days=options['lookback_days']),
+            window=timedelta(days=options['window_days']),
+        )
+        self.stdout.write(self.style.NOTICE(f'Indexed {len(index)} open orders'))
+
+        counts = Counter()
+        matched = []
+        saved = Counter()
+        report = None
+
+        def flush():
+            # Record matches a batch at a time so memory stays flat
+            with transaction.atomic():
+                created, conflicts = reconciliation.save_matches(matched)
+            saved['created'] += created
+            saved['conflicts'] += conflicts
+            matched.clear()
+
+        try:
+            with open(options['statement'], newline='', encoding='utf-8-sig') as handle:
+                if options['report']:
+                    report_file = open(options['report'], 'w', newline='', encoding='utf-8')
+                    report = csv.writer(report_file)
+                    report.writerow(['transaction_id', 'date', 'phone', 'amount', 'reference', 'status', 'candidates'])
+
+                lines = reconciliation.read_statement(handle, columns)
+                for result in reconciliation.reconcile(lines, index):
+                    counts[result.status] += 1
+                    if result.status == reconciliation.MATCHED:
+                        if options['apply']:
+                            matched.append(result)
+                            if len(matched) >= reconciliation.SAVE_BATCH:
+                                flush()
+                    elif report is not None:
+                        line = result.line
+                        report.writerow([
+                            line.transaction_id, line.paid_at.isoformat() if line.paid_at else '',
+                            line.phone, line.amount, line.reference, result.status,
+                            ' '.join(order.order_number for order in result.orders),
+                        ])
+        except FileNotFoundError:
+            raise CommandError(f"Statement not found: {options['statement']}")
+        except ValueError as error:
+            raise CommandError(str(error))
+        finally:
+            if report is not None:
+                report_file.close()
+
+        if matched:
+            flush()
+
+        elapsed = time.monotonic() - started
+        total = sum(counts.values())
+        self.stdout.write(
+            f"{total} lines in {elapsed:.1f}s: "
+            f"{counts[reconciliation.MATCHED]} matched, "
+            f"{counts[reconciliation.AMBIGUOUS]} ambiguous, "
+            f"{counts[reconciliation.UNMATCHED]} unmatched, "
+            f"{counts[reconciliation.INVALID]} invalid"
+        )
+        if options['apply']:
+            if saved['conflicts']:
+                self.stdout.write(self.style.WARNING(
+                    f"Skipped {saved['conflicts']} matches already recorded (transaction or order)"
+                ))
+            self.stdout.write(self.style.SUCCESS(f"✓ Recorded {saved['created']} payments"))
+        else:
+            self.stdout.write(self.style.SUCCESS('✓ Dry run; use --apply to record matched payments'))
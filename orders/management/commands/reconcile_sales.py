@@ -0,0 +1,25 @@
+"""
+Django management command to reconcile farmer sales analytics
+
+Recomputes the DailySales rows from completed orders and repairs any
+that drifted (e.g. orders edited in the admin). Schedule it nightly
+via cron alongside reconcile_counters.
+
+Usage:
+    python manage.py reconcile_sales
+"""
+
+from django.core.management.base import BaseCommand
+from orders.services.analytics import reconcile
+
+
+class Command(BaseCommand):
+    help = 'Recompute daily sales aggregates from completed orders'
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.NOTICE('Reconciling daily sales...'))
+        drifted = reconcile()
+        if drifted:
+            self.stdout.write(self.style.WARNING(f'Repaired {drifted} daily sales rows'))
+        else:
+            self.stdout.write(self.style.SUCCESS('✓ All daily sales are accurate'))
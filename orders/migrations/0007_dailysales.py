@@ -0,0 +1,80 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:17
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+
+
+# Frozen copy of analytics.compute()'s GROUP BY queries as of this
+# migration: (dimension, item column giving its key)
+DIMENSIONS = (
+    ('total', None),
+    ('product', 'product_id'),
+    ('buyer_type', 'order__buyer__user_type'),
+)
+
+
+def fill_daily_sales(apps, schema_editor):
+    """
+    Build DailySales from the orders already completed
+    """
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    DailySales = apps.get_model('orders', 'DailySales')
+
+    items = (
+        OrderItem.objects
+        .filter(order__status='completed')
+        .annotate(day=TruncDate('order__created_at'), farmer=F('order__farmer_id'))
+    )
+    rows = []
+    for dimension, column in DIMENSIONS:
+        group_by = ['farmer', 'day'] + ([column] if column else [])
+        totals = items.values(*group_by).annotate(
+            order_count=Count('order_id', distinct=True),
+            unit_count=Sum('quantity'),
+            amount=Sum('subtotal'),
+        ).order_by()
+        rows.extend(
+            DailySales(
+                farmer_id=row['farmer'], day=row['day'], dimension=dimension,
+                key=str(row[column]) if column else '',
+                orders=row['order_count'], units=row['unit_count'] or 0, revenue=row['amount'] or Decimal('0'),
+            )
+            for row in totals
+        )
+    DailySales.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_orderevent'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(help_text='Day the orders were placed')),
+                ('dimension', models.CharField(choices=[('total', 'Total'), ('product', 'Product'), ('buyer_type', 'Buyer Type')], default='total', max_length=20)),
+                ('key', models.CharField(blank=True, default='', help_text='Product id or buyer type; blank for the total', max_length=100)),
+                ('orders', models.PositiveIntegerField(default=0, help_text='Completed orders containing this key')),
+                ('units', models.BigIntegerField(default=0, help_text='Units sold')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, help_text='Revenue in UGX', max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('farmer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Daily Sales',
+                'verbose_name_plural': 'Daily Sales',
+                'constraints': [models.UniqueConstraint(fields=('farmer', 'dimension', 'day', 'key'), name='unique_daily_sales')],
+            },
+        ),
+        migrations.RunPython(fill_daily_sales, migrations.RunPython.noop),
+    ]
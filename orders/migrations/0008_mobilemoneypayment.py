@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0007_dailysales'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MobileMoneyPayment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('transaction_id', models.CharField(help_text='Provider transaction id from the statement', max_length=64, unique=True)),
+                ('phone', models.CharField(help_text='Payer phone, normalized to 256XXXXXXXXX', max_length=15)),
+                ('amount', models.DecimalField(decimal_places=2, help_text='Amount paid in UGX', max_digits=10)),
+                ('reference', models.CharField(blank=True, max_length=100)),
+                ('paid_at', models.DateTimeField()),
+                ('matched_by', models.CharField(choices=[('reference', 'Order number in reference'), ('phone_amount', 'Phone and amount')], max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('order', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='payment', to='orders.order')),
+            ],
+            options={
+                'verbose_name': 'Mobile Money Payment',
+                'verbose_name_plural': 'Mobile Money Payments',
+            },
+        ),
+    ]
@@ -76,6 +76,13 @@ class Order(models.Model):
         verbose_name = "Order"
         verbose_name_plural = "Orders"
         ordering = ['-created_at']
+        indexes = [
+            # Order history pages (see services.history); id is the
+            # cursor's tie-breaker, so it is part of the sort key
+            models.Index(fields=['buyer', '-created_at', '-id'], name='order_buyer_created_idx'),
+            models.Index(fields=['farmer', 'status', '-created_at', '-id'], name='order_farmer_status_idx'),
+            models.Index(fields=['farmer', '-created_at', '-id'], name='order_farmer_created_idx'),
+        ]
 
 
 class OrderItem(models.Model):
@@ -128,6 +135,300 @@ class OrderItem(models.Model):
     class Meta:
         verbose_name = "Order Item"
         verbose_name_plural = "Order Items"
+
+
+class Cart(models.Model):
+    """
+    A buyer's shopping cart; lines can come from many farmers and are
+    split into one order per farmer at checkout
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='cart'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Cart - {self.user.username}"
+    
+    class Meta:
+        verbose_name = "Cart"
+        verbose_name_plural = "Carts"
+
+
+class CartItem(models.Model):
+    """
+    One product line in a cart
+    """
+    cart = models.ForeignKey(
+        Cart,
+        on_delete=models.CASCADE,
+        related_name='items'
+    )
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='cart_items'
+    )
+    quantity = models.PositiveIntegerField(
+        default=1,
+        help_text="Quantity to order"
+    )
+    added_at = models.DateTimeField(auto_now_add=True)
+    
+    @property
+    def subtotal(self):
+        return self.quantity * self.product.price
+    
+    def __str__(self):
+        return f"{self.quantity} × {self.product.name}"
+    
+    class Meta:
+        verbose_name = "Cart Item"
+        verbose_name_plural = "Cart Items"
+        ordering = ['added_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['cart', 'product'],
+                name='unique_cart_product'
+            ),
+        ]
+
+
+class OrderEvent(models.Model):
+    """
+    Append-only log of an order's status changes, including its
+    placement. Written by services.lifecycle; rows are never updated.
+    """
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.CASCADE,
+        related_name='events'
+    )
+    from_status = models.CharField(
+        max_length=20,
+        blank=True,
+        choices=Order.STATUS_CHOICES,
+        help_text="Status before the change; empty when the order was placed"
+    )
+    to_status = models.CharField(
+        max_length=20,
+        choices=Order.STATUS_CHOICES,
+        help_text="Status after the change"
+    )
+    actor = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='order_events',
+        help_text="User who made the change"
+    )
+    note = models.CharField(
+        max_length=255,
+        blank=True
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.order.order_number}: {self.from_status or 'placed'} -> {self.to_status}"
+    
+    def save(self, *args, **kwargs):
+        if self.pk:
+            raise ValueError("Order events are append-only")
+        super().save(*args, **kwargs)
+    
+    class Meta:
+        verbose_name = "Order Event"
+        verbose_name_plural = "Order Events"
+        ordering = ['created_at', 'pk']
+        indexes = [
+            models.Index(fields=['order', 'created_at'], name='order_event_order_idx'),
+        ]
+
+class DailySales(models.Model):
+    """
+    A farmer's completed sales for one day, in total and broken down by
+    product and by buyer type. Incrementally updated when orders are
+    completed (services.analytics) and repaired by reconcile_sales, so
+    dashboards read a few rows per day instead of scanning orders.
+    """
+    DIMENSION_CHOICES = (
+        ('total', 'Total'),
+        ('product', 'Product'),
+        ('buyer_type', 'Buyer Type'),
+    )
+    
+    farmer = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='daily_sales'
+    )
+    day = models.DateField(
+        help_text="Day the orders were placed"
+    )
+    dimension = models.CharField(
+        max_length=20,
+        choices=DIMENSION_CHOICES,
+        default='total'
+    )
+    key = models.CharField(
+        max_length=100,
+        blank=True,
+        default='',
+        help_text="Product id or buyer type; blank for the total"
+    )
+    orders = models.PositiveIntegerField(
+        default=0,
+        help_text="Completed orders containing this key"
+    )
+    units = models.BigIntegerField(
+        default=0,
+        help_text="Units sold"
+    )
+    revenue = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        help_text="Revenue in UGX"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        key = f"{self.dimension}:{self.key}" if self.key else self.dimension
+        return f"{self.farmer.username} {self.day} [{key}] UGX {self.revenue}"
+    
+    class Meta:
+        verbose_name = "Daily Sales"
+        verbose_name_plural = "Daily Sales"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['farmer', 'dimension', 'day', 'key'],
+                name='unique_daily_sales'
+            ),
+        ]
+
+class MobileMoneyPayment(models.Model):
+    """
+    A mobile-money statement line matched to an order by the
+    reconcile_payments command (see services.reconciliation)
+    """
+    MATCH_CHOICES = (
+        ('reference', 'Order number in reference'),
+        ('phone_amount', 'Phone and amount'),
+    )
+    
+    transaction_id = models.CharField(
+        max_length=64,
+        unique=True,
+        help_text="Provider transaction id from the statement"
+    )
+    order = models.OneToOneField(
+        Order,
+        on_delete=models.CASCADE,
+        related_name='payment'
+    )
+    phone = models.CharField(
+        max_length=15,
+        help_text="Payer phone, normalized to 256XXXXXXXXX"
+    )
+    amount = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        help_text="Amount paid in UGX"
+    )
+    reference = models.CharField(
+        max_length=100,
+        blank=True
+    )
+    paid_at = models.DateTimeField()
+    matched_by = models.CharField(
+        max_length=20,
+        choices=MATCH_CHOICES
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.transaction_id} -> {self.order.order_number}"
+    
+    class Meta:
+        verbose_name = "Mobile Money Payment"
+        verbose_name_plural = "Mobile Money Payments"
+
+class OrderSequence(models.Model):
+    """
+    Per-day counter behind order numbers. Workers reserve blocks of
+    numbers from it (see services.numbering), so each order number is
+    handed out exactly once without a collision check.
+    """
+    day = models.DateField(
+        unique=True,
+        help_text="Day the sequence belongs to"
+    )
+    next_value = models.BigIntegerField(
+        default=1,
+        help_text="First number not yet reserved by any worker"
+    )
+    
+    def __str__(self):
+        return f"{self.day}: next {self.next_value}"
+    
+    class Meta:
+        verbose_name = "Order Sequence"
+        verbose_name_plural = "Order Sequences"
+
+
+class IdempotencyKey(models.Model):
+    """
+    A client-chosen key for a POST and the response it produced, so a
+    retried submission replays that response instead of running again
+    (see marketplace.services.idempotency)
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='idempotency_keys'
+    )
+    key = models.CharField(
+        max_length=64,
+        help_text="Key sent with the form or Idempotency-Key header"
+    )
+    path = models.CharField(
+        max_length=255,
+        help_text="Request path the key was first used for"
+    )
+    status_code = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        help_text="Response status; empty while the first request is running"
+    )
+    location = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text="Redirect target of the stored response"
+    )
+    content = models.TextField(
+        blank=True,
+        help_text="Body of the stored response, if not a redirect"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(
+        db_index=True,
+        help_text="The key is purged after this time"
+    )
+    
+    def __str__(self):
+        return f"{self.user.username}: {self.key} ({self.path})"
+    
+    class Meta:
+        verbose_name = "Idempotency Key"
+        verbose_name_plural = "Idempotency Keys"
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='unique_idempotency_key'),
+        ]
+
 ##```
 
 ### **Code Explanation:**
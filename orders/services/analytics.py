@@ -0,0 +1,210 @@
+"""
+Farmer Sales Analytics
+
+Completed sales are kept pre-aggregated in DailySales rows: per farmer
+and day, a total plus one row per product and per buyer type. Rows
+are incremented when orders are completed (lifecycle calls
+record_completed), so a dashboard reading a year of sales touches at
+most a few hundred rows through the (farmer, dimension, day) index
+instead of scanning orders and their items.
+
+Sales count on the day the order was placed. The reconcile_sales
+command recomputes every row from completed orders and repairs drift,
+e.g. after orders are edited in the admin.
+"""
+
+import logging
+from collections import namedtuple
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from accounts.models import User
+from marketplace.models import Product
+from orders.models import DailySales, Order, OrderItem
+
+logger = logging.getLogger(__name__)
+
+# (farmer id, day, dimension, key)
+SalesKey = Tuple[int, date, str, str]
+SalesTotals = namedtuple('SalesTotals', 'orders units revenue')
+
+# Item columns that give each dimension's key
+DIMENSIONS = {
+    'total': None,
+    'product': 'product_id',
+    'buyer_type': 'order__buyer__user_type',
+}
+
+
+# --- AGGREGATION ---
+
+def compute(orders) -> Dict[SalesKey, SalesTotals]:
+    """
+    Aggregate the items of completed orders into DailySales keys, with
+    one GROUP BY query per dimension
+    """
+    items = (
+        OrderItem.objects
+        .filter(order__in=orders, order__status='completed')
+        .annotate(day=TruncDate('order__created_at'), farmer=F('order__farmer_id'))
+    )
+
+    totals = {}
+    for dimension, column in DIMENSIONS.items():
+        group_by = ['farmer', 'day'] + ([column] if column else [])
+        rows = items.values(*group_by).annotate(
+            order_count=Count('order_id', distinct=True),
+            unit_count=Sum('quantity'),
+            amount=Sum('subtotal'),
+        ).order_by()
+        for row in rows:
+            key = str(row[column]) if column else ''
+            totals[(row['farmer'], row['day'], dimension, key)] = SalesTotals(
+                row['order_count'], row['unit_count'] or 0, row['amount'] or Decimal('0')
+            )
+    return totals
+
+
+def add(key: SalesKey, delta: SalesTotals) -> None:
+    """
+    Atomically add to a DailySales row, creating it on first use
+    """
+    farmer_id, day, dimension, sales_key = key
+    lookup = {'farmer_id': farmer_id, 'day': day, 'dimension': dimension, 'key': sales_key}
+    changes = {
+        'orders': F('orders') + delta.orders,
+        'units': F('units') + delta.units,
+        'revenue': F('revenue') + delta.revenue,
+        'updated_at': timezone.now(),
+    }
+    if DailySales.objects.filter(**lookup).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            DailySales.objects.create(
+                orders=delta.orders, units=delta.units, revenue=delta.revenue, **lookup
+            )
+    except IntegrityError:
+        # Another writer created it first
+        DailySales.objects.filter(**lookup).update(**changes)
+
+
+@transaction.atomic
+def record_completed(order_ids: Iterable[int]) -> None:
+    """
+    Add newly completed orders to their farmers' daily sales
+    """
+    for key, delta in compute(Order.objects.filter(pk__in=list(order_ids))).items():
+        add(key, delta)
+
+
+@transaction.atomic
+def reconcile() -> int:
+    """
+    Recompute all daily sales from completed orders and repair any row
+    that drifted.
+
+    Returns:
+        Number of rows created, changed or deleted
+    """
+    expected = compute(Order.objects.filter(status='completed'))
+
+    drifted = 0
+    stale = []
+    for row in DailySales.objects.all().iterator():
+        key = (row.farmer_id, row.day, row.dimension, row.key)
+        want = expected.pop(key, None)
+        if want is None:
+            stale.append(row.pk)
+        elif (row.orders, row.units, row.revenue) != tuple(want):
+            DailySales.objects.filter(pk=row.pk).update(
+                orders=want.orders, units=want.units, revenue=want.revenue, updated_at=timezone.now()
+            )
+            drifted += 1
+
+    if stale:
+        DailySales.objects.filter(pk__in=stale).delete()
+    DailySales.objects.bulk_create([
+        DailySales(farmer_id=farmer_id, day=day, dimension=dimension, key=key,
+                   orders=totals.orders, units=totals.units, revenue=totals.revenue)
+        for (farmer_id, day, dimension, key), totals in expected.items()
+    ])
+
+    drifted += len(stale) + len(expected)
+    if drifted:
+        logger.warning(f"Repaired {drifted} daily sales rows")
+    return drifted
+
+
+# --- READS ---
+
+def date_range(days: int, today=None) -> Tuple[date, date]:
+    end = today or timezone.localdate()
+    return end - timedelta(days=days - 1), end
+
+
+def daily(farmer, start: date, end: date) -> List[dict]:
+    """
+    One entry per day from start to end, zero-filled
+    """
+    rows = {
+        row.day: row
+        for row in DailySales.objects.filter(
+            farmer=farmer, dimension='total', day__range=(start, end)
+        ).only('day', 'orders', 'units', 'revenue')
+    }
+    series = []
+    day = start
+    while day <= end:
+        row = rows.get(day)
+        series.append({
+            'day': day,
+            'orders': row.orders if row else 0,
+            'units': row.units if row else 0,
+            'revenue': row.revenue if row else Decimal('0'),
+        })
+        day += timedelta(days=1)
+    return series
+
+
+def breakdown(farmer, dimension: str, start: date, end: date) -> List[dict]:
+    """
+    Totals per product or buyer type over a date range, best-selling
+    first
+    """
+    rows = [
+        {'key': key, 'orders': orders, 'units': units, 'revenue': revenue}
+        for key, orders, units, revenue in (
+            DailySales.objects
+            .filter(farmer=farmer, dimension=dimension, day__range=(start, end))
+            .values('key')
+            .annotate(total_orders=Sum('orders'), total_units=Sum('units'), total_revenue=Sum('revenue'))
+            .order_by('-total_revenue')
+            .values_list('key', 'total_orders', 'total_units', 'total_revenue')
+        )
+    ]
+    if dimension == 'product':
+        names = dict(
+            Product.objects.filter(pk__in=[int(row['key']) for row in rows]).values_list('pk', 'name')
+        )
+        for row in rows:
+            row['label'] = names.get(int(row['key']), 'Deleted product')
+    else:
+        labels = dict(User.USER_TYPES)
+        for row in rows:
+            row['label'] = labels.get(row['key'], row['key'])
+    return rows
+
+
+def summary(series: List[dict]) -> SalesTotals:
+    return SalesTotals(
+        sum(entry['orders'] for entry in series),
+        sum(entry['units'] for entry in series),
+        sum((entry['revenue'] for entry in series), Decimal('0')),
+    )
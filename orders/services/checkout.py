@@ -0,0 +1,172 @@
+"""
+Cart and Checkout Service
+
+A cart holds product lines from any number of farmers. Checkout allocates
+one order number per farmer, then creates the orders in a single
+transaction:
+
+1. reserve stock for every line (stock.reserve_many)
+2. bulk_create the orders, then bulk_create all their items
+3. empty the cart and log the orders' placement and stock movements
+   (lifecycle.record_placed)
+
+The number of queries depends on the number of products and farmers,
+not on a round trip per order. bulk_create sends no model signals, so
+the counters and cached fragments that order signals maintain are
+updated here.
+"""
+
+import logging
+from collections import defaultdict
+from decimal import Decimal
+from typing import List
+
+from django.db import transaction
+from django.db.models import F
+
+from marketplace.services import counters, fragment_cache
+from orders.models import Cart, CartItem, Order, OrderItem
+from . import lifecycle, stock
+from .numbering import allocate
+
+logger = logging.getLogger(__name__)
+
+
+class CheckoutError(Exception):
+    """
+    Raised when a cart cannot be checked out; nothing is changed
+    """
+
+
+# --- CART ---
+
+def get_cart(user) -> Cart:
+    cart, _ = Cart.objects.get_or_create(user=user)
+    return cart
+
+
+def cart_items(user):
+    return (
+        CartItem.objects
+        .filter(cart__user=user)
+        .select_related('product', 'product__farmer')
+        .order_by('product__farmer__username', 'added_at')
+    )
+
+
+def add_to_cart(user, product, quantity: int = 1) -> CartItem:
+    """
+    Add quantity of a product, increasing an existing line
+    """
+    if quantity <= 0:
+        raise CheckoutError("Quantity must be greater than 0")
+    if product.farmer_id == user.pk:
+        raise CheckoutError("You cannot order your own products")
+
+    cart = get_cart(user)
+    item, created = CartItem.objects.get_or_create(
+        cart=cart, product=product, defaults={'quantity': quantity}
+    )
+    if not created:
+        CartItem.objects.filter(pk=item.pk).update(quantity=F('quantity') + quantity)
+        item.refresh_from_db(fields=['quantity'])
+    return item
+
+
+def update_quantity(user, item_id, quantity: int) -> None:
+    """
+    Set a line's quantity; zero or less removes it
+    """
+    items = CartItem.objects.filter(pk=item_id, cart__user=user)
+    if quantity <= 0:
+        items.delete()
+    else:
+        items.update(quantity=quantity)
+
+
+def remove_item(user, item_id) -> None:
+    CartItem.objects.filter(pk=item_id, cart__user=user).delete()
+
+
+# --- CHECKOUT ---
+
+def checkout(user, delivery_address: str, delivery_phone: str, notes: str = '') -> List[Order]:
+    """
+    Place one order per farmer for everything in the user's cart.
+
+    Returns:
+        The created orders
+
+    Raises:
+        CheckoutError: empty cart, unavailable product or not enough stock
+    """
+    # Order numbers are allocated outside the transaction (see numbering)
+    farmer_count = len(set(cart_items(user).values_list('product__farmer_id', flat=True)))
+    if not farmer_count:
+        raise CheckoutError("Your cart is empty")
+    order_numbers = allocate(farmer_count)
+
+    return _place_orders(user, order_numbers, delivery_address, delivery_phone, notes)
+
+
+@transaction.atomic
+def _place_orders(user, order_numbers, delivery_address, delivery_phone, notes) -> List[Order]:
+    items = list(cart_items(user))
+    if not items:
+        raise CheckoutError("Your cart is empty")
+
+    for item in items:
+        if item.product.status != 'available':
+            raise CheckoutError(f"{item.product.name} is no longer available")
+        if item.product.farmer_id == user.pk:
+            raise CheckoutError("You cannot order your own products")
+
+    by_farmer = defaultdict(list)
+    for item in items:
+        by_farmer[item.product.farmer_id].append(item)
+    if len(by_farmer) > len(order_numbers):
+        raise CheckoutError("Your cart changed during checkout, please try again")
+
+    try:
+        stock.reserve_many({item.product_id: item.quantity for item in items})
+    except stock.InsufficientStock as e:
+        product = next(item.product for item in items if item.product_id == e.product_id)
+        raise CheckoutError(f"Only {e.available} {product.unit} of {product.name} available") from e
+
+    orders = Order.objects.bulk_create([
+        Order(
+            buyer=user,
+            farmer_id=farmer_id,
+            order_number=order_number,
+            status='pending',
+            total_amount=sum((item.quantity * item.product.price for item in lines), Decimal('0')),
+            delivery_address=delivery_address,
+            delivery_phone=delivery_phone,
+            notes=notes,
+        )
+        for order_number, (farmer_id, lines) in zip(order_numbers, by_farmer.items())
+    ])
+
+    # OrderItem.save() is bypassed, so subtotal is computed here
+    OrderItem.objects.bulk_create([
+        OrderItem(
+            order=order,
+            product_id=item.product_id,
+            quantity=item.quantity,
+            unit_price=item.product.price,
+            subtotal=item.quantity * item.product.price,
+        )
+        for order, lines in zip(orders, by_farmer.values())
+        for item in lines
+    ])
+
+    CartItem.objects.filter(pk__in=[item.pk for item in items]).delete()
+    lifecycle.record_placed(orders, user)
+
+    # What the Order post_save receivers would have done
+    counters.record_new_orders(counters.OrderState(order.status, order.farmer_id) for order in orders)
+    fragment_cache.invalidate('recent_orders', scope=user.pk)
+    fragment_cache.invalidate('personal_picks', scope=user.pk)
+
+    logger.info(f"Checkout by {user.username}: {len(orders)} orders, {len(items)} items")
+    return orders
@@ -0,0 +1,103 @@
+"""
+Order History Service
+
+Order history is paged by cursor (keyset pagination) rather than by
+OFFSET. A page is "the next N orders older than the last one shown", so
+the database seeks straight to it through the (buyer, created_at),
+(farmer, created_at) or (farmer, status, created_at) index. Page 500 of a buyer with 50k orders
+costs the same as page 1.
+
+The cursor is the (created_at, id) of the last order on the page; id
+breaks ties between orders created in the same instant.
+"""
+
+import base64
+from collections import namedtuple
+from datetime import datetime, time
+from typing import Optional, Tuple
+
+from django.db.models import Prefetch, Q
+from django.utils import timezone
+
+from orders.models import Order, OrderItem
+
+PAGE_SIZE = 20
+
+# Tab counts stop at this many; counting a power buyer's full history
+# would scan it all
+COUNT_CAP = 999
+
+OrderPage = namedtuple('OrderPage', 'orders next_cursor')
+
+
+# --- CURSORS ---
+
+def encode_cursor(order: Order) -> str:
+    raw = f"{order.created_at.isoformat()}|{order.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[datetime, int]]:
+    """
+    Returns:
+        (created_at, id) or None if the cursor is missing or malformed
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, pk = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+# --- QUERIES ---
+
+def with_related(orders):
+    """
+    Load buyer, farmer and items with their products in three queries
+    """
+    return orders.select_related('buyer', 'farmer').prefetch_related(
+        Prefetch('items', queryset=OrderItem.objects.select_related('product').order_by('pk'))
+    )
+
+
+def filter_orders(orders, status: str = '', date_from=None, date_to=None):
+    """
+    Narrow orders by status and an inclusive range of creation dates
+    """
+    if status:
+        orders = orders.filter(status=status)
+    if date_from:
+        orders = orders.filter(created_at__gte=timezone.make_aware(datetime.combine(date_from, time.min)))
+    if date_to:
+        orders = orders.filter(created_at__lte=timezone.make_aware(datetime.combine(date_to, time.max)))
+    return orders
+
+
+def page(orders, cursor: str = '', size: int = PAGE_SIZE) -> OrderPage:
+    """
+    One page of orders, newest first, starting after cursor
+    """
+    orders = orders.order_by('-created_at', '-pk')
+    position = decode_cursor(cursor)
+    if position:
+        created_at, pk = position
+        # The created_at__lte bound lets the index seek to the cursor
+        orders = orders.filter(created_at__lte=created_at).filter(Q(created_at__lt=created_at) | Q(pk__lt=pk))
+
+    rows = list(with_related(orders)[:size + 1])
+    next_cursor = encode_cursor(rows[size - 1]) if len(rows) > size else None
+    return OrderPage(rows[:size], next_cursor)
+
+
+def bounded_count(orders, cap: int = COUNT_CAP) -> Tuple[int, bool]:
+    """
+    Count orders, stopping at cap.
+
+    Returns:
+        (count, more): more is True if there are over cap orders
+    """
+    count = orders.order_by()[:cap + 1].count()
+    return min(count, cap), count > cap
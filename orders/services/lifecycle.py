@@ -0,0 +1,224 @@
+"""
+Order Lifecycle Service
+
+Every status change goes through transition() (one order) or
+bulk_transition() (many of a user's orders), which check it against the
+state machine below, apply it with one conditional UPDATE and append
+one OrderEvent per order. The UPDATE only matches while the orders
+still have the status the change was validated against, so two
+concurrent changes cannot both apply. Cancelled orders' stock is
+returned with a single aggregated UPDATE (stock.release_many). Stock
+taken at placement and returned on cancellation is written to the
+inventory ledger, one movement per order line.
+
+Notifications are not written in the request: the event ids are
+handed to the background pool once the transaction commits, and
+dispatch_notifications() creates them there, for the party that did not
+make the change.
+
+    pending ──> confirmed ──> processing ──> completed
+       │            │└───────────────────────────┘
+       │            └──> cancelled (farmer; stock is returned)
+       └──> cancelled (buyer or farmer; stock is returned)
+"""
+
+import logging
+from typing import Iterable, List
+
+from django.db import transaction
+from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone
+
+from marketplace.services import background, counters, fragment_cache
+from inventory.services import ledger
+from notifications.models import Notification
+from orders.models import Order, OrderEvent
+from . import analytics, stock
+
+logger = logging.getLogger(__name__)
+
+BUYER = 'buyer'
+FARMER = 'farmer'
+
+# Order field holding each party
+OWNER = {BUYER: 'buyer', FARMER: 'farmer'}
+
+# from status -> {to status: parties allowed to make the change}
+TRANSITIONS = {
+    'pending': {'confirmed': {FARMER}, 'cancelled': {BUYER, FARMER}},
+    'confirmed': {'processing': {FARMER}, 'completed': {FARMER}, 'cancelled': {FARMER}},
+    'processing': {'completed': {FARMER}},
+    'completed': {},
+    'cancelled': {},
+}
+
+# Notification text per new status, for the party that did not make the change
+MESSAGES = {
+    'pending': {FARMER: "New order {number} from {buyer}."},
+    'confirmed': {BUYER: "{farmer} confirmed your order {number}."},
+    'processing': {BUYER: "{farmer} is preparing your order {number}."},
+    'completed': {BUYER: "Your order {number} is complete."},
+    'cancelled': {BUYER: "{farmer} cancelled your order {number}.",
+                  FARMER: "{buyer} cancelled order {number}."},
+}
+
+
+class InvalidTransition(Exception):
+    """
+    Raised when a status change is not allowed; nothing is changed
+    """
+
+
+def party(order: Order, user) -> str:
+    if user.pk == order.farmer_id:
+        return FARMER
+    if user.pk == order.buyer_id:
+        return BUYER
+    return ''
+
+
+def allowed_transitions(order: Order, user) -> List[str]:
+    """
+    Statuses user may move order to next
+    """
+    role = party(order, user)
+    return [status for status, who in TRANSITIONS[order.status].items() if role in who]
+
+
+# --- TRANSITIONS ---
+
+@transaction.atomic
+def transition(order: Order, to_status: str, actor, note: str = '') -> OrderEvent:
+    """
+    Move an order to a new status on behalf of actor.
+
+    Raises:
+        InvalidTransition: the change is not allowed for actor, or the
+            order changed status meanwhile
+    """
+    from_status = order.status
+    role = party(order, actor)
+    if not role or role not in TRANSITIONS.get(from_status, {}).get(to_status, ()):
+        raise InvalidTransition(
+            f"Cannot change order {order.order_number} from {from_status} to {to_status}"
+        )
+
+    event, = _apply([order], to_status, actor, note)
+    order.status = to_status
+    return event
+
+
+@transaction.atomic
+def bulk_transition(order_ids: Iterable[int], to_status: str, actor, note: str = '') -> List[OrderEvent]:
+    """
+    Move many of actor's orders to a new status at once. Orders that are
+    not actor's, or cannot make the change from their current status,
+    are skipped.
+
+    Returns:
+        One event per order that changed
+    """
+    # Orders actor may change: per party, those in a status it can change from
+    owned = Q()
+    for from_status, targets in TRANSITIONS.items():
+        for role in targets.get(to_status, ()):
+            owned |= Q(status=from_status, **{OWNER[role]: actor})
+    if not owned:
+        raise InvalidTransition(f"No order can be changed to {to_status}")
+
+    orders = list(
+        Order.objects
+        .select_for_update()
+        .filter(owned, pk__in=list(order_ids))
+        .only('pk', 'status', 'buyer_id', 'farmer_id', 'order_number')
+    )
+    if not orders:
+        return []
+    return _apply(orders, to_status, actor, note)
+
+
+def _apply(orders: List[Order], to_status: str, actor, note: str) -> List[OrderEvent]:
+    """
+    Change validated orders in one UPDATE and log one event each
+    """
+    order_ids = [order.pk for order in orders]
+    updated = Order.objects.filter(
+        pk__in=order_ids, status__in={order.status for order in orders}
+    ).update(status=to_status, updated_at=timezone.now())
+    if updated != len(orders):
+        raise InvalidTransition("Some orders were changed by someone else, please reload")
+
+    if to_status == 'cancelled':
+        stock.release_many(stock.order_quantities(order_ids))
+        ledger.record_orders(order_ids, 'cancellation', actor)
+    elif to_status == 'completed':
+        analytics.record_completed(order_ids)
+
+    events = OrderEvent.objects.bulk_create([
+        OrderEvent(order=order, from_status=order.status, to_status=to_status, actor=actor, note=note)
+        for order in orders
+    ])
+
+    # What the Order post_save receivers would have done
+    counters.record_order_changes(
+        (counters.OrderState(order.status, order.farmer_id), counters.OrderState(to_status, order.farmer_id))
+        for order in orders
+    )
+    for buyer_id in {order.buyer_id for order in orders}:
+        fragment_cache.invalidate('recent_orders', scope=buyer_id)
+        fragment_cache.invalidate('personal_picks', scope=buyer_id)
+
+    background.run_after_commit(dispatch_notifications, [event.pk for event in events])
+    return events
+
+
+def record_placed(orders: Iterable[Order], actor) -> None:
+    """
+    Log the placement of new orders and the stock they took, and notify
+    their farmers
+    """
+    ledger.record_orders([order.pk for order in orders], 'sale', actor)
+    events = OrderEvent.objects.bulk_create([
+        OrderEvent(order=order, to_status=order.status, actor=actor)
+        for order in orders
+    ])
+    background.run_after_commit(dispatch_notifications, [event.pk for event in events])
+
+
+# --- NOTIFICATIONS ---
+
+def dispatch_notifications(event_ids: List[int]) -> int:
+    """
+    Notify the other party of each event in a batch: the farmer of the
+    buyer's changes and the buyer of the farmer's. Runs in the
+    background pool.
+
+    Returns:
+        Number of notifications created
+    """
+    events = OrderEvent.objects.filter(pk__in=event_ids).select_related('order__buyer', 'order__farmer')
+
+    notifications = []
+    for event in events:
+        order = event.order
+        templates = MESSAGES[event.to_status]
+        details = {'number': order.order_number, 'buyer': order.buyer.username, 'farmer': order.farmer.username}
+        title = f"Order {order.order_number}: {event.get_to_status_display()}"
+        link = reverse('orders:order_detail', args=[order.pk])
+
+        for role, user in ((BUYER, order.buyer), (FARMER, order.farmer)):
+            template = templates.get(role)
+            if template is None or user.pk == event.actor_id:
+                continue
+            notifications.append(Notification(
+                user=user,
+                notification_type='order',
+                title=title,
+                message=template.format(**details),
+                link=link,
+            ))
+
+    Notification.objects.bulk_create(notifications)
+    logger.info(f"Dispatched {len(notifications)} order notifications for {len(event_ids)} events")
+    return len(notifications)
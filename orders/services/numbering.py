@@ -0,0 +1,117 @@
+"""
+Order Number Allocation
+
+Order numbers look like ORD-20250208-000123: the day plus a zero-padded
+per-day sequence, so numbers sort in issue order and share index
+prefixes.
+
+Each worker process reserves a block of numbers from the day's
+OrderSequence row with one atomic UPDATE, then hands numbers out from
+memory. Blocks never overlap, so numbers are collision-free without a
+retry loop. Numbers from a block that is never used (the process exits,
+or the order's transaction rolls back) leave gaps. They are never
+reused.
+
+Blocks are reserved in their own short transaction, so allocate
+numbers before opening the transaction that creates the orders where
+possible. Inside a transaction (ATOMIC_REQUESTS, tests, callers that
+need it) a block reserved there could be rolled back while the process
+keeps handing its numbers out. Allocation therefore falls back to
+taking just the numbers needed in the caller's transaction and caches
+nothing: a rollback returns them together with the orders that used
+them. The sequence row then stays locked until that transaction ends.
+"""
+
+import os
+import threading
+from datetime import date
+from typing import List, Optional
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from orders.models import OrderSequence
+
+PREFIX = 'ORD'
+
+# Numbers reserved per round trip; larger blocks mean fewer writes to
+# the sequence row and bigger gaps when a worker restarts
+BLOCK_SIZE = getattr(settings, 'ORDER_NUMBER_BLOCK_SIZE', 20)
+
+# Sequence digits; later numbers simply get longer
+WIDTH = 6
+
+
+class _Block:
+    def __init__(self):
+        self.pid: Optional[int] = None
+        self.day: Optional[date] = None
+        self.next = 0
+        self.end = 0     # exclusive
+
+
+_block = _Block()
+_lock = threading.Lock()
+
+
+def format_number(day: date, value: int) -> str:
+    return f"{PREFIX}-{day:%Y%m%d}-{value:0{WIDTH}d}"
+
+
+def reserve_block(day: date, size: int) -> int:
+    """
+    Reserve size numbers of a day's sequence, in its own transaction or
+    in a savepoint of the caller's.
+
+    Returns:
+        First number of the block
+    """
+    with transaction.atomic():
+        updated = OrderSequence.objects.filter(day=day).update(next_value=F('next_value') + size)
+        if not updated:
+            try:
+                with transaction.atomic():
+                    OrderSequence.objects.create(day=day, next_value=1 + size)
+                return 1
+            except IntegrityError:
+                # Another worker created today's row first
+                OrderSequence.objects.filter(day=day).update(next_value=F('next_value') + size)
+        end = OrderSequence.objects.filter(day=day).values_list('next_value', flat=True).get()
+    return end - size
+
+
+def allocate(count: int = 1) -> List[str]:
+    """
+    Hand out count new order numbers, in increasing order
+    """
+    numbers = []
+    with _lock:
+        today = timezone.localdate()
+        # A forked worker must not reuse its parent's block
+        if _block.pid != os.getpid() or _block.day != today:
+            _block.pid, _block.day, _block.next, _block.end = os.getpid(), today, 0, 0
+
+        while len(numbers) < count:
+            if _block.next >= _block.end and connection.in_atomic_block:
+                # Reserved numbers would roll back with the caller's
+                # transaction: take only what is needed, cache nothing
+                needed = count - len(numbers)
+                first = reserve_block(today, needed)
+                numbers.extend(format_number(today, value) for value in range(first, first + needed))
+                break
+            if _block.next >= _block.end:
+                size = max(BLOCK_SIZE, count - len(numbers))
+                _block.next = reserve_block(today, size)
+                _block.end = _block.next + size
+            numbers.append(format_number(today, _block.next))
+            _block.next += 1
+    return numbers
+
+
+def generate_order_number() -> str:
+    """
+    Allocate a single order number, e.g. ORD-20250208-000123
+    """
+    return allocate(1)[0]
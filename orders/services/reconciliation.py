@@ -0,0 +1,270 @@
+"""
+Mobile-Money Reconciliation Service
+
+Matches mobile-money statement lines to open (unpaid, not cancelled)
+orders. Open orders are loaded once into two hash indexes:
+
+    order number            -> order
+    (phone, amount in cents) -> [orders]
+
+and the statement is read in a single streaming pass; each line costs
+a couple of dict lookups, never a query. A line matches:
+
+1. by reference, when it quotes an order number and pays its total
+2. otherwise by payer phone and exact amount, among orders placed
+   between SLACK before and WINDOW after the payment time
+
+A line with several candidate orders is ambiguous and left for a
+person to decide. An order is matched at most once.
+"""
+
+import csv
+import re
+from collections import defaultdict, namedtuple
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from django.utils import timezone
+
+from orders.models import MobileMoneyPayment, Order
+
+# Orders placed up to this long before a payment can match it
+WINDOW = timedelta(days=7)
+
+# Payments stamped slightly before the order (clock skew between the
+# provider and us) still match
+SLACK = timedelta(hours=1)
+
+# Open orders placed longer ago than this are not considered
+LOOKBACK = timedelta(days=90)
+
+# Matched lines recorded per transaction with --apply
+SAVE_BATCH = 1000
+
+ORDER_NUMBER = re.compile(r'ORD-?(\d{8})-?([0-9A-Z]{4,})', re.IGNORECASE)
+NON_DIGITS = re.compile(r'\D')
+
+DATE_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%d/%m/%Y %H:%M:%S', '%d/%m/%Y %H:%M', '%Y-%m-%d')
+
+# Statement column names; providers differ, so they can be overridden
+DEFAULT_COLUMNS = {
+    'transaction_id': 'transaction_id',
+    'date': 'date',
+    'phone': 'phone',
+    'amount': 'amount',
+    'reference': 'reference',
+}
+
+OpenOrder = namedtuple('OpenOrder', 'pk order_number phone cents created_at')
+StatementLine = namedtuple('StatementLine', 'transaction_id paid_at phone cents amount reference')
+Result = namedtuple('Result', 'line status matched_by orders')
+Saved = namedtuple('Saved', 'created conflicts')
+
+MATCHED = 'matched'
+AMBIGUOUS = 'ambiguous'
+UNMATCHED = 'unmatched'
+INVALID = 'invalid'
+
+
+# --- NORMALIZATION ---
+
+def normalize_phone(value: str) -> str:
+    """
+    Uganda numbers in any common form -> 256XXXXXXXXX
+    """
+    digits = NON_DIGITS.sub('', value or '')
+    if digits.startswith('256'):
+        return digits
+    if digits.startswith('0'):
+        return '256' + digits[1:]
+    if len(digits) == 9:
+        return '256' + digits
+    return digits
+
+
+def to_cents(value) -> Optional[int]:
+    try:
+        return int((Decimal(str(value).replace(',', '').strip()) * 100).to_integral_value())
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def normalize_reference(value: str) -> str:
+    """
+    The order number quoted in a payment reference, e.g.
+    'ord 20250208 000123' -> 'ORD-20250208-000123', or ''
+    """
+    match = ORDER_NUMBER.search((value or '').replace(' ', '-'))
+    if not match:
+        return ''
+    return f"ORD-{match.group(1)}-{match.group(2).upper()}"
+
+
+def parse_time(value: str, tz=None) -> Optional[datetime]:
+    """
+    Naive times are taken to be in tz (default: the current time zone)
+    """
+    value = (value or '').strip()
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        parsed = None
+        for fmt in DATE_FORMATS:
+            try:
+                parsed = datetime.strptime(value, fmt)
+                break
+            except ValueError:
+                continue
+    if parsed is None:
+        return None
+    if parsed.tzinfo is not None:
+        return parsed
+    return parsed.replace(tzinfo=tz or timezone.get_current_timezone())
+
+
+# --- INDEXES ---
+
+class OrderIndex:
+    """
+    Hash indexes over open orders
+    """
+    def __init__(self, orders: Iterable[OpenOrder], window: timedelta = WINDOW):
+        self.window = window
+        self.by_number: Dict[str, OpenOrder] = {}
+        self.by_phone_amount: Dict[tuple, List[OpenOrder]] = defaultdict(list)
+        self.claimed = set()
+        for order in orders:
+            self.by_number[order.order_number.upper()] = order
+            self.by_phone_amount[(order.phone, order.cents)].append(order)
+
+    def __len__(self):
+        return len(self.by_number)
+
+
+def open_orders(since: datetime) -> Iterator[OpenOrder]:
+    rows = (
+        Order.objects
+        .filter(created_at__gte=since, payment__isnull=True)
+        .exclude(status='cancelled')
+        .values_list('pk', 'order_number', 'delivery_phone', 'total_amount', 'created_at')
+    )
+    for pk, number, phone, total, created_at in rows.iterator(chunk_size=5000):
+        yield OpenOrder(pk, number, normalize_phone(phone), to_cents(total), created_at)
+
+
+def build_index(since: Optional[datetime] = None, window: timedelta = WINDOW) -> OrderIndex:
+    return OrderIndex(open_orders(since or timezone.now() - LOOKBACK), window)
+
+
+# --- MATCHING ---
+
+def read_statement(handle, columns: Dict[str, str] = None) -> Iterator[StatementLine]:
+    """
+    Parse statement lines from an open CSV file, one at a time.
+    Lines that cannot be parsed are yielded with paid_at or cents None.
+    """
+    columns = {**DEFAULT_COLUMNS, **(columns or {})}
+    reader = csv.reader(handle)
+    header = next(reader, [])
+    missing = [name for name in columns.values() if name not in header]
+    if missing:
+        raise ValueError(f"Statement has no column {', '.join(missing)}")
+    txn, when, phone, amount, reference = (
+        header.index(columns[field]) for field in ('transaction_id', 'date', 'phone', 'amount', 'reference')
+    )
+    width = max(txn, when, phone, amount, reference) + 1
+
+    # Resolved once: looking up the active time zone per line is slow
+    tz = timezone.get_current_timezone()
+    for row in reader:
+        if len(row) < width:
+            row += [''] * (width - len(row))
+        yield StatementLine(
+            transaction_id=row[txn].strip(),
+            paid_at=parse_time(row[when], tz),
+            phone=normalize_phone(row[phone]),
+            cents=to_cents(row[amount]),
+            amount=row[amount],
+            reference=row[reference].strip(),
+        )
+
+
+def match_line(line: StatementLine, index: OrderIndex) -> Result:
+    if line.paid_at is None or line.cents is None or not line.transaction_id:
+        return Result(line, INVALID, '', [])
+
+    number = normalize_reference(line.reference)
+    if number:
+        order = index.by_number.get(number)
+        if order is not None and order.pk not in index.claimed:
+            if order.cents == line.cents:
+                index.claimed.add(order.pk)
+                return Result(line, MATCHED, 'reference', [order])
+            # Right order, wrong amount: part payment or typo
+            return Result(line, AMBIGUOUS, 'reference', [order])
+
+    earliest = line.paid_at - index.window
+    latest = line.paid_at + SLACK
+    candidates = [
+        order for order in index.by_phone_amount.get((line.phone, line.cents), ())
+        if order.pk not in index.claimed and earliest <= order.created_at <= latest
+    ]
+    if len(candidates) == 1:
+        index.claimed.add(candidates[0].pk)
+        return Result(line, MATCHED, 'phone_amount', candidates)
+    if candidates:
+        return Result(line, AMBIGUOUS, 'phone_amount', candidates)
+    return Result(line, UNMATCHED, '', [])
+
+
+def reconcile(lines: Iterable[StatementLine], index: OrderIndex) -> Iterator[Result]:
+    """
+    Match statement lines in order; transaction ids seen before are skipped
+    """
+    seen = set(MobileMoneyPayment.objects.values_list('transaction_id', flat=True).iterator())
+    for line in lines:
+        if line.transaction_id in seen:
+            continue
+        seen.add(line.transaction_id)
+        yield match_line(line, index)
+
+
+def save_matches(results: List[Result]) -> Saved:
+    """
+    Record matched lines as payments. Lines whose transaction or order
+    is already recorded (e.g. by a concurrent run) are skipped and
+    counted as conflicts. Call inside a transaction.
+
+    Returns:
+        Number of payments created and of lines skipped as conflicts
+    """
+    recorded_transactions = set(
+        MobileMoneyPayment.objects
+        .filter(transaction_id__in=[result.line.transaction_id[:64] for result in results])
+        .values_list('transaction_id', flat=True)
+    )
+    recorded_orders = set(
+        MobileMoneyPayment.objects
+        .filter(order_id__in=[result.orders[0].pk for result in results])
+        .values_list('order_id', flat=True)
+    )
+
+    payments = []
+    for result in results:
+        transaction_id, order_id = result.line.transaction_id[:64], result.orders[0].pk
+        if transaction_id in recorded_transactions or order_id in recorded_orders:
+            continue
+        recorded_transactions.add(transaction_id)
+        recorded_orders.add(order_id)
+        payments.append(MobileMoneyPayment(
+            transaction_id=transaction_id,
+            order_id=order_id,
+            phone=result.line.phone[:15],
+            amount=Decimal(result.line.cents) / 100,
+            reference=result.line.reference[:100],
+            paid_at=result.line.paid_at,
+            matched_by=result.matched_by,
+        ))
+    MobileMoneyPayment.objects.bulk_create(payments, batch_size=1000)
+    return Saved(len(payments), len(results) - len(payments))
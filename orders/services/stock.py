@@ -0,0 +1,164 @@
+"""
+Stock Reservation Service
+
+Decrements and restores Product.quantity with F-expression UPDATEs.
+Reservations are conditional:
+
+    UPDATE product SET quantity = quantity - n
+    WHERE id = ? AND status = 'available' AND quantity >= n
+
+The check and the write are one statement, so concurrent buyers cannot
+oversell. Only the stock columns are written, so a farmer editing the
+listing at the same time keeps their changes.
+
+Call these inside the transaction that creates or cancels the order.
+queryset.update() sends no model signals, so the listing read model
+and platform counters are refreshed here explicitly.
+"""
+
+from typing import Dict
+
+from django.db import transaction
+from django.db.models import Case, F, Sum, Value, When
+from django.utils import timezone
+
+from marketplace.models import Product
+from marketplace.services import counters, fragment_cache, listings
+from orders.models import OrderItem
+
+
+class InsufficientStock(Exception):
+    """
+    Raised when a product does not have enough stock for a reservation
+    """
+    def __init__(self, product_id, requested, available):
+        self.product_id = product_id
+        self.requested = requested
+        self.available = available
+        super().__init__(
+            f"Product #{product_id}: requested {requested}, only {available} available"
+        )
+
+
+def _record_status_change(product_id, old_status: str) -> None:
+    new_state = counters.product_state_from_db(product_id)
+    counters.record_product_change(new_state._replace(status=old_status), new_state)
+    fragment_cache.invalidate('platform_stats')
+
+
+def _mark_sold_out(product_ids) -> None:
+    sold_out = list(
+        Product.objects
+        .filter(pk__in=product_ids, status='available', quantity__lte=0)
+        .values_list('pk', flat=True)
+    )
+    if not sold_out:
+        return
+    Product.objects.filter(pk__in=sold_out).update(status='out_of_stock', updated_at=timezone.now())
+    for product_id in sold_out:
+        _record_status_change(product_id, 'available')
+
+
+def _mark_restocked(product_ids) -> None:
+    restocked = list(
+        Product.objects
+        .filter(pk__in=product_ids, status='out_of_stock', quantity__gt=0)
+        .values_list('pk', flat=True)
+    )
+    if not restocked:
+        return
+    Product.objects.filter(pk__in=restocked).update(status='available', updated_at=timezone.now())
+    for product_id in restocked:
+        _record_status_change(product_id, 'out_of_stock')
+
+
+@transaction.atomic
+def reserve_many(quantities: Dict[int, int]) -> None:
+    """
+    Reserve stock for several products at once (product id -> quantity),
+    all or nothing: one conditional UPDATE per product, then one
+    set-based sold-out update and one listing refresh for the batch.
+
+    Raises:
+        InsufficientStock: for the first product that is short; every
+        reservation made so far is rolled back
+    """
+    now = timezone.now()
+    # Sorted ids keep lock order consistent between concurrent checkouts
+    for product_id, quantity in sorted(quantities.items()):
+        if quantity <= 0:
+            raise ValueError("Quantity must be positive")
+
+        reserved = Product.objects.filter(
+            pk=product_id,
+            status='available',
+            quantity__gte=quantity,
+        ).update(quantity=F('quantity') - quantity, updated_at=now)
+
+        if not reserved:
+            available = (
+                Product.objects.filter(pk=product_id, status='available')
+                .values_list('quantity', flat=True)
+                .first()
+            )
+            raise InsufficientStock(product_id, quantity, available or 0)
+
+    # Sold out: take them off the catalogue
+    _mark_sold_out(quantities.keys())
+    listings.sync_stock(quantities.keys())
+
+
+def reserve(product_id, quantity: int) -> None:
+    """
+    Take quantity units of an available product.
+
+    Raises:
+        InsufficientStock: not enough stock (nothing is changed)
+    """
+    reserve_many({product_id: quantity})
+
+
+@transaction.atomic
+def release_many(quantities: Dict[int, int]) -> None:
+    """
+    Return stock to several products (product id -> quantity), e.g. when
+    orders are cancelled, in one UPDATE:
+
+        UPDATE product SET quantity = quantity + CASE id WHEN ? THEN ? ... END
+        WHERE id IN (...)
+
+    Sold-out products become available again; discontinued ones stay off.
+    """
+    quantities = {product_id: quantity for product_id, quantity in quantities.items() if quantity > 0}
+    if not quantities:
+        return
+
+    Product.objects.filter(pk__in=quantities).update(
+        quantity=F('quantity') + Case(
+            *[When(pk=product_id, then=Value(quantity)) for product_id, quantity in quantities.items()],
+            default=Value(0),
+        ),
+        updated_at=timezone.now()
+    )
+    _mark_restocked(quantities.keys())
+    listings.sync_stock(quantities.keys())
+
+
+def release(product_id, quantity: int) -> None:
+    """
+    Return quantity units to a product
+    """
+    release_many({product_id: quantity})
+
+
+def order_quantities(order_ids) -> Dict[int, int]:
+    """
+    Units per product across the given orders' items
+    """
+    return dict(
+        OrderItem.objects
+        .filter(order_id__in=order_ids)
+        .values('product_id')
+        .annotate(total=Sum('quantity'))
+        .values_list('product_id', 'total')
+    )
@@ -1,3 +1,269 @@
-from django.test import TestCase
+import multiprocessing
+import threading
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.db import IntegrityError, connection, connections, transaction
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from accounts.models import User
+from marketplace.models import Product
+from notifications.models import Notification
+from .models import Order, OrderItem, OrderSequence
+from .services import lifecycle, numbering
+
+
+class FreshOrderNumbersMixin:
+    def _fresh_number_block(self):
+        # Tables are flushed between tests but this process's cached block
+        # would survive and hand out numbers the sequence reissues
+        patcher = mock.patch.object(numbering, '_block', numbering._Block())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class ConcurrentPlaceOrderTest(FreshOrderNumbersMixin, TransactionTestCase):
+    """
+    Many buyers ordering the same product at once must never oversell
+    """
+    # Keep the district reference rows seeded by migrations between tests
+    serialized_rollback = True
+
+    STOCK = 30
+    BUYERS = 12
+    ORDERS_PER_BUYER = 4
+
+    def setUp(self):
+        self._fresh_number_block()
+        self.farmer = User.objects.create_user(
+            'farmer', password='x', user_type='farmer', district='Kampala', location='Kampala'
+        )
+        self.product = Product.objects.create(
+            farmer=self.farmer, name='Urgent tomatoes', description='Must go today',
+            price=1000, quantity=self.STOCK, unit='kg', location='Kampala', is_urgent=True,
+        )
+        self.buyers = [
+            User.objects.create_user(f'buyer{i}', password='x', user_type='consumer', location='Kampala')
+            for i in range(self.BUYERS)
+        ]
+
+    def _buy(self, buyer, barrier, results):
+        client = Client()
+        client.force_login(buyer)
+        url = reverse('orders:place_order', args=[self.product.pk])
+        barrier.wait()
+        try:
+            for _ in range(self.ORDERS_PER_BUYER):
+                started = time.monotonic()
+                response = client.post(url, {
+                    'quantity': 1,
+                    'delivery_address': 'Nakasero',
+                    'delivery_phone': '0700000000',
+                })
+                results.append((response.status_code, time.monotonic() - started))
+        finally:
+            connection.close()
+
+    def test_no_oversell(self):
+        barrier = threading.Barrier(self.BUYERS)
+        results = []
+        threads = [
+            threading.Thread(target=self._buy, args=(buyer, barrier, results))
+            for buyer in self.buyers
+        ]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+        attempts = self.BUYERS * self.ORDERS_PER_BUYER
+        self.assertEqual(len(results), attempts)
+        # Every attempt is answered cleanly: a redirect (to the order, or back
+        # to the product when stock ran out) or 404 once the listing is sold out
+        self.assertTrue(all(status in (302, 404) for status, _ in results), results)
+
+        self.product.refresh_from_db()
+        sold = sum(OrderItem.objects.values_list('quantity', flat=True))
+        self.assertEqual(sold, self.STOCK)
+        self.assertEqual(Order.objects.count(), self.STOCK)
+        self.assertEqual(self.product.quantity, 0)
+        self.assertEqual(self.product.status, 'out_of_stock')
+
+        # Throughput stays sane: no request waits anywhere near the lock timeout
+        slowest = max(duration for _, duration in results)
+        self.assertLess(slowest, 10, f"slowest request {slowest:.2f}s of {elapsed:.2f}s total")
+
+    def test_insufficient_stock_leaves_product_untouched(self):
+        client = Client()
+        client.force_login(self.buyers[0])
+        response = client.post(reverse('orders:place_order', args=[self.product.pk]), {
+            'quantity': self.STOCK + 1,
+            'delivery_address': 'Nakasero',
+            'delivery_phone': '0700000000',
+        })
+        self.assertRedirects(
+            response, reverse('marketplace:product_detail', args=[self.product.pk]),
+            fetch_redirect_response=False
+        )
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity, self.STOCK)
+        self.assertFalse(Order.objects.exists())
+
+
+class OrderNumberAllocationTest(FreshOrderNumbersMixin, TransactionTestCase):
+    """
+    Worker processes allocating order numbers at once never collide
+    """
+    serialized_rollback = True
+
+    WORKERS = 4
+    ORDERS_PER_WORKER = 50_000
+    BATCH = 2_000
+
+    def setUp(self):
+        self._fresh_number_block()
+        self.farmer = User.objects.create_user('farmer', password='x', user_type='farmer', location='Kampala')
+        self.buyer = User.objects.create_user('buyer', password='x', user_type='consumer', location='Kampala')
+
+    def _work(self, barrier, results):
+        # Runs in a forked child: it needs its own database connection
+        connections.close_all()
+        try:
+            numbers = []
+            barrier.wait()
+            for _ in range(self.ORDERS_PER_WORKER // self.BATCH):
+                batch = numbering.allocate(self.BATCH)
+                Order.objects.bulk_create([
+                    Order(
+                        buyer_id=self.buyer.pk, farmer_id=self.farmer.pk, order_number=number,
+                        total_amount=1000, delivery_address='Nakasero', delivery_phone='0700000000',
+                    )
+                    for number in batch
+                ])
+                numbers.extend(batch)
+            results.put(('ok', numbers))
+        except Exception as e:
+            results.put(('error', repr(e)))
+        finally:
+            connections.close_all()
+
+    def test_parallel_workers_get_unique_increasing_numbers(self):
+        context = multiprocessing.get_context('fork')
+        barrier = context.Barrier(self.WORKERS)
+        results = context.Queue()
+
+        connections.close_all()
+        with mock.patch.object(numbering, 'BLOCK_SIZE', 500):
+            workers = [
+                context.Process(target=self._work, args=(barrier, results))
+                for _ in range(self.WORKERS)
+            ]
+            for worker in workers:
+                worker.start()
+            reports = [results.get(timeout=300) for _ in workers]
+            for worker in workers:
+                worker.join()
+
+        errors = [detail for outcome, detail in reports if outcome == 'error']
+        self.assertEqual(errors, [])
+
+        for _, numbers in reports:
+            self.assertEqual(len(numbers), self.ORDERS_PER_WORKER)
+            self.assertTrue(all(a < b for a, b in zip(numbers, numbers[1:])))
+
+        total = self.WORKERS * self.ORDERS_PER_WORKER
+        issued = {number for _, numbers in reports for number in numbers}
+        self.assertEqual(len(issued), total)
+        self.assertEqual(Order.objects.count(), total)
+        self.assertEqual(Order.objects.values('order_number').distinct().count(), total)
+
+        # Blocks are handed out back to back
+        self.assertEqual(OrderSequence.objects.get().next_value, total + 1)
+
+    def test_allocation_inside_a_transaction(self):
+        with transaction.atomic():
+            inside = numbering.allocate(3)
+        self.assertEqual([number[-6:] for number in inside], ['000001', '000002', '000003'])
+
+        # A rolled-back allocation hands its numbers out again, and the
+        # process has not cached a block that no longer exists
+        try:
+            with transaction.atomic():
+                numbering.generate_order_number()
+                raise IntegrityError
+        except IntegrityError:
+            pass
+        self.assertTrue(numbering.generate_order_number().endswith('000004'))
+        self.assertEqual(OrderSequence.objects.get().next_value, 4 + numbering.BLOCK_SIZE)
+
+    def test_new_process_does_not_reuse_parent_block(self):
+        first = numbering.generate_order_number()
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+
+        def child():
+            connections.close_all()
+            results.put(numbering.generate_order_number())
+            connections.close_all()
+
+        connections.close_all()
+        process = context.Process(target=child)
+        process.start()
+        from_child = results.get(timeout=30)
+        process.join()
+
+        self.assertNotEqual(first, from_child)
+        self.assertNotEqual(numbering.generate_order_number(), from_child)
+
+
+class OrderCancellationTest(TestCase):
+    """
+    Either party can cancel; stock comes back and only the other party
+    is told
+    """
+
+    def setUp(self):
+        self.farmer = User.objects.create_user('farmer', password='x', user_type='farmer')
+        self.buyer = User.objects.create_user('buyer', password='x', user_type='consumer')
+        self.product = Product.objects.create(
+            farmer=self.farmer, name='Beans', description='Dry beans',
+            price=500, quantity=7, unit='kg',
+        )
+        self.order = Order.objects.create(
+            buyer=self.buyer, farmer=self.farmer, total_amount=1500, order_number='ORD-TEST-1',
+            delivery_address='Nakasero', delivery_phone='0700000000', status='confirmed',
+        )
+        OrderItem.objects.create(order=self.order, product=self.product, quantity=3, unit_price=500, subtotal=1500)
+
+    def _notified(self, event):
+        lifecycle.dispatch_notifications([event.pk])
+        return set(Notification.objects.values_list('user__username', flat=True))
+
+    def test_farmer_cancels_confirmed_order(self):
+        event = lifecycle.transition(self.order, 'cancelled', self.farmer)
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity, 10)
+        self.assertEqual(self._notified(event), {'buyer'})
+
+    def test_buyer_cannot_cancel_confirmed_order(self):
+        with self.assertRaises(lifecycle.InvalidTransition):
+            lifecycle.transition(self.order, 'cancelled', self.buyer)
+
+    def test_buyer_cancellation_notifies_farmer_only(self):
+        Order.objects.filter(pk=self.order.pk).update(status='pending')
+        self.order.status = 'pending'
+        event = lifecycle.transition(self.order, 'cancelled', self.buyer)
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity, 10)
+        self.assertEqual(self._notified(event), {'farmer'})
+
+    def test_farmer_bulk_cancel(self):
+        events = lifecycle.bulk_transition([self.order.pk], 'cancelled', self.farmer)
+
+        self.assertEqual(len(events), 1)
+        self.assertEqual(Order.objects.get().status, 'cancelled')
@@ -7,6 +7,15 @@ urlpatterns = [
     path('place/<int:product_id>/', views.place_order, name='place_order'),
     path('detail/<int:order_id>/', views.order_detail, name='order_detail'),
     path('my-orders/', views.my_orders, name='my_orders'),
+    path('export/', views.export_orders, name='export_orders'),
     path('update-status/<int:order_id>/', views.update_order_status, name='update_order_status'),
     path('cancel/<int:order_id>/', views.cancel_order, name='cancel_order'),
+    path('bulk-update/', views.bulk_update_orders, name='bulk_update_orders'),
+    
+    # Cart
+    path('cart/', views.cart_detail, name='cart'),
+    path('cart/add/<int:product_id>/', views.add_to_cart, name='add_to_cart'),
+    path('cart/item/<int:item_id>/update/', views.update_cart_item, name='update_cart_item'),
+    path('cart/item/<int:item_id>/remove/', views.remove_cart_item, name='remove_cart_item'),
+    path('checkout/', views.checkout, name='checkout'),
 ]
\ No newline at end of file
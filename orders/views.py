@@ -1,21 +1,20 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.http import StreamingHttpResponse
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db import transaction
+from django.utils import timezone
+from django.utils.http import urlencode
+from django.utils.dateparse import parse_date
 from .models import Order, OrderItem
+from .services import stock, history, lifecycle, export, checkout as checkout_service
+from marketplace.services.idempotency import idempotent, new_key as new_idempotency_key
+from .services.numbering import generate_order_number
 from marketplace.models import Product
-import random
-import string
-from datetime import datetime
-
-def generate_order_number():
-    """
-    Generate unique order number like ORD-20250208-A1B2
-    """
-    date_part = datetime.now().strftime('%Y%m%d')
-    random_part = ''.join(random.choices(string.ascii_uppercase + string.digits, k=4))
-    return f"ORD-{date_part}-{random_part}"
 
 @login_required
+@idempotent
 def place_order(request, product_id):
     """
     Place an order for a single product
@@ -25,7 +24,7 @@ def place_order(request, product_id):
     # Prevent farmer from ordering their own products
     if request.user == product.farmer:
         messages.error(request, 'You cannot order your own products!')
-        return redirect('product_detail', pk=product_id)
+        return redirect('marketplace:product_detail', pk=product_id)
     
     if request.method == 'POST':
         quantity = int(request.POST.get('quantity', 1))
@@ -36,41 +35,44 @@ def place_order(request, product_id):
         # Validate quantity
         if quantity <= 0:
             messages.error(request, 'Quantity must be greater than 0!')
-            return redirect('product_detail', pk=product_id)
-        
-        if quantity > product.quantity:
-            messages.error(request, f'Only {product.quantity} {product.unit} available!')
-            return redirect('product_detail', pk=product_id)
+            return redirect('marketplace:product_detail', pk=product_id)
         
         # Calculate total
         unit_price = product.price
         total_amount = quantity * unit_price
         
-        # Create order
-        order = Order.objects.create(
-            buyer=request.user,
-            farmer=product.farmer,
-            order_number=generate_order_number(),
-            status='pending',
-            total_amount=total_amount,
-            delivery_address=delivery_address,
-            delivery_phone=delivery_phone,
-            notes=notes
-        )
-        
-        # Create order item
-        OrderItem.objects.create(
-            order=order,
-            product=product,
-            quantity=quantity,
-            unit_price=unit_price
-        )
+        # Allocated before the transaction (see services.numbering)
+        order_number = generate_order_number()
         
-        # Update product quantity
-        product.quantity -= quantity
-        if product.quantity == 0:
-            product.status = 'out_of_stock'
-        product.save()
+        # Reserve stock and create the order in one transaction: the
+        # conditional UPDATE fails instead of overselling, and a failed
+        # order creation gives the stock back
+        try:
+            with transaction.atomic():
+                stock.reserve(product.pk, quantity)
+                
+                order = Order.objects.create(
+                    buyer=request.user,
+                    farmer=product.farmer,
+                    order_number=order_number,
+                    status='pending',
+                    total_amount=total_amount,
+                    delivery_address=delivery_address,
+                    delivery_phone=delivery_phone,
+                    notes=notes
+                )
+                
+                OrderItem.objects.create(
+                    order=order,
+                    product=product,
+                    quantity=quantity,
+                    unit_price=unit_price
+                )
+                
+                lifecycle.record_placed([order], request.user)
+        except stock.InsufficientStock as e:
+            messages.error(request, f'Only {e.available} {product.unit} available!')
+            return redirect('marketplace:product_detail', pk=product_id)
         
         messages.success(request, f'Order placed successfully! Order number: {order.order_number}')
         return redirect('orders:order_detail', order_id=order.id)  # FIXED
@@ -86,15 +88,23 @@ def order_detail(request, order_id):
     """
     View order details
     """
-    order = get_object_or_404(Order, pk=order_id)
+    order = get_object_or_404(
+        history.with_related(Order.objects).select_related('farmer__farmer_profile', 'marketplace_review'),
+        pk=order_id
+    )
     
     # Only buyer or farmer can view order
     if request.user != order.buyer and request.user != order.farmer:
         messages.error(request, 'You do not have permission to view this order!')
         return redirect('home')
     
+    statuses = dict(Order.STATUS_CHOICES)
     context = {
-        'order': order
+        'order': order,
+        'events': order.events.select_related('actor'),
+        'next_statuses': [
+            (status, statuses[status]) for status in lifecycle.allowed_transitions(order, request.user)
+        ],
     }
     return render(request, 'orders/order_detail.html', context)
 
@@ -102,21 +112,95 @@ def order_detail(request, order_id):
 @login_required
 def my_orders(request):
     """
-    View all orders for current user
+    View orders for current user, a page at a time
     """
+    tab = 'received' if request.GET.get('tab') == 'received' else 'placed'
+    status = request.GET.get('status', '')
+    if status not in dict(Order.STATUS_CHOICES):
+        status = ''
+    date_from = _parse_date(request.GET.get('from'))
+    date_to = _parse_date(request.GET.get('to'))
+    
     # Orders I placed (as buyer)
-    orders_placed = Order.objects.filter(buyer=request.user)
+    orders_placed = history.filter_orders(Order.objects.filter(buyer=request.user), status, date_from, date_to)
     
     # Orders I received (as farmer)
-    orders_received = Order.objects.filter(farmer=request.user)
+    orders_received = history.filter_orders(Order.objects.filter(farmer=request.user), status, date_from, date_to)
+    
+    # Only the open tab follows the cursor; the other shows its first page
+    cursor = request.GET.get('after', '')
+    placed = history.page(orders_placed, cursor if tab == 'placed' else '')
+    received = history.page(orders_received, cursor if tab == 'received' else '')
     
     context = {
-        'orders_placed': orders_placed,
-        'orders_received': orders_received
+        'tab': tab,
+        'orders_placed': placed.orders,
+        'placed_next': placed.next_cursor,
+        'placed_count': history.bounded_count(orders_placed),
+        'orders_received': received.orders,
+        'received_next': received.next_cursor,
+        'received_count': history.bounded_count(orders_received),
+        'status_choices': Order.STATUS_CHOICES,
+        'status': status,
+        'date_from': date_from,
+        'date_to': date_to,
+        'filter_query': urlencode({
+            key: value for key, value in (('status', status), ('from', date_from), ('to', date_to)) if value
+        }),
+        'paged': bool(cursor),
+        'export_roles': [('buyer', 'Orders I placed')] + (
+            [('farmer', 'Orders I received')] if request.user.user_type == 'farmer' else []
+        ),
     }
     return render(request, 'orders/my_orders.html', context)
 
 
+@login_required
+def export_orders(request):
+    """
+    Stream the user's orders and line items as CSV or JSON Lines
+    Usage: /orders/export/?format=csv&role=farmer&status=completed&from=2025-01-01&to=2025-01-31
+    Staff export every order with scope=all (optionally &buyer=<username>&farmer=<username>)
+    """
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in export.FORMATS:
+        fmt = 'csv'
+    role = 'farmer' if request.GET.get('role') == 'farmer' else 'buyer'
+    status = request.GET.get('status', '')
+    if status not in dict(Order.STATUS_CHOICES):
+        status = ''
+    date_from = _parse_date(request.GET.get('from'))
+    date_to = _parse_date(request.GET.get('to'))
+    
+    # Everyone exports their own side of their orders unless staff
+    # explicitly ask for the whole platform
+    if request.GET.get('scope') == 'all':
+        if not request.user.is_staff:
+            messages.error(request, 'Only staff can export all orders.')
+            return redirect('orders:my_orders')
+        orders = Order.objects.all()
+    else:
+        orders = Order.objects.filter(**{role: request.user})
+    if request.GET.get('buyer'):
+        orders = orders.filter(buyer__username=request.GET['buyer'])
+    if request.GET.get('farmer'):
+        orders = orders.filter(farmer__username=request.GET['farmer'])
+    orders = history.filter_orders(orders, status, date_from, date_to)
+    
+    content_type, extension = export.FORMATS[fmt]
+    response = StreamingHttpResponse(export.stream(orders, fmt), content_type=content_type)
+    filename = f"orders-{timezone.localdate():%Y%m%d}.{extension}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def _parse_date(value):
+    try:
+        return parse_date(value or '')
+    except ValueError:
+        return None
+
+
 @login_required
 def update_order_status(request, order_id):
     """
@@ -130,18 +214,50 @@ def update_order_status(request, order_id):
         return redirect('orders:order_detail', order_id=order_id)  # FIXED
     
     if request.method == 'POST':
-        new_status = request.POST.get('status')
-        
-        if new_status in dict(Order.STATUS_CHOICES):
-            order.status = new_status
-            order.save()
-            messages.success(request, f'Order status updated to {order.get_status_display()}')
+        try:
+            lifecycle.transition(order, request.POST.get('status'), request.user, request.POST.get('note', '')[:255])
+        except lifecycle.InvalidTransition as e:
+            messages.error(request, str(e))
         else:
-            messages.error(request, 'Invalid status!')
+            messages.success(request, f'Order status updated to {order.get_status_display()}')
     
     return redirect('orders:order_detail', order_id=order_id)  # FIXED
 
 
+@login_required
+def bulk_update_orders(request):
+    """
+    Move many orders to a new status at once (POST): farmers confirm,
+    process, complete or cancel received orders, buyers cancel pending ones
+    """
+    status = request.POST.get('status', '')
+    tab = 'received' if request.POST.get('tab') == 'received' else 'placed'
+    
+    if request.method == 'POST':
+        try:
+            order_ids = [int(pk) for pk in request.POST.getlist('order_ids')]
+        except ValueError:
+            order_ids = []
+        
+        if not order_ids:
+            messages.error(request, 'Select at least one order!')
+        elif status not in dict(Order.STATUS_CHOICES):
+            messages.error(request, 'Invalid status!')
+        else:
+            try:
+                events = lifecycle.bulk_transition(order_ids, status, request.user, request.POST.get('note', '')[:255])
+            except lifecycle.InvalidTransition as e:
+                messages.error(request, str(e))
+            else:
+                label = dict(Order.STATUS_CHOICES)[status]
+                skipped = len(set(order_ids)) - len(events)
+                messages.success(request, f'{len(events)} order{"s" if len(events) != 1 else ""} updated to {label}')
+                if skipped:
+                    messages.warning(request, f'{skipped} order{"s" if skipped != 1 else ""} could not be changed to {label}')
+    
+    return redirect(f"{reverse('orders:my_orders')}?tab={tab}")
+
+
 @login_required
 def cancel_order(request, order_id):
     """
@@ -149,28 +265,121 @@ def cancel_order(request, order_id):
     """
     order = get_object_or_404(Order, pk=order_id)
     
-    # Only buyer can cancel, and only if pending
-    if request.user != order.buyer:
+    # Buyer while pending, farmer until processing starts (see lifecycle.TRANSITIONS)
+    if request.user != order.buyer and request.user != order.farmer:
         messages.error(request, 'You can only cancel your own orders!')
         return redirect('orders:order_detail', order_id=order_id)  # FIXED
     
-    if order.status != 'pending':
-        messages.error(request, f'Cannot cancel order with status: {order.get_status_display()}')
-        return redirect('orders:order_detail', order_id=order_id)  # FIXED
+    if request.method == 'POST':
+        # Stock is restored by the transition; its conditional UPDATE means a
+        # double submit cannot restore it twice
+        try:
+            lifecycle.transition(order, 'cancelled', request.user)
+        except lifecycle.InvalidTransition:
+            messages.error(request, f'Cannot cancel order with status: {order.get_status_display()}')
+        else:
+            messages.success(request, 'Order cancelled successfully!')
+    
+    return redirect('orders:order_detail', order_id=order_id)  # FIXED
+
+
+# --- CART & CHECKOUT ---
+
+@login_required
+def cart_detail(request):
+    """
+    View the cart, grouped by farmer, with the checkout form
+    """
+    items = list(checkout_service.cart_items(request.user))
     
-    # Restore product quantity
-    for item in order.items.all():
-        product = item.product
-        product.quantity += item.quantity
-        if product.status == 'out_of_stock':
-            product.status = 'available'
-        product.save()
+    # One order per farmer will be created at checkout
+    groups = {}
+    for item in items:
+        group = groups.setdefault(item.product.farmer_id, {
+            'farmer': item.product.farmer,
+            'items': [],
+            'total': 0,
+        })
+        group['items'].append(item)
+        group['total'] += item.subtotal
     
-    # Update order status
-    order.status = 'cancelled'
-    order.save()
+    # Key for the checkout form (see marketplace.services.idempotency)
+    request.idempotency_key = new_idempotency_key()
     
-    messages.success(request, 'Order cancelled successfully!')
-    return redirect('orders:order_detail', order_id=order_id)  # FIXED
+    context = {
+        'groups': groups.values(),
+        'item_count': len(items),
+        'cart_total': sum(group['total'] for group in groups.values()),
+    }
+    return render(request, 'orders/cart.html', context)
+
+
+@login_required
+def add_to_cart(request, product_id):
+    """
+    Add a product to the cart (POST)
+    """
+    product = get_object_or_404(Product, pk=product_id, status='available')
+    
+    if request.method == 'POST':
+        try:
+            quantity = int(request.POST.get('quantity', 1))
+            checkout_service.add_to_cart(request.user, product, quantity)
+        except ValueError:
+            messages.error(request, 'Invalid quantity!')
+        except checkout_service.CheckoutError as e:
+            messages.error(request, str(e))
+        else:
+            messages.success(request, f'{product.name} added to your cart.')
+    
+    return redirect('marketplace:product_detail', pk=product_id)
 
 
+@login_required
+def update_cart_item(request, item_id):
+    """
+    Change a cart line's quantity (POST); 0 removes it
+    """
+    if request.method == 'POST':
+        try:
+            quantity = int(request.POST.get('quantity', 1))
+        except ValueError:
+            messages.error(request, 'Invalid quantity!')
+        else:
+            checkout_service.update_quantity(request.user, item_id, quantity)
+    return redirect('orders:cart')
+
+
+@login_required
+def remove_cart_item(request, item_id):
+    """
+    Remove a line from the cart (POST)
+    """
+    if request.method == 'POST':
+        checkout_service.remove_item(request.user, item_id)
+    return redirect('orders:cart')
+
+
+@login_required
+@idempotent
+def checkout(request):
+    """
+    Place one order per farmer for everything in the cart (POST)
+    """
+    if request.method != 'POST':
+        return redirect('orders:cart')
+    
+    try:
+        orders = checkout_service.checkout(
+            request.user,
+            delivery_address=request.POST.get('delivery_address', ''),
+            delivery_phone=request.POST.get('delivery_phone', ''),
+            notes=request.POST.get('notes', ''),
+        )
+    except checkout_service.CheckoutError as e:
+        messages.error(request, str(e))
+        return redirect('orders:cart')
+    
+    numbers = ', '.join(order.order_number for order in orders)
+    messages.success(request, f'{len(orders)} order{"s" if len(orders) != 1 else ""} placed: {numbers}')
+    return redirect('orders:my_orders')
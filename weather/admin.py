@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import WeatherAlert, PlantingSeason, PestAlert
+from .models import WeatherAlert, PlantingSeason, PestAlert, PestAlertInputLink
 
 class WeatherAlertAdmin(admin.ModelAdmin):
     list_display = ['title', 'alert_type', 'severity', 'start_date', 'is_active']
@@ -7,4 +7,24 @@ class WeatherAlertAdmin(admin.ModelAdmin):
 
 admin.site.register(WeatherAlert, WeatherAlertAdmin)
 admin.site.register(PlantingSeason)
-admin.site.register(PestAlert)
\ No newline at end of file
+
+
+class PestAlertInputLinkInline(admin.TabularInline):
+    model = PestAlertInputLink
+    fields = ['input_item', 'score', 'matched']
+    readonly_fields = fields
+    ordering = ['-score']
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        # Links are computed by services.remedy_matcher
+        return False
+
+
+class PestAlertAdmin(admin.ModelAdmin):
+    list_display = ['pest_name', 'severity', 'affected_regions', 'reported_date', 'is_active']
+    list_filter = ['severity', 'is_active']
+    inlines = [PestAlertInputLinkInline]
+
+admin.site.register(PestAlert, PestAlertAdmin)
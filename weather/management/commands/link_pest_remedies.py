@@ -0,0 +1,21 @@
+"""
+Django management command to rebuild the links from pest alerts to
+purchasable inputs
+
+Usage:
+    python manage.py link_pest_remedies
+"""
+
+from django.core.management.base import BaseCommand
+from weather.services import remedy_matcher
+
+
+class Command(BaseCommand):
+    help = 'Re-index the input catalogue and relink every pest alert to matching inputs'
+
+    def handle(self, *args, **options):
+        counts = remedy_matcher.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Indexed {counts['inputs']} inputs ({counts['terms']} terms), "
+            f"{counts['links']} alert-input links"
+        ))
@@ -0,0 +1,132 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:51
+
+import math
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Frozen copy of weather.services.remedy_matcher's tokenizing and scoring
+# as of this migration; later changes to the service must not alter it
+FIELD_WEIGHTS = (('name', 3), ('brand', 3), ('manufacturer', 2), ('description', 1))
+MIN_COVERAGE = 2 / 3
+MIN_TOKEN_LENGTH = 3
+STOPWORDS = {
+    'the', 'and', 'for', 'with', 'from', 'use', 'using', 'apply', 'spray', 'per',
+    'based', 'such', 'other', 'any', 'like', 'recommended', 'product', 'products',
+    'registered', 'approved', 'litre', 'litres', 'liter', 'liters', 'acre', 'water',
+}
+REMEDY_SPLIT = re.compile(r'[,;/\n()\[\]+]|\b(?:or|and)\b', re.IGNORECASE)
+WORD = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode().lower()
+    return [
+        word for word in WORD.findall(text)
+        if len(word) >= MIN_TOKEN_LENGTH and not word.isdigit() and word not in STOPWORDS
+    ]
+
+
+def parse_remedies(text):
+    remedies, seen = [], set()
+    for part in REMEDY_SPLIT.split(text or ''):
+        words = frozenset(tokenize(part))
+        if words and words not in seen:
+            seen.add(words)
+            remedies.append((' '.join(part.split()), words))
+    return remedies
+
+
+def input_terms(fields):
+    terms = {}
+    for field, weight in FIELD_WEIGHTS:
+        for word in tokenize(fields.get(field, '')):
+            if len(word) <= 64 and terms.get(word, 0) < weight:
+                terms[word] = weight
+    return terms
+
+
+def fill_links(apps, schema_editor):
+    """
+    Index the existing inputs and link them to the existing alerts
+    """
+    AgriculturalInput = apps.get_model('inputs', 'AgriculturalInput')
+    PestAlert = apps.get_model('weather', 'PestAlert')
+    InputTerm = apps.get_model('weather', 'InputTerm')
+    PestAlertInputLink = apps.get_model('weather', 'PestAlertInputLink')
+
+    alerts = [
+        (alert_id, remedies)
+        for alert_id, text in PestAlert.objects.exclude(recommended_products='').values_list('pk', 'recommended_products')
+        for remedies in [parse_remedies(text)] if remedies
+    ]
+
+    terms, links = [], []
+    rows = AgriculturalInput.objects.order_by('pk').values('pk', *(field for field, _ in FIELD_WEIGHTS))
+    for fields in rows.iterator(chunk_size=2000):
+        indexed = input_terms(fields)
+        terms.extend(
+            InputTerm(term=term, input_item_id=fields['pk'], weight=weight)
+            for term, weight in indexed.items()
+        )
+        for alert_id, remedies in alerts:
+            total, matched = 0.0, []
+            for label, words in remedies:
+                found = [indexed[word] for word in words if word in indexed]
+                if len(found) >= math.ceil(len(words) * MIN_COVERAGE):
+                    total += sum(found) / len(words)
+                    matched.append(label)
+            if matched:
+                links.append(PestAlertInputLink(
+                    alert_id=alert_id, input_item_id=fields['pk'],
+                    score=round(total, 3), matched=', '.join(matched)[:300],
+                ))
+
+    InputTerm.objects.bulk_create(terms, batch_size=2000)
+    PestAlertInputLink.objects.bulk_create(links, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inputs', '0004_discounttier'),
+        ('weather', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InputTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.PositiveSmallIntegerField(help_text='Weight of the strongest field the term appears in (name and brand highest)')),
+                ('input_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='remedy_terms', to='inputs.agriculturalinput')),
+            ],
+            options={
+                'verbose_name': 'Input Term',
+                'verbose_name_plural': 'Input Terms',
+                'indexes': [models.Index(fields=['term'], name='weather_inp_term_42faa6_idx')],
+                'unique_together': {('input_item', 'term')},
+            },
+        ),
+        migrations.CreateModel(
+            name='PestAlertInputLink',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(help_text='Higher is a closer match')),
+                ('matched', models.CharField(help_text='Recommended products the input matched', max_length=300)),
+                ('alert', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='input_links', to='weather.pestalert')),
+                ('input_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pest_alert_links', to='inputs.agriculturalinput')),
+            ],
+            options={
+                'verbose_name': 'Pest Alert Input Link',
+                'verbose_name_plural': 'Pest Alert Input Links',
+                'indexes': [models.Index(fields=['alert', '-score'], name='weather_pes_alert_i_756a60_idx')],
+                'unique_together': {('alert', 'input_item')},
+            },
+        ),
+        migrations.RunPython(fill_links, migrations.RunPython.noop),
+    ]
@@ -100,4 +100,62 @@ class PestAlert(models.Model):
     class Meta:
         verbose_name = "Pest Alert"
         verbose_name_plural = "Pest Alerts"
-        ordering = ['-reported_date']
\ No newline at end of file
+        ordering = ['-reported_date']
+
+
+class InputTerm(models.Model):
+    """
+    Inverted index over the input catalogue for pest remedy matching:
+    one row per (term, input) for the words of an input's name, brand,
+    manufacturer and description
+    """
+    term = models.CharField(max_length=64)
+    input_item = models.ForeignKey(
+        'inputs.AgriculturalInput',
+        on_delete=models.CASCADE,
+        related_name='remedy_terms'
+    )
+    weight = models.PositiveSmallIntegerField(
+        help_text="Weight of the strongest field the term appears in (name and brand highest)"
+    )
+
+    def __str__(self):
+        return f"{self.term} -> #{self.input_item_id}"
+
+    class Meta:
+        verbose_name = "Input Term"
+        verbose_name_plural = "Input Terms"
+        unique_together = ['input_item', 'term']
+        indexes = [
+            models.Index(fields=['term']),
+        ]
+
+
+class PestAlertInputLink(models.Model):
+    """
+    Input from the catalogue that matches a pest alert's recommended
+    products, precomputed by services.remedy_matcher
+    """
+    alert = models.ForeignKey(
+        PestAlert,
+        on_delete=models.CASCADE,
+        related_name='input_links'
+    )
+    input_item = models.ForeignKey(
+        'inputs.AgriculturalInput',
+        on_delete=models.CASCADE,
+        related_name='pest_alert_links'
+    )
+    score = models.FloatField(help_text="Higher is a closer match")
+    matched = models.CharField(max_length=300, help_text="Recommended products the input matched")
+
+    def __str__(self):
+        return f"{self.alert.pest_name} -> {self.input_item.name}"
+
+    class Meta:
+        verbose_name = "Pest Alert Input Link"
+        verbose_name_plural = "Pest Alert Input Links"
+        unique_together = ['alert', 'input_item']
+        indexes = [
+            models.Index(fields=['alert', '-score']),
+        ]
@@ -0,0 +1,277 @@
+"""
+Pest Remedy Matcher
+
+Links pest alerts to the inputs in the catalogue that farmers can buy
+to treat them. PestAlert.recommended_products is free text such as
+"Emamectin benzoate, Coragen (chlorantraniliprole) or Ampligo"; it is
+split into remedies (product names and active ingredients) and each
+remedy is tokenized into words.
+
+Inputs are indexed the same way into InputTerm, an inverted index from
+word to input over name, brand, manufacturer and description (name and
+brand weigh most). An input matches a remedy when it contains at least
+MIN_COVERAGE of the remedy's words; the link's score adds up the weight
+of the matched words per remedy.
+
+Links are precomputed into PestAlertInputLink whenever either side
+changes (in the background, see weather.signals):
+
+- an alert: its remedies' words are looked up in the index, one query
+- an input: it is re-indexed and scored against the alerts' remedies
+
+so the alert page reads its purchasable inputs with one indexed query.
+"""
+
+import logging
+import math
+import re
+import unicodedata
+from collections import defaultdict, namedtuple
+from typing import Dict, Iterable, List, Tuple
+
+from django.db import transaction
+
+from inputs.models import AgriculturalInput
+from marketplace.services import background
+from weather.models import InputTerm, PestAlert, PestAlertInputLink
+
+logger = logging.getLogger(__name__)
+
+# Indexed fields and how much a word found in each counts
+FIELD_WEIGHTS = (
+    ('name', 3),
+    ('brand', 3),
+    ('manufacturer', 2),
+    ('description', 1),
+)
+
+# Share of a remedy's words an input must contain to match it
+MIN_COVERAGE = 2 / 3
+
+# Inputs shown on an alert page
+PAGE_LIMIT = 12
+
+MIN_TOKEN_LENGTH = 3
+
+# Words that say nothing about which product is meant
+STOPWORDS = {
+    'the', 'and', 'for', 'with', 'from', 'use', 'using', 'apply', 'spray', 'per',
+    'based', 'such', 'other', 'any', 'like', 'recommended', 'product', 'products',
+    'registered', 'approved', 'litre', 'litres', 'liter', 'liters', 'acre', 'water',
+}
+
+# Separators between remedies in recommended_products
+_REMEDY_SPLIT = re.compile(r'[,;/\n()\[\]+]|\b(?:or|and)\b', re.IGNORECASE)
+_WORD = re.compile(r'[a-z0-9]+')
+
+Remedy = namedtuple('Remedy', 'label words')
+
+
+# --- TOKENIZING ---
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lower-case, accent-free words of text, without numbers, short words
+    and stopwords
+    """
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode().lower()
+    return [
+        word for word in _WORD.findall(text)
+        if len(word) >= MIN_TOKEN_LENGTH and not word.isdigit() and word not in STOPWORDS
+    ]
+
+
+def parse_remedies(text: str) -> List[Remedy]:
+    """
+    Remedies named in an alert's recommended_products, each with its
+    distinct words
+    """
+    remedies, seen = [], set()
+    for part in _REMEDY_SPLIT.split(text or ''):
+        words = frozenset(tokenize(part))
+        if words and words not in seen:
+            seen.add(words)
+            remedies.append(Remedy(' '.join(part.split()), words))
+    return remedies
+
+
+def input_terms(fields: Dict[str, str]) -> Dict[str, int]:
+    """
+    Indexed words of an input, each with the weight of the strongest
+    field it appears in
+    """
+    terms = {}
+    for field, weight in FIELD_WEIGHTS:
+        for word in tokenize(fields.get(field, '')):
+            if len(word) <= 64 and terms.get(word, 0) < weight:
+                terms[word] = weight
+    return terms
+
+
+# --- SCORING ---
+
+def score(remedies: List[Remedy], terms: Dict[str, int]) -> Tuple[float, List[str]]:
+    """
+    How well an input's terms match an alert's remedies, and which
+    remedies matched
+    """
+    total, matched = 0.0, []
+    for remedy in remedies:
+        found = [terms[word] for word in remedy.words if word in terms]
+        if len(found) >= math.ceil(len(remedy.words) * MIN_COVERAGE):
+            total += sum(found) / len(remedy.words)
+            matched.append(remedy.label)
+    return total, matched
+
+
+def _link(alert_id: int, input_id: int, total: float, matched: List[str]) -> PestAlertInputLink:
+    return PestAlertInputLink(
+        alert_id=alert_id,
+        input_item_id=input_id,
+        score=round(total, 3),
+        matched=', '.join(matched)[:300],
+    )
+
+
+# --- LINKING ---
+
+def link_alert(alert_id: int) -> int:
+    """
+    Recompute an alert's links from the inverted index.
+
+    Returns:
+        Number of inputs linked
+    """
+    alert = PestAlert.objects.filter(pk=alert_id).only('recommended_products').first()
+    if alert is None:
+        return 0
+    remedies = parse_remedies(alert.recommended_products)
+
+    # Only the alert's own words matter for scoring
+    candidates = defaultdict(dict)
+    words = set().union(*(remedy.words for remedy in remedies))
+    if words:
+        for input_id, term, weight in (
+            InputTerm.objects.filter(term__in=words).values_list('input_item_id', 'term', 'weight')
+        ):
+            candidates[input_id][term] = weight
+
+    links = []
+    for input_id, terms in candidates.items():
+        total, matched = score(remedies, terms)
+        if matched:
+            links.append(_link(alert_id, input_id, total, matched))
+
+    with transaction.atomic():
+        PestAlertInputLink.objects.filter(alert_id=alert_id).delete()
+        PestAlertInputLink.objects.bulk_create(links)
+    return len(links)
+
+
+def _alert_remedies() -> Iterable[Tuple[int, List[Remedy]]]:
+    for alert_id, text in PestAlert.objects.exclude(recommended_products='').values_list('pk', 'recommended_products'):
+        remedies = parse_remedies(text)
+        if remedies:
+            yield alert_id, remedies
+
+
+def index_input(input_id: int) -> int:
+    """
+    Re-index an input's words and recompute its links to every alert.
+
+    Returns:
+        Number of alerts linked
+    """
+    fields = (
+        AgriculturalInput.objects
+        .filter(pk=input_id)
+        .values(*(field for field, _ in FIELD_WEIGHTS))
+        .first()
+    )
+    if fields is None:
+        return 0
+    terms = input_terms(fields)
+
+    links = []
+    for alert_id, remedies in _alert_remedies():
+        total, matched = score(remedies, terms)
+        if matched:
+            links.append(_link(alert_id, input_id, total, matched))
+
+    with transaction.atomic():
+        InputTerm.objects.filter(input_item_id=input_id).delete()
+        InputTerm.objects.bulk_create([
+            InputTerm(term=term, input_item_id=input_id, weight=weight)
+            for term, weight in terms.items()
+        ])
+        PestAlertInputLink.objects.filter(input_item_id=input_id).delete()
+        PestAlertInputLink.objects.bulk_create(links)
+    return len(links)
+
+
+@transaction.atomic
+def rebuild() -> Dict[str, int]:
+    """
+    Rebuild the whole index and every link
+
+    Returns:
+        Counts of inputs indexed, terms written and links made
+    """
+    InputTerm.objects.all().delete()
+    PestAlertInputLink.objects.all().delete()
+
+    inputs = 0
+    terms = []
+    rows = AgriculturalInput.objects.order_by('pk').values('pk', *(field for field, _ in FIELD_WEIGHTS))
+    for fields in rows.iterator(chunk_size=2000):
+        inputs += 1
+        terms.extend(
+            InputTerm(term=term, input_item_id=fields['pk'], weight=weight)
+            for term, weight in input_terms(fields).items()
+        )
+    InputTerm.objects.bulk_create(terms, batch_size=2000)
+
+    links = sum(link_alert(alert_id) for alert_id, _ in _alert_remedies())
+    counts = {'inputs': inputs, 'terms': len(terms), 'links': links}
+    logger.info(f"Rebuilt pest remedy links: {counts}")
+    return counts
+
+
+# --- PAGES ---
+
+def remedies_for(alert: PestAlert) -> List[PestAlertInputLink]:
+    """
+    Available inputs linked to an alert, best match first (one query)
+    """
+    return list(
+        PestAlertInputLink.objects
+        .filter(alert=alert, input_item__status='available')
+        .select_related('input_item')
+        .order_by('-score', 'input_item__price')[:PAGE_LIMIT]
+    )
+
+
+# --- SIGNALS ---
+
+def schedule_input(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    post_save handler: re-index an input in the background when its
+    indexed text may have changed
+    """
+    if raw:
+        return
+    if update_fields is not None and not set(update_fields) & {field for field, _ in FIELD_WEIGHTS}:
+        return
+    background.run_after_commit(index_input, instance.pk)
+
+
+def schedule_alert(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    post_save handler: relink an alert in the background when its
+    recommended products may have changed
+    """
+    if raw:
+        return
+    if update_fields is not None and 'recommended_products' not in update_fields:
+        return
+    background.run_after_commit(link_alert, instance.pk)
@@ -0,0 +1,13 @@
+"""
+Signal handlers that keep pest alert remedy links up to date
+"""
+
+from django.db.models.signals import post_save
+
+from inputs.models import AgriculturalInput
+from .models import PestAlert
+from .services import remedy_matcher
+
+
+post_save.connect(remedy_matcher.schedule_input, sender=AgriculturalInput, dispatch_uid='remedy_matcher_input')
+post_save.connect(remedy_matcher.schedule_alert, sender=PestAlert, dispatch_uid='remedy_matcher_alert')
@@ -1,3 +1,81 @@
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
 
-# Create your tests here.
+from accounts.models import User
+from inputs.models import AgriculturalInput, InputCategory
+from .models import PestAlert
+from .services import remedy_matcher
+from .services.remedy_matcher import Remedy
+
+
+class ParseRemediesTest(SimpleTestCase):
+
+    def test_splits_on_separators_and_conjunctions(self):
+        remedies = remedy_matcher.parse_remedies("Emamectin benzoate, Coragen (chlorantraniliprole) or Ampligo")
+
+        self.assertEqual(
+            [remedy.label for remedy in remedies],
+            ['Emamectin benzoate', 'Coragen', 'chlorantraniliprole', 'Ampligo'],
+        )
+        self.assertEqual(remedies[0].words, {'emamectin', 'benzoate'})
+
+    def test_drops_stopwords_numbers_and_repeats(self):
+        remedies = remedy_matcher.parse_remedies("Spray 50 ml Ampligo per litre; ampligo")
+
+        self.assertEqual(len(remedies), 1)
+        self.assertEqual(remedies[0].words, {'ampligo'})
+
+    def test_empty_text(self):
+        self.assertEqual(remedy_matcher.parse_remedies(''), [])
+
+
+class ScoreTest(SimpleTestCase):
+    remedies = [
+        Remedy('Emamectin benzoate', frozenset({'emamectin', 'benzoate'})),
+        Remedy('Ampligo', frozenset({'ampligo'})),
+    ]
+
+    def test_weights_are_averaged_per_remedy(self):
+        total, matched = remedy_matcher.score(self.remedies, {'emamectin': 3, 'benzoate': 1, 'ampligo': 3})
+
+        self.assertEqual(total, 2 + 3)
+        self.assertEqual(matched, ['Emamectin benzoate', 'Ampligo'])
+
+    def test_one_shared_word_does_not_cover_a_two_word_remedy(self):
+        terms = remedy_matcher.input_terms({'name': 'Benzoate salt'})
+
+        self.assertEqual(remedy_matcher.score(self.remedies, terms), (0.0, []))
+
+    def test_no_match(self):
+        self.assertEqual(remedy_matcher.score(self.remedies, {'urea': 3}), (0.0, []))
+
+
+class RemedyLinkTest(TestCase):
+    """
+    Alerts link to the inputs that cover their remedies, best first
+    """
+
+    def setUp(self):
+        supplier = User.objects.create_user('supplier', password='x', user_type='input_supplier')
+        category = InputCategory.objects.create(name='Pesticides', category_type='pesticides')
+
+        def make_input(name, description=''):
+            return AgriculturalInput.objects.create(
+                supplier=supplier, category=category, name=name, description=description,
+                price=20000, quantity_available=10, unit='liters',
+            )
+
+        self.emamectin = make_input('Emamectin benzoate 5% WDG')
+        self.mentioned = make_input('Bioguard', 'Works where emamectin benzoate has failed')
+        self.salt = make_input('Benzoate salt')
+        self.alert = PestAlert.objects.create(
+            pest_name='Fall armyworm', affected_crops='Maize', affected_regions='Central',
+            description='Larvae feed on leaves', symptoms='Ragged holes', severity='high',
+            control_measures='Scout weekly', recommended_products='Emamectin benzoate or Ampligo',
+        )
+
+    def test_rebuild_links_covering_inputs(self):
+        remedy_matcher.rebuild()
+
+        links = remedy_matcher.remedies_for(self.alert)
+        self.assertEqual([link.input_item for link in links], [self.emamectin, self.mentioned])
+        self.assertEqual(links[0].matched, 'Emamectin benzoate')
@@ -3,6 +3,7 @@ from django.utils import timezone
 from django.http import JsonResponse
 from .models import WeatherAlert, PlantingSeason, PestAlert
 from .services.farming_advisor import FarmingAdvisor
+from .services import remedy_matcher
 import requests
 from datetime import datetime, date
 
@@ -106,4 +107,6 @@ def get_weather_data(location):
 
 def pest_alert_detail(request, pk):
     pest_alert = get_object_or_404(PestAlert, pk=pk)
-    return render(request, 'weather/pest_alert_detail.html', {'pest_alert': pest_alert})
\ No newline at end of file
+    # Precomputed matches against the input catalogue, see remedy_matcher
+    remedies = remedy_matcher.remedies_for(pest_alert)
+    return render(request, 'weather/pest_alert_detail.html', {'pest_alert': pest_alert, 'remedies': remedies})
\ No newline at end of file